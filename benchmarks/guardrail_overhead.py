@@ -0,0 +1,96 @@
+"""
+Per-request overhead of the LLM guardrails, before the model is called.
+
+Each request of `GuardrailManager.validate_input` builds the decision model of
+the input guardrails and binds it to the LLM as a structured-output runnable.
+This script times that preparation with the models and runnables rebuilt on
+every request (the previous behavior) and with the cached ones. No request is
+sent: the LLM is a ChatOpenAI client with a dummy key, binding only builds the
+tool definition locally.
+
+    python benchmarks/guardrail_overhead.py
+    python benchmarks/guardrail_overhead.py --requests 500
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Import vinagent from this checkout, without `pip install -e .`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _time(prepare: Callable[[], object], requests: int, runs: int) -> List[float]:
+    """Microseconds per request of each of ``runs`` runs of ``requests`` requests."""
+    totals = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(requests):
+            prepare()
+        totals.append((time.perf_counter() - start) / requests * 1e6)
+    return totals
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from langchain_openai import ChatOpenAI
+    from vinagent.guardrail import (
+        GuardrailDecision,
+        OutputGuardrailDecision,
+        PIIGuardrail,
+        PromptInjectionGuardrail,
+        ScopeGuardrail,
+        ToxicityGuardrail,
+        OutputPIIGuardrail,
+        HallucinationGuardrail,
+    )
+    from vinagent.structured import structured_output
+
+    llm = ChatOpenAI(model="gpt-4o-mini", api_key="sk-benchmark")
+    configurations = {
+        "input": (
+            GuardrailDecision,
+            [
+                PIIGuardrail(),
+                ScopeGuardrail(agent_scope=("Deeply analyzing financial markets",)),
+                ToxicityGuardrail(),
+                PromptInjectionGuardrail(),
+            ],
+        ),
+        "output": (
+            OutputGuardrailDecision,
+            [OutputPIIGuardrail(), HallucinationGuardrail()],
+        ),
+    }
+
+    print(
+        f"Guardrail preparation per request ({args.requests} requests x {args.runs} runs)"
+    )
+    for name, (decision_cls, guardrails) in configurations.items():
+
+        def rebuilt():
+            DecisionModel = decision_cls._build_decision_model(guardrails)
+            return llm.with_structured_output(DecisionModel)
+
+        def cached():
+            DecisionModel = decision_cls.add_guardrails(guardrails)
+            return structured_output(llm, DecisionModel)
+
+        before = statistics.median(_time(rebuilt, args.requests, args.runs))
+        after = statistics.median(_time(cached, args.requests, args.runs))
+        print(
+            f"  {name:<7} rebuilt {before:9.1f}us   cached {after:7.1f}us   "
+            f"x{before / after:.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
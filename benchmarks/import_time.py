@@ -0,0 +1,117 @@
+"""
+Import-time benchmark of vinagent with a regression budget.
+
+Each run imports the target in a fresh interpreter with ``python -X importtime``
+and reads the cumulative time of the target from stderr. The script exits with
+status 1 when the median exceeds the budget, or when a module that must stay
+lazy was imported, so it can run in CI:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --target vinagent.agent:Agent --budget-ms 1500 --top 15
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+# Optional or heavy dependencies that `from vinagent.agent import Agent` must not load
+DEFAULT_FORBIDDEN = [
+    "langchain_together",
+    "langchain_openai",
+    "aucodb.graph",
+    "mcp",
+    "mlflow",
+    "IPython",
+    "vinagent.graph",
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def _statement(target: str) -> str:
+    if ":" in target:
+        module, name = target.split(":", 1)
+        return f"from {module} import {name}"
+    return f"import {target}"
+
+
+def measure(target: str) -> Tuple[Dict[str, int], Set[str]]:
+    """
+    Import ``target`` in a fresh interpreter.
+
+    Returns:
+        Tuple[Dict[str, int], Set[str]]: Cumulative microseconds per top-level
+            import, and the names of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _statement(target)],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr}")
+    cumulative: Dict[str, int] = {}
+    modules: Set[str] = set()
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        _, total, indent, name = match.groups()
+        modules.add(name)
+        # Top-level imports (no indentation) add up to the whole import time
+        if len(indent) == 1:
+            cumulative[name] = int(total)
+    return cumulative, modules
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", default="vinagent.agent:Agent")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--forbid",
+        default=",".join(DEFAULT_FORBIDDEN),
+        help="Comma separated modules that must not be imported",
+    )
+    args = parser.parse_args(argv)
+
+    totals = []
+    cumulative: Dict[str, int] = {}
+    modules: Set[str] = set()
+    for _ in range(args.runs):
+        cumulative, modules = measure(args.target)
+        totals.append(sum(cumulative.values()) / 1000)
+    median = statistics.median(totals)
+
+    print(f"{_statement(args.target)}: median {median:.0f}ms over {args.runs} runs")
+    print(f"  runs: {', '.join(f'{total:.0f}ms' for total in totals)}")
+    print(f"  heaviest top-level imports (last run):")
+    heaviest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)
+    for name, total in heaviest[: args.top]:
+        print(f"    {total / 1000:8.1f}ms  {name}")
+
+    status = 0
+    forbidden = [name.strip() for name in args.forbid.split(",") if name.strip()]
+    loaded = sorted(
+        name
+        for name in forbidden
+        if any(module == name or module.startswith(name + ".") for module in modules)
+    )
+    if loaded:
+        print(f"FAIL: lazily imported modules were loaded: {', '.join(loaded)}")
+        status = 1
+    if median > args.budget_ms:
+        print(f"FAIL: median {median:.0f}ms exceeds the {args.budget_ms:.0f}ms budget")
+        status = 1
+    if status == 0:
+        print(f"OK: within the {args.budget_ms:.0f}ms budget")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,16 @@
-from .agent import Agent
+from typing import TYPE_CHECKING
+from vinagent.lazy import lazy_exports
 
-__all__ = ["Agent"]
+_EXPORTS = {
+    "Agent": ".agent",
+    "BatchResult": ".batch",
+    "BatchResults": ".batch",
+    "BatchStats": ".batch",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .agent import Agent
+    from .batch import BatchResult, BatchResults, BatchStats
@@ -1,39 +1,42 @@
 from abc import ABC, abstractmethod
 from typing import (
+    TYPE_CHECKING,
     Any,
     Awaitable,
+    Callable,
     List,
     AsyncGenerator,
+    AsyncIterator,
+    Dict,
     Generator,
+    Iterable,
+    Iterator,
     TypedDict,
     Optional,
+    Tuple,
     Union,
 )
 from typing_extensions import is_typeddict
 import asyncio
 import json
 import re
+import sys
 import yaml
 from pydantic import BaseModel, Field
 from pathlib import Path
-from langchain_together import ChatTogether
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai.chat_models.base import BaseChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_core.messages.tool import ToolMessage
 from langchain_core.messages.ai import AIMessageChunk
 from langchain_core.tools import BaseTool
-from langgraph.checkpoint.memory import MemorySaver
 import logging
-import mlflow
-from mlflow.entities import SpanType
 from vinagent.register.tool import ToolManager
+from vinagent.register.process import ProcessLimits
+from vinagent.register.worker_pool import PythonWorkerPool
+from vinagent.register.cache import ToolResultCache
 from vinagent.memory.memory import Memory
 from vinagent.memory.history import InConversationHistory
-from vinagent.mcp.client import DistributedMCPClient
-from vinagent.graph.function_graph import FunctionStateGraph
-from vinagent.graph.operator import FlowStateGraph
-from vinagent.oauth2.client import AuthenCard
+from vinagent.memory.session import SessionStore
 from vinagent.guardrail import (
     GuardRailBase,
     GuardrailDecision,
@@ -44,12 +47,27 @@ from vinagent.register.tool import ToolCall
 from vinagent.prompt.agent_prompt import PromptHandler
 from vinagent.message.adapter import adapter_ai_response_with_tool_calls
 from vinagent.executor.guardrail import GuardrailExecutor
+from vinagent.guardrail.parallel import guardrail_scope
 from vinagent.executor.graph_executor import GraphExecutor
 from vinagent.executor.invoke import InvokeExecutor
 from vinagent.executor.ainvoke import AsyncInvokeExecutor
 from vinagent.executor.stream import StreamInvokeExecutor
 from vinagent.executor.astream import AsyncStreamInvokeExecutor
 from vinagent.executor.base import AgentResponse
+from vinagent.agent.batch import (
+    BatchResult,
+    BatchResults,
+    aiter_batch,
+    arun_batch,
+    iter_batch,
+    run_batch,
+)
+
+if TYPE_CHECKING:
+    from langchain_together import ChatTogether
+    from langchain_openai.chat_models.base import BaseChatOpenAI
+    from vinagent.mcp.client import DistributedMCPClient
+    from vinagent.oauth2.client import AuthenCard
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -57,6 +75,9 @@ logger = logging.getLogger(__name__)
 
 
 def is_jupyter_notebook():
+    # A notebook kernel has already imported IPython: never pay its import otherwise
+    if "IPython" not in sys.modules:
+        return False
     try:
         from IPython import get_ipython
 
@@ -81,7 +102,7 @@ class AgentMeta(ABC):
     @abstractmethod
     def __init__(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         tools: List[Union[str, BaseTool]] = [],
         *args,
         **kwargs,
@@ -257,7 +278,7 @@ class Agent(AgentMeta):
 
     def __init__(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         name: str = "default_name",
         tools: List[Union[str, BaseTool]] = [],
         tools_path: Path = Path("templates/tools.json"),
@@ -272,13 +293,33 @@ class Agent(AgentMeta):
         memory_path: Path = None,
         is_reset_memory: bool = False,
         num_buffered_messages: int = 10,
-        mcp_client: DistributedMCPClient = None,
+        mcp_client: "DistributedMCPClient" = None,
         mcp_server_name: str = None,
         is_pii: bool = False,
-        authen_card: AuthenCard = None,
+        authen_card: "AuthenCard" = None,
         input_guardrail: GuardrailDecision = None,
         output_guardrail: OutputGuardrailDecision = None,
         guardrail_manager: GuardrailManager = None,
+        tool_top_k: int = None,
+        pinned_tools: list[str] = [],
+        max_tool_concurrency: int = 4,
+        max_sessions: int = 1024,
+        session_ttl: float = None,
+        session_spill_dir: Path = None,
+        memory_backend: str = "sqlite",
+        is_background_memory: bool = False,
+        memory_batch_size: int = 8,
+        memory_top_k: int = 20,
+        memory_max_tokens: int = None,
+        history_max_tokens: int = None,
+        tool_message_max_tokens: int = None,
+        token_counter: Callable[[str], int] = None,
+        tool_output_summarizer: Callable[[str], str] = None,
+        is_stream_tool_output: bool = False,
+        skill_limits: ProcessLimits = None,
+        python_worker_pool: PythonWorkerPool = None,
+        tool_result_cache: ToolResultCache = None,
+        fuse_input_guardrail: bool = False,
         *args,
         **kwargs,
     ):
@@ -332,9 +373,51 @@ class Agent(AgentMeta):
         is_reset_memory : bool, optional
             A flag indicating whether the agent should reset its graph memory when re-initializes it's memory. Defaults to False. Only valid if memory is not None.
 
+        memory_backend: str, optional
+            Storage of the graph memory, "sqlite" (indexed, concurrent-safe; an existing json memory file is migrated) or "json". Defaults to "sqlite".
+
+        is_background_memory: bool, optional
+            Extract and save memory in background worker threads instead of the request path. Use `flush_memory` to wait for pending writes. Defaults to False.
+
+        memory_batch_size: int, optional
+            Maximum number of messages extracted in one LLM call by the background memory workers. Defaults to 8.
+
+        memory_top_k: int, optional
+            Number of memory facts most relevant to the query that are injected into the prompt. None injects the whole user memory. Defaults to 20.
+
+        memory_max_tokens: int, optional
+            Approximate token budget of the memory injected into the prompt. Defaults to None (no cap).
+
         num_buffered_messages: int
             An buffered memory, which is not stored to memory, just existed in a runtime conversation. Default is a list of last 10 messages.
 
+        history_max_tokens: int, optional
+            Token budget of the buffered messages sent to the LLM. Older messages beyond it are left out; a tool call is never split from its results. Defaults to None (no budget).
+
+        tool_message_max_tokens: int, optional
+            Tool results longer than this are truncated (head and tail kept) or summarized by tool_output_summarizer before entering the history. Defaults to None.
+
+        token_counter: Callable[[str], int], optional
+            Token counting function of the history budget, e.g. a tiktoken encoder length. Defaults to an estimate of 4 characters per token.
+
+        tool_output_summarizer: Callable[[str], str], optional
+            Function shortening oversized tool results instead of the head and tail truncation. Defaults to None.
+
+        is_stream_tool_output: bool, optional
+            If True, `stream` and `astream` also yield the output of running agentskill commands as ToolMessageChunk. Defaults to False.
+
+        skill_limits: ProcessLimits, optional
+            Timeout, CPU, memory and captured output limits of agentskill commands. Defaults to ProcessLimits() (10 minutes timeout, 32KB of output kept).
+
+        python_worker_pool: PythonWorkerPool, optional
+            Warm interpreters, with modules such as pandas preloaded, running the python-code commands of agentskill tools. Their output is returned once the command is done, not streamed. Defaults to None (a new interpreter per command).
+
+        tool_result_cache: ToolResultCache, optional
+            Cache of the results of deterministic tools, those declared with `@primary_function(cache_ttl=...)` or `ToolManager.set_cache_policy`. Defaults to an in-memory LRU cache; pass ToolResultCache(DiskCacheBackend(...)) to share results across processes.
+
+        fuse_input_guardrail: bool, optional
+            If True, the input guardrail verdict is returned by the first tool-decision LLM call, as an ``input_guardrail`` field of its response, instead of separate guardrail calls. Tools run only once the verdict allows the input. Compiled graphs keep the separate check. Defaults to False.
+
         mcp_client : DistributedMCPClient, optional
             An instance of a DistributedMCPClient used to register tools with the memory. Defaults to None.
 
@@ -356,6 +439,24 @@ class Agent(AgentMeta):
         guardrail_manager: GuardrailManager, optional
             An instance of GuardrailManager used to manage the guardrails. Defaults to None.
 
+        tool_top_k: int, optional
+            If set, only the top-k tools ranked by BM25 relevance to the query (plus pinned_tools) are sent to the LLM. Defaults to None, which sends all tools.
+
+        pinned_tools: list[str], optional
+            Names of tools always sent to the LLM when tool_top_k is set. Defaults to an empty list.
+
+        max_tool_concurrency: int, optional
+            Maximum number of independent tool calls of one step executed concurrently. Defaults to 4.
+
+        max_sessions: int, optional
+            Maximum number of conversation sessions, keyed by (user_id, thread_id), kept in memory. Defaults to 1024.
+
+        session_ttl: float, optional
+            Seconds of inactivity after which a session is evicted from memory. Defaults to None (no expiry).
+
+        session_spill_dir: Path, optional
+            Directory where evicted sessions are saved and restored from on their next call. Defaults to None (evicted sessions are dropped).
+
         *args, **kwargs : Any
             Additional arguments passed to the superclass or future extensions.
         """
@@ -388,9 +489,18 @@ class Agent(AgentMeta):
         self.tools_path.parent.mkdir(parents=True, exist_ok=True)
         self.is_reset_tools = is_reset_tools
         self.tools_manager = ToolManager(
-            llm=self.llm, tools_path=self.tools_path, is_reset_tools=self.is_reset_tools
+            llm=self.llm,
+            tools_path=self.tools_path,
+            is_reset_tools=self.is_reset_tools,
+            max_concurrency=max_tool_concurrency,
+            skill_limits=skill_limits,
+            python_worker_pool=python_worker_pool,
+            result_cache=tool_result_cache,
         )
+        self.is_stream_tool_output = is_stream_tool_output
         self.register_tools(self.tools)
+        self.tool_top_k = tool_top_k
+        self.pinned_tools = pinned_tools
         self.mcp_client = mcp_client
         self.mcp_server_name = mcp_server_name
 
@@ -398,18 +508,38 @@ class Agent(AgentMeta):
         self.memory_path = (
             Path(memory_path) if isinstance(memory_path, str) else memory_path
         )
-        if self.memory_path and (self.memory_path.suffix not in [".json", ".jsonl"]):
+        if self.memory_path and (
+            self.memory_path.suffix not in [".json", ".jsonl", ".db"]
+        ):
             raise ValueError(
-                "memory_path must be json format ending with .json or .jsonl. For example, 'templates/memory.json'"
+                "memory_path must end with .json, .jsonl or .db. For example, 'templates/memory.json'"
             )
         self.is_reset_memory = is_reset_memory
+        self.memory_top_k = memory_top_k
+        self.memory_max_tokens = memory_max_tokens
         self.memory = None
         if self.memory_path:
             self.memory = Memory(
-                memory_path=self.memory_path, is_reset_memory=self.is_reset_memory
+                memory_path=self.memory_path,
+                is_reset_memory=self.is_reset_memory,
+                backend=memory_backend,
             )
-        self.in_conversation_history = InConversationHistory(
-            messages=[], max_length=num_buffered_messages
+            if is_background_memory:
+                self.memory.enable_background_ingestion(
+                    self.llm, max_batch_size=memory_batch_size
+                )
+        # Conversation histories of every (user_id, thread_id) session
+        self.sessions = SessionStore(
+            max_sessions=max_sessions,
+            ttl=session_ttl,
+            spill_dir=session_spill_dir,
+            max_length=num_buffered_messages,
+            history_options={
+                "max_tokens": history_max_tokens,
+                "max_tool_message_tokens": tool_message_max_tokens,
+                "token_counter": token_counter,
+                "summarizer": tool_output_summarizer,
+            },
         )
 
         # Identify user
@@ -418,6 +548,9 @@ class Agent(AgentMeta):
         if not self.is_pii:
             self._user_id = "unknown_user"
         self._thread_id = thread_id
+        # (user_id, thread_id) of the latest invoke/ainvoke/stream/astream call,
+        # the default session of `in_conversation_history` and `get_history`
+        self._last_session: Tuple[str, str] = (self._user_id, self._thread_id)
         # OAuth2 authentication if enabled
         self.authen_card = authen_card
 
@@ -428,6 +561,8 @@ class Agent(AgentMeta):
             input_guardrail=self.input_guardrail,
             output_guardrail=self.output_guardrail,
             guardrail_manager=self.guardrail_manager,
+            llm=self.llm,
+            fuse_input_guardrail=fuse_input_guardrail,
         )
         self.invoke_executor = InvokeExecutor(
             llm=self.llm, guardrail_executor=self.guardrail_executor
@@ -440,6 +575,7 @@ class Agent(AgentMeta):
             guardrail_executor=self.guardrail_executor,
             user_id=self._user_id,
             thread_id=self._thread_id,
+            llm=self.llm,
         )
         self.stream_invoke_executor = StreamInvokeExecutor(
             llm=self.llm, guardrail_executor=self.guardrail_executor
@@ -482,6 +618,11 @@ class Agent(AgentMeta):
         if config_schema is not None and not is_typeddict(config_schema):
             raise TypeError("config_schema must be a TypedDict subclass")
 
+        # langgraph is only needed by agents running a flow
+        from langgraph.checkpoint.memory import MemorySaver
+        from vinagent.graph.function_graph import FunctionStateGraph
+        from vinagent.graph.operator import FlowStateGraph
+
         self.graph = (
             FunctionStateGraph(state_schema=state_schema, config_schema=config_schema)
             if isinstance(self.flow, FunctionStateGraph)
@@ -493,6 +634,12 @@ class Agent(AgentMeta):
             checkpointer=self.checkpoint, flow=self.flow
         )
 
+    def _defers_input_guardrail(self) -> bool:
+        """In the fused mode the first step-1 call checks the input, except on compiled graphs."""
+        return self.guardrail_executor.is_fused and not getattr(
+            self, "compiled_graph", None
+        )
+
     def register_tools(self, tools: List[str]) -> Any:
         """
         Register a list of tools.
@@ -510,6 +657,32 @@ class Agent(AgentMeta):
             else:
                 self.tools_manager.register_module_tool(tool)
 
+    @property
+    def in_conversation_history(self) -> InConversationHistory:
+        """
+        History of the last session, the (user_id, thread_id) of the latest call.
+
+        With concurrent calls for several users, the last session is whichever
+        call started last: use `get_history(user_id, thread_id)` instead.
+        """
+        return self.sessions.get(*self._last_session)
+
+    @in_conversation_history.setter
+    def in_conversation_history(self, history: InConversationHistory):
+        self.sessions.put(*self._last_session, history)
+
+    def get_history(
+        self, user_id: str = None, thread_id: str = None
+    ) -> InConversationHistory:
+        """
+        Return the conversation history of a session.
+
+        ``user_id`` and ``thread_id`` default to those of the last session (see
+        `in_conversation_history`), i.e. of the latest call.
+        """
+        last_user_id, last_thread_id = self._last_session
+        return self.sessions.get(user_id or last_user_id, thread_id or last_thread_id)
+
     @property
     def user_id(self):
         return self._user_id
@@ -518,6 +691,7 @@ class Agent(AgentMeta):
     def user_id(self, new_user_id):
         self._user_id = new_user_id
 
+    @guardrail_scope
     def invoke(
         self,
         query: str,
@@ -530,94 +704,118 @@ class Agent(AgentMeta):
     ) -> Any:
         # --- Auth & user setup ---
         self.authenticate()
-        self._user_id = user_id or self._user_id
-        logger.info(f"I am chatting with {self._user_id}")
+        user_id = user_id or self._user_id
+        thread_id = kwargs.get("thread_id") or self._thread_id
+        self._last_session = (user_id, thread_id)
+        with self.sessions.lease(user_id, thread_id) as history:
+            logger.info(f"I am chatting with {user_id}")
 
-        if self.memory and is_save_memory:
-            self.save_memory(query, user_id=self._user_id)
+            if self.memory and is_save_memory:
+                self.save_memory(query, user_id=user_id)
 
-        self.guardrail_executor.check_input_guardrail(query)
+            if not self._defers_input_guardrail():
+                self.guardrail_executor.check_input_guardrail(query)
 
-        # --- Compiled graph path ---
-        if getattr(self, "compiled_graph", None):
-            return self.graph_executor._invoke_compiled_graph(
+            # --- Compiled graph path ---
+            if getattr(self, "compiled_graph", None):
+                return self.graph_executor._invoke_compiled_graph(
+                    query=query,
+                    user_id=user_id,
+                    history=history,
+                    memory=self.memory,
+                    is_save_memory=is_save_memory,
+                    **kwargs,
+                )
+
+            # --- Tool calling loop ---
+            current_query = query
+            tool_messages = None
+            tool_names = self.invoke_executor._step0_retrieve_tools(
+                query=query,
+                tools_manager=self.tools_manager,
+                top_k=self.tool_top_k,
+                pinned_tools=self.pinned_tools,
+            )
+            memory_context = self.invoke_executor._step0_retrieve_memory(
                 query=query,
-                user_id=user_id,
-                history=self.in_conversation_history,
                 memory=self.memory,
-                is_save_memory=is_save_memory,
-                **kwargs,
+                user_id=user_id,
+                top_k=self.memory_top_k,
+                max_tokens=self.memory_max_tokens,
             )
 
-        # --- Tool calling loop ---
-        current_query = query
-        tool_message = None
+            for iteration in range(1, max_iterations + 1):
+                logger.info(f"Tool calling iteration {iteration}/{max_iterations}")
 
-        for iteration in range(1, max_iterations + 1):
-            logger.info(f"Tool calling iteration {iteration}/{max_iterations}")
+                # Step 1: LLM invoke
+                response = self.invoke_executor._step1_llm_define_tool(
+                    iteration=iteration,
+                    max_history=max_history,
+                    user_id=user_id,
+                    message=current_query,
+                    tools_manager=self.tools_manager,
+                    memory=memory_context,
+                    skills=self.skills,
+                    description=self.description,
+                    instruction=self.instruction,
+                    history=history,
+                    tool_names=tool_names,
+                )
 
-            # Step 1: LLM invoke
-            response = self.invoke_executor._step1_llm_define_tool(
-                iteration=iteration,
+                # Early exit: direct answer with no tool needed
+                if not getattr(response, "requires_tool", False) and getattr(
+                    response, "answer", None
+                ):
+                    answer = response.answer
+                    logger.info(
+                        f"No more tool calls needed. Completed in {iteration} iterations."
+                    )
+                    self.guardrail_executor.check_output_guardrail(answer)
+                    if self.memory and is_save_memory:
+                        self.save_memory(message=answer, user_id=user_id)
+                    return AIMessage(content=answer)
+
+                # Step 2: Tool invoke
+                current_query, tool_messages, should_continue = (
+                    self.invoke_executor._step2_tool_invoke(
+                        current_query=current_query,
+                        response=response,
+                        tools_manager=self.tools_manager,
+                        history=history,
+                        mcp_client=self.mcp_client,
+                        mcp_server_name=self.mcp_server_name,
+                    )
+                )
+
+                if not should_continue:
+                    # Step 2 found a direct answer (no tool needed)
+                    answer = getattr(response, "answer", None) or ""
+                    self.guardrail_executor.check_output_guardrail(answer)
+                    if self.memory and is_save_memory:
+                        self.save_memory(message=answer, user_id=user_id)
+                    return AIMessage(content=answer)
+
+            # Step 3: Max iterations reached — format final response
+            logger.warning(
+                f"Reached maximum iterations ({max_iterations}). Stopping tool calling loop."
+            )
+            return self.invoke_executor._step3_final_response(
+                query=current_query,
+                tool_messages=tool_messages,
+                is_tool_formatted=is_tool_formatted,
+                is_save_memory=is_save_memory,
                 max_history=max_history,
+                history=history,
+                memory=self.memory,
                 user_id=user_id,
-                message=current_query,
                 tools_manager=self.tools_manager,
-                memory=self.memory,
                 skills=self.skills,
                 description=self.description,
                 instruction=self.instruction,
-                history=self.in_conversation_history,
-            )
-
-            # Early exit: direct answer with no tool needed
-            if not getattr(response, "requires_tool", False) and getattr(
-                response, "answer", None
-            ):
-                answer = response.answer
-                logger.info(
-                    f"No more tool calls needed. Completed in {iteration} iterations."
-                )
-                self.guardrail_executor.check_output_guardrail(answer)
-                if self.memory and is_save_memory:
-                    self.save_memory(message=answer, user_id=self._user_id)
-                return AIMessage(content=answer)
-
-            # Step 2: Tool invoke
-            current_query, tool_message, should_continue = (
-                self.invoke_executor._step2_tool_invoke(
-                    current_query=current_query,
-                    response=response,
-                    tools_manager=self.tools_manager,
-                    history=self.in_conversation_history,
-                    mcp_client=self.mcp_client,
-                    mcp_server_name=self.mcp_server_name,
-                )
+                tool_names=tool_names,
             )
 
-            if not should_continue:
-                # Step 2 found a direct answer (no tool needed)
-                answer = getattr(response, "answer", None) or ""
-                self.guardrail_executor.check_output_guardrail(answer)
-                if self.memory and is_save_memory:
-                    self.save_memory(message=answer, user_id=self._user_id)
-                return AIMessage(content=answer)
-
-        # Step 3: Max iterations reached — format final response
-        logger.warning(
-            f"Reached maximum iterations ({max_iterations}). Stopping tool calling loop."
-        )
-        return self.invoke_executor._step3_final_response(
-            query=current_query,
-            tool_message=tool_message,
-            is_tool_formatted=is_tool_formatted,
-            is_save_memory=is_save_memory,
-            max_history=max_history,
-            history=self.in_conversation_history,
-            memory=self.memory,
-            user_id=user_id,
-        )
-
+    @guardrail_scope
     async def ainvoke(
         self,
         query: str,
@@ -629,94 +827,125 @@ class Agent(AgentMeta):
         **kwargs,
     ) -> Awaitable[Any]:
         # --- Auth & user setup ---
-        self.authenticate()
-        self._user_id = user_id or self._user_id
-        logger.info(f"I am chatting with {self._user_id}")
+        await asyncio.to_thread(self.authenticate)
+        user_id = user_id or self._user_id
+        thread_id = kwargs.get("thread_id") or self._thread_id
+        self._last_session = (user_id, thread_id)
+        with self.sessions.lease(user_id, thread_id) as history:
+            logger.info(f"I am chatting with {user_id}")
 
-        if self.memory and is_save_memory:
-            self.save_memory(query, user_id=self._user_id)
+            if self.memory and is_save_memory:
+                await self.asave_memory(query, user_id=user_id)
 
-        self.guardrail_executor.check_input_guardrail(query)
+            if not self._defers_input_guardrail():
+                await self.guardrail_executor.acheck_input_guardrail(query)
 
-        # --- Compiled graph path ---
-        if getattr(self, "compiled_graph", None):
-            return await self.graph_executor._invoke_compiled_graph_async(
+            # --- Compiled graph path ---
+            if getattr(self, "compiled_graph", None):
+                return await self.graph_executor._invoke_compiled_graph_async(
+                    query=query,
+                    user_id=user_id,
+                    history=history,
+                    memory=self.memory,
+                    is_save_memory=is_save_memory,
+                    **kwargs,
+                )
+
+            # --- Tool calling loop ---
+            current_query = query
+            tool_messages = None
+            # Refreshes the registry and scores every tool: keep it off the event loop
+            tool_names = await asyncio.to_thread(
+                self.async_invoke_executor._step0_retrieve_tools,
+                query=query,
+                tools_manager=self.tools_manager,
+                top_k=self.tool_top_k,
+                pinned_tools=self.pinned_tools,
+            )
+            memory_context = await asyncio.to_thread(
+                self.async_invoke_executor._step0_retrieve_memory,
                 query=query,
-                user_id=user_id,
-                history=self.in_conversation_history,
                 memory=self.memory,
-                is_save_memory=is_save_memory,
-                **kwargs,
+                user_id=user_id,
+                top_k=self.memory_top_k,
+                max_tokens=self.memory_max_tokens,
             )
 
-        # --- Tool calling loop ---
-        current_query = query
-        tool_message = None
+            for iteration in range(1, max_iterations + 1):
+                logger.info(
+                    f"Async tool calling iteration {iteration}/{max_iterations}"
+                )
+
+                # Step 1: LLM invoke (async structured output)
+                response = (
+                    await self.async_invoke_executor._step1_llm_define_tool_async(
+                        iteration=iteration,
+                        max_history=max_history,
+                        user_id=user_id,
+                        message=current_query,
+                        tools_manager=self.tools_manager,
+                        memory=memory_context,
+                        skills=self.skills,
+                        description=self.description,
+                        instruction=self.instruction,
+                        history=history,
+                        tool_names=tool_names,
+                    )
+                )
+
+                # Early exit: direct answer with no tool needed
+                if not getattr(response, "requires_tool", False) and getattr(
+                    response, "answer", None
+                ):
+                    answer = response.answer
+                    logger.info(
+                        f"No more tool calls needed. Completed in {iteration} iterations."
+                    )
+                    await self.guardrail_executor.acheck_output_guardrail(answer)
+                    if self.memory and is_save_memory:
+                        await self.asave_memory(message=answer, user_id=user_id)
+                    return AIMessage(content=answer)
+
+                # Step 2: Tool invoke (async variant — await replaces asyncio.run)
+                current_query, tool_messages, should_continue = (
+                    await self.async_invoke_executor._step2_tool_invoke_async(
+                        current_query=current_query,
+                        response=response,
+                        tools_manager=self.tools_manager,
+                        history=history,
+                        mcp_client=self.mcp_client,
+                        mcp_server_name=self.mcp_server_name,
+                    )
+                )
 
-        for iteration in range(1, max_iterations + 1):
-            logger.info(f"Async tool calling iteration {iteration}/{max_iterations}")
+                if not should_continue:
+                    answer = getattr(response, "answer", None) or ""
+                    await self.guardrail_executor.acheck_output_guardrail(answer)
+                    if self.memory and is_save_memory:
+                        await self.asave_memory(message=answer, user_id=user_id)
+                    return AIMessage(content=answer)
 
-            # Step 1: LLM invoke (reused directly — sync, no await needed)
-            response = await self.async_invoke_executor._step1_llm_define_tool_async(
-                iteration=iteration,
+            # Step 3: Max iterations reached — format final response (async variant)
+            logger.warning(
+                f"Reached maximum iterations ({max_iterations}). Stopping async tool calling loop."
+            )
+            return await self.async_invoke_executor._step3_final_response_async(
+                query=current_query,
+                tool_messages=tool_messages,
+                is_tool_formatted=is_tool_formatted,
+                is_save_memory=is_save_memory,
                 max_history=max_history,
+                history=history,
+                memory=self.memory,
                 user_id=user_id,
-                message=current_query,
                 tools_manager=self.tools_manager,
-                memory=self.memory,
                 skills=self.skills,
                 description=self.description,
                 instruction=self.instruction,
-                history=self.in_conversation_history,
+                tool_names=tool_names,
             )
 
-            # Early exit: direct answer with no tool needed
-            if not getattr(response, "requires_tool", False) and getattr(
-                response, "answer", None
-            ):
-                answer = response.answer
-                logger.info(
-                    f"No more tool calls needed. Completed in {iteration} iterations."
-                )
-                self.guardrail_executor.check_output_guardrail(answer)
-                if self.memory and is_save_memory:
-                    self.save_memory(message=answer, user_id=self._user_id)
-                return AIMessage(content=answer)
-
-            # Step 2: Tool invoke (async variant — await replaces asyncio.run)
-            current_query, tool_message, should_continue = (
-                await self.async_invoke_executor._step2_tool_invoke_async(
-                    current_query=current_query,
-                    response=response,
-                    tools_manager=self.tools_manager,
-                    history=self.in_conversation_history,
-                    mcp_client=self.mcp_client,
-                    mcp_server_name=self.mcp_server_name,
-                )
-            )
-
-            if not should_continue:
-                answer = getattr(response, "answer", None) or ""
-                self.guardrail_executor.check_output_guardrail(answer)
-                if self.memory and is_save_memory:
-                    self.save_memory(message=answer, user_id=self._user_id)
-                return AIMessage(content=answer)
-
-        # Step 3: Max iterations reached — format final response (async variant)
-        logger.warning(
-            f"Reached maximum iterations ({max_iterations}). Stopping async tool calling loop."
-        )
-        return await self.async_invoke_executor._step3_final_response_async(
-            query=current_query,
-            tool_message=tool_message,
-            is_tool_formatted=is_tool_formatted,
-            is_save_memory=is_save_memory,
-            max_history=max_history,
-            history=self.in_conversation_history,
-            memory=self.memory,
-            user_id=user_id,
-        )
-
+    @guardrail_scope
     def stream(
         self,
         query: str,
@@ -759,134 +988,168 @@ class Agent(AgentMeta):
         """
         # --- Auth & user setup ---
         self.authenticate()
-        self._user_id = user_id or self._user_id
-        logger.info(f"I am chatting with {self._user_id}")
+        user_id = user_id or self._user_id
+        thread_id = kwargs.get("thread_id") or self._thread_id
+        self._last_session = (user_id, thread_id)
+        with self.sessions.lease(user_id, thread_id) as history:
+            logger.info(f"I am chatting with {user_id}")
 
-        if self.memory and is_save_memory:
-            self.save_memory(query, user_id=self._user_id)
+            if self.memory and is_save_memory:
+                self.save_memory(query, user_id=user_id)
 
-        self.guardrail_executor.check_input_guardrail(query)
+            if not self._defers_input_guardrail():
+                self.guardrail_executor.check_input_guardrail(query)
 
-        try:
-            # --- Compiled graph path ---
-            if (
-                getattr(self, "compiled_graph", None)
-                and self.compiled_graph is not None
-            ):
-                result = []
-                thread_id = kwargs.get("thread_id", self._thread_id)
-                input_state = self.graph_executor.initialize_state(
-                    query=query, user_id=user_id, thread_id=thread_id
-                )
-                for chunk in self.compiled_graph.stream(**input_state):
-                    for v in chunk.values():
-                        if v:
-                            result += v["messages"]
-                            yield v
-                self.guardrail_executor.check_output_guardrail(result)
-                if self.memory and is_save_memory:
-                    self.save_memory(message=result, user_id=self._user_id)
-                yield result
-                return
-
-            # --- Tool calling loop ---
-            current_query = query
-            tool_message = None
-
-            for iteration in range(1, max_iterations + 1):
-                logger.info(
-                    f"Streaming tool calling iteration {iteration}/{max_iterations}"
-                )
+            try:
+                # --- Compiled graph path ---
+                if (
+                    getattr(self, "compiled_graph", None)
+                    and self.compiled_graph is not None
+                ):
+                    result = []
+                    thread_id = kwargs.get("thread_id", self._thread_id)
+                    input_state = self.graph_executor.initialize_state(
+                        query=query, user_id=user_id, thread_id=thread_id
+                    )
+                    for chunk in self.compiled_graph.stream(**input_state):
+                        for v in chunk.values():
+                            if v:
+                                result += v["messages"]
+                                yield v
+                    self.guardrail_executor.check_output_guardrail(result)
+                    if self.memory and is_save_memory:
+                        self.save_memory(message=result, user_id=user_id)
+                    yield result
+                    return
 
-                # Step 1: Ask LLM (structured output) whether a tool is needed
-                response = self.stream_invoke_executor._step1_llm_define_tool(
-                    iteration=iteration,
-                    max_history=max_history,
-                    user_id=user_id,
-                    message=current_query,
+                # --- Tool calling loop ---
+                current_query = query
+                tool_messages = None
+                tool_names = self.stream_invoke_executor._step0_retrieve_tools(
+                    query=query,
                     tools_manager=self.tools_manager,
+                    top_k=self.tool_top_k,
+                    pinned_tools=self.pinned_tools,
+                )
+                memory_context = self.stream_invoke_executor._step0_retrieve_memory(
+                    query=query,
                     memory=self.memory,
-                    skills=self.skills,
-                    description=self.description,
-                    instruction=self.instruction,
-                    history=self.in_conversation_history,
+                    user_id=user_id,
+                    top_k=self.memory_top_k,
+                    max_tokens=self.memory_max_tokens,
                 )
-                logger.info(f"response: {response}")
-                # Early exit: direct answer — stream it token-by-token
-                if not getattr(response, "requires_tool", False) and getattr(
-                    response, "answer", None
-                ):
+
+                for iteration in range(1, max_iterations + 1):
                     logger.info(
-                        f"No tool needed. Streaming direct answer (iteration {iteration})."
+                        f"Streaming tool calling iteration {iteration}/{max_iterations}"
                     )
-                    answer_text = response.answer
-                    for chunk in answer_text:
-                        chunk = AIMessageChunk(content=chunk)
-                        yield chunk
-                    self.guardrail_executor.check_output_guardrail(answer_text)
-                    full_chunk = AIMessage(content=answer_text)
-                    self.in_conversation_history.add_message(full_chunk)
-                    # Stream the direct answer chunk-by-chunk via a short llm.stream call
-                    # Re-add message to history so the next prompt is correct
-                    if self.memory and is_save_memory:
-                        self.save_memory(
-                            message=full_chunk.content, user_id=self._user_id
+
+                    # Step 1: Ask LLM (structured output) whether a tool is needed
+                    response = self.stream_invoke_executor._step1_llm_define_tool(
+                        iteration=iteration,
+                        max_history=max_history,
+                        user_id=user_id,
+                        message=current_query,
+                        tools_manager=self.tools_manager,
+                        memory=memory_context,
+                        skills=self.skills,
+                        description=self.description,
+                        instruction=self.instruction,
+                        history=history,
+                        tool_names=tool_names,
+                    )
+                    logger.info(f"response: {response}")
+                    # Early exit: direct answer — stream it token-by-token
+                    if not getattr(response, "requires_tool", False) and getattr(
+                        response, "answer", None
+                    ):
+                        logger.info(
+                            f"No tool needed. Streaming direct answer (iteration {iteration})."
                         )
-                    if answer_text:
-                        try:
-                            tool_call = json.loads(answer_text)
-                            logger.info(
-                                "Detected JSON tool call in answer, preparing next iteration."
-                            )
-                            current_query = AIMessage(
-                                content=f"Let's call tool: {json.dumps(tool_call)}"
+                        answer_text = response.answer
+                        for chunk in answer_text:
+                            chunk = AIMessageChunk(content=chunk)
+                            yield chunk
+                        self.guardrail_executor.check_output_guardrail(answer_text)
+                        full_chunk = AIMessage(content=answer_text)
+                        history.add_message(full_chunk)
+                        # Stream the direct answer chunk-by-chunk via a short llm.stream call
+                        # Re-add message to history so the next prompt is correct
+                        if self.memory and is_save_memory:
+                            self.save_memory(
+                                message=full_chunk.content, user_id=user_id
                             )
-                            continue
-
-                        except json.JSONDecodeError:
-                            return
-
-                # Step 2: Execute the tool (synchronous — no streaming here)
-                logging.info(f"current_query: {current_query}")
-                current_query, tool_message, should_continue = (
-                    self.stream_invoke_executor._step2_tool_invoke(
+                        if answer_text:
+                            try:
+                                tool_call = json.loads(answer_text)
+                                logger.info(
+                                    "Detected JSON tool call in answer, preparing next iteration."
+                                )
+                                current_query = AIMessage(
+                                    content=f"Let's call tool: {json.dumps(tool_call)}"
+                                )
+                                continue
+
+                            except json.JSONDecodeError:
+                                return
+
+                    # Step 2: Execute the tool, streaming its output if requested
+                    logging.info(f"current_query: {current_query}")
+                    step2_kwargs = dict(
                         current_query=current_query,
                         response=response,
                         tools_manager=self.tools_manager,
-                        history=self.in_conversation_history,
+                        history=history,
                         mcp_client=self.mcp_client,
                         mcp_server_name=self.mcp_server_name,
                     )
-                )
-
-                if not should_continue:
-                    # No tool was executed — yield the direct answer
-                    answer_text = getattr(response, "answer", None) or ""
-                    self.guardrail_executor.check_output_guardrail(answer_text)
-                    if self.memory and is_save_memory:
-                        self.save_memory(message=answer_text, user_id=self._user_id)
-                    yield AIMessage(content=answer_text)
-                    return
+                    if self.is_stream_tool_output:
+                        current_query, tool_messages, should_continue = (
+                            yield from self.stream_invoke_executor._step2_tool_invoke_stream(
+                                **step2_kwargs
+                            )
+                        )
+                    else:
+                        current_query, tool_messages, should_continue = (
+                            self.stream_invoke_executor._step2_tool_invoke(
+                                **step2_kwargs
+                            )
+                        )
 
-            # Step 3: Max iterations — stream the final LLM summary
-            logger.warning(
-                f"Reached maximum iterations ({max_iterations}). Stopping streaming loop."
-            )
-            yield from self.stream_invoke_executor._step3_final_response_stream(
-                query=current_query,
-                tool_message=tool_message,
-                is_tool_formatted=is_tool_formatted,
-                is_save_memory=is_save_memory,
-                max_history=max_history,
-                history=self.in_conversation_history,
-                memory=self.memory,
-                user_id=user_id,
-            )
+                    if not should_continue:
+                        # No tool was executed — yield the direct answer
+                        answer_text = getattr(response, "answer", None) or ""
+                        self.guardrail_executor.check_output_guardrail(answer_text)
+                        if self.memory and is_save_memory:
+                            self.save_memory(message=answer_text, user_id=user_id)
+                        yield AIMessage(content=answer_text)
+                        return
+
+                # Step 3: Max iterations — stream the final LLM summary
+                logger.warning(
+                    f"Reached maximum iterations ({max_iterations}). Stopping streaming loop."
+                )
+                yield from self.stream_invoke_executor._step3_final_response_stream(
+                    query=current_query,
+                    tool_messages=tool_messages,
+                    is_tool_formatted=is_tool_formatted,
+                    is_save_memory=is_save_memory,
+                    max_history=max_history,
+                    history=history,
+                    memory=self.memory,
+                    user_id=user_id,
+                    tools_manager=self.tools_manager,
+                    skills=self.skills,
+                    description=self.description,
+                    instruction=self.instruction,
+                    tool_names=tool_names,
+                )
 
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            logger.error(f"An error occurred during streaming: {str(e)}")
-            yield AIMessage(content=f"An error occurred: {str(e)}")
+            except (json.JSONDecodeError, KeyError, ValueError) as e:
+                logger.error(f"An error occurred during streaming: {str(e)}")
+                yield AIMessage(content=f"An error occurred: {str(e)}")
 
+    @guardrail_scope
     async def astream(
         self,
         query: str,
@@ -925,156 +1188,296 @@ class Agent(AgentMeta):
             or the final tool/LLM message.
         """
         # --- Auth & user setup ---
-        self.authenticate()
-        self._user_id = user_id or self._user_id
-        logger.info(f"I am chatting with {self._user_id}")
-
-        if self.memory and is_save_memory:
-            self.save_memory(query, user_id=self._user_id)
+        await asyncio.to_thread(self.authenticate)
+        user_id = user_id or self._user_id
+        thread_id = kwargs.get("thread_id") or self._thread_id
+        self._last_session = (user_id, thread_id)
+        with self.sessions.lease(user_id, thread_id) as history:
+            logger.info(f"I am chatting with {user_id}")
 
-        self.guardrail_executor.check_input_guardrail(query)
+            if self.memory and is_save_memory:
+                await self.asave_memory(query, user_id=user_id)
 
-        try:
-            # --- Compiled graph path ---
-            if (
-                getattr(self, "compiled_graph", None)
-                and self.compiled_graph is not None
-            ):
-                result = await self.graph_executor._invoke_compiled_graph_async(
-                    query=query,
-                    user_id=user_id,
-                    history=self.in_conversation_history,
-                    memory=self.memory,
-                    is_save_memory=is_save_memory,
-                    **kwargs,
-                )
-                yield result
-                return
+            if not self._defers_input_guardrail():
+                await self.guardrail_executor.acheck_input_guardrail(query)
 
-            # --- Tool calling loop ---
-            current_query = query
-            tool_message = None
-
-            for iteration in range(1, max_iterations + 1):
-                logger.info(
-                    f"Async streaming tool calling iteration {iteration}/{max_iterations}"
-                )
+            try:
+                # --- Compiled graph path ---
+                if (
+                    getattr(self, "compiled_graph", None)
+                    and self.compiled_graph is not None
+                ):
+                    result = await self.graph_executor._invoke_compiled_graph_async(
+                        query=query,
+                        user_id=user_id,
+                        history=history,
+                        memory=self.memory,
+                        is_save_memory=is_save_memory,
+                        **kwargs,
+                    )
+                    yield result
+                    return
 
-                response = await self.async_stream_invoke_executor._step1_llm_define_tool_async(
-                    iteration=iteration,
-                    max_history=max_history,
-                    user_id=user_id,
-                    message=current_query,
+                # --- Tool calling loop ---
+                current_query = query
+                tool_messages = None
+                # Refreshes the registry and scores every tool: keep it off the event loop
+                tool_names = await asyncio.to_thread(
+                    self.async_stream_invoke_executor._step0_retrieve_tools,
+                    query=query,
                     tools_manager=self.tools_manager,
+                    top_k=self.tool_top_k,
+                    pinned_tools=self.pinned_tools,
+                )
+                memory_context = await asyncio.to_thread(
+                    self.async_stream_invoke_executor._step0_retrieve_memory,
+                    query=query,
                     memory=self.memory,
-                    skills=self.skills,
-                    description=self.description,
-                    instruction=self.instruction,
-                    history=self.in_conversation_history,
+                    user_id=user_id,
+                    top_k=self.memory_top_k,
+                    max_tokens=self.memory_max_tokens,
                 )
 
-                logger.info(f"Response from LLM: {response}")
-                # Early exit: direct answer — async-stream it token-by-token
-                if not getattr(response, "requires_tool", False) and getattr(
-                    response, "answer", None
-                ):
+                for iteration in range(1, max_iterations + 1):
                     logger.info(
-                        f"No tool needed. Async-streaming direct answer (iteration {iteration})."
+                        f"Async streaming tool calling iteration {iteration}/{max_iterations}"
                     )
-                    answer_text = response.answer
-                    for chunk in answer_text:
-                        chunk = AIMessageChunk(content=chunk)
-                        yield chunk
-                    self.guardrail_executor.check_output_guardrail(answer_text)
-                    full_chunk = AIMessage(content=answer_text)
-                    self.in_conversation_history.add_message(full_chunk)
-                    # Stream the direct answer chunk-by-chunk via a short llm.stream call
-                    # Re-add message to history so the next prompt is correct
-                    if self.memory and is_save_memory:
-                        self.save_memory(
-                            message=full_chunk.content, user_id=self._user_id
-                        )
-                    if answer_text:
-                        try:
-                            tool_call = json.loads(answer_text)
-                            logger.info(
-                                "Detected JSON tool call in answer, preparing next iteration."
-                            )
-                            current_query = AIMessage(
-                                content=f"Let's call tool: {json.dumps(tool_call)}"
-                            )
-                            continue
 
-                        except json.JSONDecodeError:
-                            return
+                    response = await self.async_stream_invoke_executor._step1_llm_define_tool_async(
+                        iteration=iteration,
+                        max_history=max_history,
+                        user_id=user_id,
+                        message=current_query,
+                        tools_manager=self.tools_manager,
+                        memory=memory_context,
+                        skills=self.skills,
+                        description=self.description,
+                        instruction=self.instruction,
+                        history=history,
+                        tool_names=tool_names,
+                    )
 
-                # Step 2: Execute tool asynchronously
-                current_query, tool_message, should_continue = (
-                    await self.async_stream_invoke_executor._step2_tool_invoke_async(
+                    logger.info(f"Response from LLM: {response}")
+                    # Early exit: direct answer — async-stream it token-by-token
+                    if not getattr(response, "requires_tool", False) and getattr(
+                        response, "answer", None
+                    ):
+                        logger.info(
+                            f"No tool needed. Async-streaming direct answer (iteration {iteration})."
+                        )
+                        answer_text = response.answer
+                        for chunk in answer_text:
+                            chunk = AIMessageChunk(content=chunk)
+                            yield chunk
+                        await self.guardrail_executor.acheck_output_guardrail(
+                            answer_text
+                        )
+                        full_chunk = AIMessage(content=answer_text)
+                        history.add_message(full_chunk)
+                        # Stream the direct answer chunk-by-chunk via a short llm.stream call
+                        # Re-add message to history so the next prompt is correct
+                        if self.memory and is_save_memory:
+                            await self.asave_memory(
+                                message=full_chunk.content, user_id=user_id
+                            )
+                        if answer_text:
+                            try:
+                                tool_call = json.loads(answer_text)
+                                logger.info(
+                                    "Detected JSON tool call in answer, preparing next iteration."
+                                )
+                                current_query = AIMessage(
+                                    content=f"Let's call tool: {json.dumps(tool_call)}"
+                                )
+                                continue
+
+                            except json.JSONDecodeError:
+                                return
+
+                    # Step 2: Execute tool asynchronously, streaming its output if requested
+                    step2_kwargs = dict(
                         current_query=current_query,
                         response=response,
                         tools_manager=self.tools_manager,
-                        history=self.in_conversation_history,
+                        history=history,
                         mcp_client=self.mcp_client,
                         mcp_server_name=self.mcp_server_name,
                     )
+                    if self.is_stream_tool_output:
+                        chunks = asyncio.Queue()
+                        step2 = asyncio.ensure_future(
+                            self.async_stream_invoke_executor._step2_tool_invoke_async(
+                                on_tool_output=chunks.put_nowait, **step2_kwargs
+                            )
+                        )
+                        async for (
+                            chunk
+                        ) in self.async_stream_invoke_executor._step2_tool_invoke_stream_async(
+                            step2, chunks
+                        ):
+                            yield chunk
+                        current_query, tool_messages, should_continue = step2.result()
+                    else:
+                        current_query, tool_messages, should_continue = (
+                            await self.async_stream_invoke_executor._step2_tool_invoke_async(
+                                **step2_kwargs
+                            )
+                        )
+
+                    if not should_continue:
+                        answer_text = getattr(response, "answer", None) or ""
+                        await self.guardrail_executor.acheck_output_guardrail(
+                            answer_text
+                        )
+                        if self.memory and is_save_memory:
+                            await self.asave_memory(
+                                message=answer_text, user_id=user_id
+                            )
+                        yield AIMessage(content=answer_text)
+                        return
+
+                # Step 3: Max iterations — async-stream final LLM summary
+                logger.warning(
+                    f"Reached maximum iterations ({max_iterations}). Stopping async streaming loop."
                 )
+                async for (
+                    chunk
+                ) in self.async_stream_invoke_executor._step3_final_response_astream(
+                    query=current_query,
+                    tool_messages=tool_messages,
+                    is_tool_formatted=is_tool_formatted,
+                    is_save_memory=is_save_memory,
+                    max_history=max_history,
+                    history=history,
+                    memory=self.memory,
+                    user_id=user_id,
+                    tools_manager=self.tools_manager,
+                    skills=self.skills,
+                    description=self.description,
+                    instruction=self.instruction,
+                    tool_names=tool_names,
+                ):
+                    yield chunk
 
-                if not should_continue:
-                    answer_text = getattr(response, "answer", None) or ""
-                    self.guardrail_executor.check_output_guardrail(answer_text)
-                    if self.memory and is_save_memory:
-                        self.save_memory(message=answer_text, user_id=self._user_id)
-                    yield AIMessage(content=answer_text)
-                    return
+            except (json.JSONDecodeError, KeyError, ValueError) as e:
+                logger.error(f"An error occurred during async streaming: {str(e)}")
+                yield AIMessage(content=f"An error occurred: {str(e)}")
 
-            # Step 3: Max iterations — async-stream final LLM summary
-            logger.warning(
-                f"Reached maximum iterations ({max_iterations}). Stopping async streaming loop."
-            )
-            async for (
-                chunk
-            ) in self.async_stream_invoke_executor._step3_final_response_astream(
-                query=current_query,
-                tool_message=tool_message,
-                is_tool_formatted=is_tool_formatted,
-                is_save_memory=is_save_memory,
-                max_history=max_history,
-                history=self.in_conversation_history,
-                memory=self.memory,
-                user_id=user_id,
-            ):
-                yield chunk
+    def batch(
+        self,
+        queries: Iterable[Union[str, Dict[str, Any]]],
+        max_concurrency: int = 8,
+        return_exceptions: bool = True,
+        keep_sessions: bool = False,
+        **kwargs,
+    ) -> BatchResults:
+        """
+        Invoke the agent on many queries with at most ``max_concurrency`` running at a time.
 
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            logger.error(f"An error occurred during async streaming: {str(e)}")
-            yield AIMessage(content=f"An error occurred: {str(e)}")
+        Each item runs in its own session (thread_id), so items never see each
+        other's conversation history, while the tools, sessions store, memory and
+        caches of the agent are shared.
+
+        Args:
+            queries: Queries, or dicts of `invoke` arguments with a ``query`` key.
+            max_concurrency (int): Number of items invoked concurrently.
+            return_exceptions (bool): Keep per-item errors in the results instead of raising the first one.
+            keep_sessions (bool): Keep the history of each item's session after it completes.
+            **kwargs: Default `invoke` arguments for every item.
+
+        Returns:
+            BatchResults: One BatchResult per query in input order, with ``.stats``.
+        """
+        return run_batch(
+            self, queries, max_concurrency, return_exceptions, keep_sessions, **kwargs
+        )
+
+    async def abatch(
+        self,
+        queries: Iterable[Union[str, Dict[str, Any]]],
+        max_concurrency: int = 8,
+        return_exceptions: bool = True,
+        keep_sessions: bool = False,
+        **kwargs,
+    ) -> BatchResults:
+        """Asynchronous `batch` over `ainvoke`."""
+        return await arun_batch(
+            self, queries, max_concurrency, return_exceptions, keep_sessions, **kwargs
+        )
+
+    def batch_as_completed(
+        self,
+        queries: Iterable[Union[str, Dict[str, Any]]],
+        max_concurrency: int = 8,
+        keep_sessions: bool = False,
+        **kwargs,
+    ) -> Iterator[BatchResult]:
+        """Like `batch`, but yield each BatchResult as soon as it completes."""
+        return iter_batch(self, queries, max_concurrency, keep_sessions, **kwargs)
+
+    def abatch_as_completed(
+        self,
+        queries: Iterable[Union[str, Dict[str, Any]]],
+        max_concurrency: int = 8,
+        keep_sessions: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[BatchResult]:
+        """Like `abatch`, but yield each BatchResult as soon as it completes."""
+        return aiter_batch(self, queries, max_concurrency, keep_sessions, **kwargs)
+
+    def _memory_text(self, message: Union[str, ToolMessage, AIMessage]) -> str:
+        if isinstance(message, str):
+            logging.info(f"Saved to memory the query: {message}")
+            return message
+        elif isinstance(message, AIMessage):
+            logging.info(f"Saved to memory the ai message: {message.content}")
+            return message.content
+        elif isinstance(message.artifact, str):
+            logging.info(f"Saved to memory the tool artifact: {message.artifact}")
+            return message.artifact
+        else:
+            logging.info(f"Saved to memory the tool content: {message.content}")
+            return message.content
 
     def save_memory(
         self, message: Union[ToolMessage, AIMessage], user_id: str = "unknown_user"
     ) -> None:
         """
-        Save the tool message to the memory
+        Save the tool message to the memory, in the background if is_background_memory is set
         """
         if self.memory:
-            if isinstance(message, str):
-                self.memory.save_short_term_memory(self.llm, message, user_id=user_id)
-                logging.info(f"Saved to memory the query: {message}")
-            elif isinstance(message, AIMessage):
-                self.memory.save_short_term_memory(
-                    self.llm, message.content, user_id=user_id
-                )
-                logging.info(f"Saved to memory the ai message: {message.content}")
-            elif isinstance(message.artifact, str):
-                self.memory.save_short_term_memory(
-                    self.llm, message.artifact, user_id=user_id
-                )
-                logging.info(f"Saved to memory the tool artifact: {message.artifact}")
-            else:
-                self.memory.save_short_term_memory(
-                    self.llm, message.content, user_id=user_id
-                )
-                logging.info(f"Saved to memory the tool content: {message.content}")
+            self.memory.ingest(self.llm, self._memory_text(message), user_id=user_id)
+
+    async def asave_memory(
+        self, message: Union[ToolMessage, AIMessage], user_id: str = "unknown_user"
+    ) -> None:
+        """
+        Save the message to the memory without blocking the event loop
+        """
+        if self.memory:
+            await self.memory.aingest(
+                self.llm, self._memory_text(message), user_id=user_id
+            )
+
+    def flush_memory(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the background memory workers saved every pending message.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Defaults to None (no limit).
+
+        Returns:
+            bool: True if the memory is up to date, False on timeout.
+        """
+        if self.memory:
+            return self.memory.flush(timeout=timeout)
+        return True
+
+    async def aflush_memory(self, timeout: Optional[float] = None) -> bool:
+        """Async version of `flush_memory`."""
+        if self.memory:
+            return await self.memory.aflush(timeout=timeout)
+        return True
 
     def function_tool(self, func: Any):
         return self.tools_manager.register_function_tool(func)
@@ -0,0 +1,295 @@
+import time
+import uuid
+import queue
+import asyncio
+import threading
+import logging
+import statistics
+from contextlib import aclosing, closing
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from pydantic import BaseModel, ConfigDict, Field
+
+if TYPE_CHECKING:
+    from vinagent.agent.agent import Agent
+
+logger = logging.getLogger(__name__)
+
+# A query, or the keyword arguments of one invoke call (with a "query" key)
+BatchInput = Union[str, Dict[str, Any]]
+
+
+class BatchResult(BaseModel):
+    """Outcome of one item of a batch."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: int = Field(description="Position of the item in the batch")
+    query: str
+    thread_id: str = Field(description="Session the item ran in")
+    output: Any = None
+    error: Optional[Exception] = None
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchStats(BaseModel):
+    """Throughput and latency of a batch."""
+
+    total: int
+    succeeded: int
+    failed: int
+    elapsed: float = Field(description="Wall-clock seconds of the whole batch")
+    throughput: float = Field(description="Items completed per second")
+    latency_mean: float
+    latency_p50: float
+    latency_p95: float
+    latency_max: float
+
+    @classmethod
+    def from_results(cls, results: List[BatchResult], elapsed: float) -> "BatchStats":
+        durations = sorted(result.duration for result in results) or [0.0]
+        failed = sum(1 for result in results if not result.ok)
+        return cls(
+            total=len(results),
+            succeeded=len(results) - failed,
+            failed=failed,
+            elapsed=elapsed,
+            throughput=len(results) / elapsed if elapsed > 0 else 0.0,
+            latency_mean=statistics.fmean(durations),
+            latency_p50=durations[len(durations) // 2],
+            latency_p95=durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+            latency_max=durations[-1],
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.succeeded}/{self.total} succeeded in {self.elapsed:.2f}s "
+            f"({self.throughput:.2f} items/s, p50 {self.latency_p50:.2f}s, "
+            f"p95 {self.latency_p95:.2f}s)"
+        )
+
+
+class BatchResults(list):
+    """Results of `Agent.batch` in input order, with the batch statistics."""
+
+    def __init__(self, results: Iterable[BatchResult], stats: BatchStats):
+        super().__init__(results)
+        self.stats = stats
+
+    @property
+    def outputs(self) -> List[Any]:
+        return [result.output for result in self]
+
+    @property
+    def errors(self) -> List[BatchResult]:
+        return [result for result in self if not result.ok]
+
+
+def _items(
+    queries: Iterable[BatchInput], defaults: Dict[str, Any]
+) -> Iterator[Tuple[int, Dict[str, Any], bool]]:
+    """
+    Invoke arguments of each item, and whether its session is owned by the batch.
+
+    Items without a thread_id get their own session, so that concurrent items
+    never share a conversation history.
+    """
+    prefix = f"batch-{uuid.uuid4().hex[:8]}"
+    for index, item in enumerate(queries):
+        kwargs = dict(defaults)
+        kwargs.update({"query": item} if isinstance(item, str) else item)
+        owned = not kwargs.get("thread_id")
+        if owned:
+            kwargs["thread_id"] = f"{prefix}-{index}"
+        yield index, kwargs, owned
+
+
+def _release_session(
+    agent: "Agent", kwargs: Dict[str, Any], owned: bool, keep: bool
+) -> None:
+    # Sessions passed in by the caller are never dropped
+    if owned and not keep:
+        agent.sessions.drop(
+            kwargs.get("user_id") or "unknown_user", kwargs["thread_id"]
+        )
+
+
+def _result(index: int, kwargs: Dict[str, Any], start: float, **outcome) -> BatchResult:
+    return BatchResult(
+        index=index,
+        query=str(kwargs.get("query", "")),
+        thread_id=kwargs["thread_id"],
+        duration=time.perf_counter() - start,
+        **outcome,
+    )
+
+
+def iter_batch(
+    agent: "Agent",
+    queries: Iterable[BatchInput],
+    max_concurrency: int = 8,
+    keep_sessions: bool = False,
+    **kwargs,
+) -> Iterator[BatchResult]:
+    """
+    Run `Agent.invoke` over the queries in a pool of threads and yield the results as they complete.
+
+    At most ``max_concurrency`` items run at a time; items are pulled lazily from
+    ``queries``, so a generator of any length can be processed. Closing the
+    iterator stops scheduling new items.
+    """
+    items = _items(queries, kwargs)
+    items_lock = threading.Lock()
+    results: "queue.Queue[Optional[BatchResult]]" = queue.Queue()
+    stop = threading.Event()
+
+    def _worker() -> None:
+        try:
+            while not stop.is_set():
+                with items_lock:
+                    item = next(items, None)
+                if item is None:
+                    return
+                index, item_kwargs, owned = item
+                start = time.perf_counter()
+                try:
+                    output = agent.invoke(**item_kwargs)
+                    results.put(_result(index, item_kwargs, start, output=output))
+                except Exception as e:
+                    logger.error(f"Batch item {index} failed: {type(e).__name__}: {e}")
+                    results.put(_result(index, item_kwargs, start, error=e))
+                finally:
+                    _release_session(agent, item_kwargs, owned, keep_sessions)
+        finally:
+            # One sentinel per worker marks its end
+            results.put(None)
+
+    workers = [
+        threading.Thread(target=_worker, name=f"vinagent-batch-{i}", daemon=True)
+        for i in range(max(1, max_concurrency))
+    ]
+    for worker in workers:
+        worker.start()
+    running = len(workers)
+    try:
+        while running:
+            result = results.get()
+            if result is None:
+                running -= 1
+            else:
+                yield result
+    finally:
+        stop.set()
+
+
+async def aiter_batch(
+    agent: "Agent",
+    queries: Iterable[BatchInput],
+    max_concurrency: int = 8,
+    keep_sessions: bool = False,
+    **kwargs,
+) -> AsyncIterator[BatchResult]:
+    """
+    Run `Agent.ainvoke` over the queries with ``max_concurrency`` workers and yield the results as they complete.
+
+    Closing the iterator cancels the items still running.
+    """
+    items = _items(queries, kwargs)
+    results: "asyncio.Queue[Optional[BatchResult]]" = asyncio.Queue()
+
+    async def _worker() -> None:
+        try:
+            # Items are pulled lazily; no lock needed within one event loop
+            for index, item_kwargs, owned in items:
+                start = time.perf_counter()
+                try:
+                    output = await agent.ainvoke(**item_kwargs)
+                    results.put_nowait(
+                        _result(index, item_kwargs, start, output=output)
+                    )
+                except Exception as e:
+                    logger.error(f"Batch item {index} failed: {type(e).__name__}: {e}")
+                    results.put_nowait(_result(index, item_kwargs, start, error=e))
+                finally:
+                    _release_session(agent, item_kwargs, owned, keep_sessions)
+        finally:
+            results.put_nowait(None)
+
+    workers = [asyncio.create_task(_worker()) for _ in range(max(1, max_concurrency))]
+    running = len(workers)
+    try:
+        while running:
+            result = await results.get()
+            if result is None:
+                running -= 1
+            else:
+                yield result
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def _collect(
+    results: Iterable[BatchResult], return_exceptions: bool, start: float
+) -> BatchResults:
+    collected = []
+    for result in results:
+        if not result.ok and not return_exceptions:
+            raise result.error
+        collected.append(result)
+    collected.sort(key=lambda result: result.index)
+    stats = BatchStats.from_results(collected, time.perf_counter() - start)
+    logger.info(f"Batch completed: {stats}")
+    return BatchResults(collected, stats)
+
+
+def run_batch(
+    agent: "Agent",
+    queries: Iterable[BatchInput],
+    max_concurrency: int = 8,
+    return_exceptions: bool = True,
+    keep_sessions: bool = False,
+    **kwargs,
+) -> BatchResults:
+    """Run `iter_batch` to completion and return the results in input order."""
+    start = time.perf_counter()
+    with closing(
+        iter_batch(agent, queries, max_concurrency, keep_sessions, **kwargs)
+    ) as results:
+        return _collect(results, return_exceptions, start)
+
+
+async def arun_batch(
+    agent: "Agent",
+    queries: Iterable[BatchInput],
+    max_concurrency: int = 8,
+    return_exceptions: bool = True,
+    keep_sessions: bool = False,
+    **kwargs,
+) -> BatchResults:
+    """Run `aiter_batch` to completion and return the results in input order."""
+    start = time.perf_counter()
+    collected = []
+    async with aclosing(
+        aiter_batch(agent, queries, max_concurrency, keep_sessions, **kwargs)
+    ) as results:
+        async for result in results:
+            if not result.ok and not return_exceptions:
+                raise result.error
+            collected.append(result)
+    return _collect(collected, return_exceptions, start)
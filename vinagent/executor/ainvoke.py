@@ -1,30 +1,32 @@
-from typing import Union, List
+from typing import TYPE_CHECKING, Optional, Union, List, Type
 import asyncio
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import BaseTool
-from langchain_openai import ChatOpenAI
-from langchain_together import ChatTogether
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai.chat_models.base import BaseChatOpenAI
 from langchain_core.messages import ToolMessage, BaseMessage
 from vinagent.executor.base import AgentResponse
 from vinagent.executor.base import MessageHandler
 from vinagent.logger.logger import logger
 from vinagent.register.tool import ToolCall
 from vinagent.executor.guardrail import GuardrailExecutor
+from vinagent.structured import structured_output
 from vinagent.register.tool import ToolManager
 from vinagent.message.adapter import adapter_ai_response_with_tool_calls
 from vinagent.prompt.agent_prompt import PromptHandler
 from vinagent.memory.history import InConversationHistory
 from vinagent.memory.memory import Memory
-from vinagent.mcp.client import DistributedMCPClient
 from vinagent.executor.base import AsyncInvokeExecutorBase
 
+if TYPE_CHECKING:
+    from langchain_together import ChatTogether
+    from langchain_openai.chat_models.base import BaseChatOpenAI
+    from vinagent.mcp.client import DistributedMCPClient
+
 
 class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler):
     def __init__(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         guardrail_executor: GuardrailExecutor = None,
         *args,
         **kwargs,
@@ -36,13 +38,14 @@ class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler
         self,
         messages: list[Union[AIMessage, ToolMessage, HumanMessage]] = [],
         tools_manager: ToolManager = None,
+        response_model: Type[AgentResponse] = AgentResponse,
     ) -> AgentResponse:
         messages = self._sanitize_history(messages)
-        self.structured_llm = self.llm.with_structured_output(
-            AgentResponse, method="function_calling"
+        structured_llm = structured_output(
+            self.llm, response_model, method="function_calling"
         )
         try:
-            response = await self.structured_llm.ainvoke(messages)
+            response = await structured_llm.ainvoke(messages)
             # Validate it's a proper AgentResponse, not a mis-packed string
             if isinstance(response, AgentResponse) and isinstance(
                 response.requires_tool, bool
@@ -52,7 +55,7 @@ class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler
             raise ValueError("Invalid response structure")
         except Exception:
             # Fallback: call plain LLM and parse manually
-            raw = self.llm.invoke(messages)
+            raw = await self.llm.ainvoke(messages)
             content = raw.content if hasattr(raw, "content") else str(raw)
             return self._parse_agent_response(content, tools_manager)
 
@@ -68,6 +71,7 @@ class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler
         description: str = "",
         instruction: str = "",
         history: InConversationHistory = None,
+        tool_names: Optional[List[str]] = None,
     ) -> AgentResponse:
         """
         Step 1: Build prompt and invoke LLM to get AgentResponse.
@@ -85,10 +89,22 @@ class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler
             description=description,
             instruction=instruction,
             history=history,
+            tool_names=tool_names,
         )
-        return await self.define_tools_async(
-            messages=_history, tools_manager=tools_manager
+        if not self._is_guardrail_fused(iteration, message):
+            return await self.define_tools_async(
+                messages=_history, tools_manager=tools_manager
+            )
+        # Fused mode: the input guardrail verdict comes with the tool decision
+        response = await self.define_tools_async(
+            messages=self._with_guardrail_prompt(
+                _history, await self.guardrail_executor.afused_prompt()
+            ),
+            tools_manager=tools_manager,
+            response_model=self.guardrail_executor.fused_response_model(AgentResponse),
         )
+        await self.guardrail_executor.acheck_fused_decision(response, message)
+        return response
 
     async def _step2_tool_invoke_async(
         self,
@@ -96,9 +112,9 @@ class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler
         response: AgentResponse,
         tools_manager: ToolManager,
         history: InConversationHistory,
-        mcp_client: DistributedMCPClient,
+        mcp_client: "DistributedMCPClient",
         mcp_server_name: str,
-    ) -> tuple[str, ToolMessage | None, bool]:
+    ) -> tuple[str, ToolMessage | List[ToolMessage] | None, bool]:
         """
         Async variant of _step2_tool_invoke.
         Same logic but uses await for tool execution instead of asyncio.run().
@@ -112,14 +128,13 @@ class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler
             return next_query, fix_msg, should_continue
 
         # --- 2b. No tool call — agent has a direct answer ---
-        if not getattr(response, "requires_tool", False) or not getattr(
-            response, "tool_call", None
-        ):
+        tool_calls = self._get_tool_calls(response)
+        if not getattr(response, "requires_tool", False) or not tool_calls:
             return current_query, None, False
 
         # --- 2c. Validate tool data ---
-        tool_data = response.tool_call.model_dump()
-        if not tool_data:
+        tool_datas = [tool_call.model_dump() for tool_call in tool_calls]
+        if not all(tool_datas):
             logger.warning(
                 "LLM generated empty or invalid tool_call. Prompting for correction."
             )
@@ -131,85 +146,74 @@ class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler
                 True,
             )
 
-        # --- 2d. Check tool guardrail permission ---
-        logger.info(f"Executing async tool call: {tool_data}")
-        try:
-            is_valid_tool_permission = self.guardrail_executor.check_tool_guardrail(
-                llm=self.llm,
-                tool_name=tool_data.get("tool_name"),
-                user_input=current_query,
-            )
-        except Exception:
-            is_valid_tool_permission = False
+        # --- 2d. Check tool guardrail permission of every call ---
+        logger.info(f"Executing async tool calls: {tool_datas}")
+        permissions = await self._acheck_tool_permissions(tool_datas, current_query)
 
         # --- 2e. Adapt AIMessage to carry tool_calls metadata ---
-        content_val = response.answer if getattr(response, "answer", None) else ""
-        ai_message = adapter_ai_response_with_tool_calls(
-            tools_manager.load_tools(), AIMessage(content=content_val), tool_data
-        )
+        ai_message = self._adapt_tool_calls(response, tool_datas, tools_manager)
         history.add_message(ai_message)
 
-        # --- 2f. Execute tool asynchronously ---
-        if is_valid_tool_permission:
-            tool_message = (
-                await tools_manager._execute_tool(  # ← only difference from sync
-                    tool_name=tool_data["tool_name"],
-                    tool_type=tool_data["tool_type"],
-                    arguments=tool_data["arguments"],
-                    module_path=tool_data["module_path"],
-                    mcp_client=mcp_client,
-                    mcp_server_name=mcp_server_name,
-                )
-            )
-            if tool_message is None:
-                tool_message = ToolMessage(
-                    content="Tool execution success without artifact",
-                    additional_kwargs={"is_error": False},
-                    tool_call_id=ai_message.tool_calls[0].get("id"),
-                )
-        else:
-            tool_message = ToolMessage(
-                content="Tool is not permitted by security rules.",
-                additional_kwargs={"is_error": True},
-                tool_call_id=ai_message.tool_calls[0].get("id"),
+        # --- 2f. Execute permitted tools concurrently ---
+        executed = []
+        if any(permissions):
+            executed = await tools_manager._execute_tools(
+                tool_calls=[
+                    tool_data
+                    for tool_data, is_permitted in zip(tool_datas, permissions)
+                    if is_permitted
+                ],
+                mcp_client=mcp_client,
+                mcp_server_name=mcp_server_name,
             )
+        tool_messages = self._build_tool_messages(tool_datas, permissions, executed)
 
-        history.add_message(tool_message)
+        history.add_messages(tool_messages)
         _history = history.get_history()
+
         # --- 2g. Build next iteration context ---
-        next_query = self.prompt_tool(current_query, tool_data, tool_message, _history)
-        return next_query, tool_message, True
+        next_query = self.prompt_tools(
+            current_query, tool_datas, tool_messages, _history
+        )
+        return next_query, tool_messages, True
 
     async def _step3_final_response_async(
         self,
         query: str,
-        tool_message: ToolMessage | None,
+        tool_messages: ToolMessage | List[ToolMessage] | None,
         is_tool_formatted: bool,
         is_save_memory: bool,
         max_history: int = None,
         history: InConversationHistory = None,
         memory: Memory = None,
         user_id: str = None,
+        tools_manager: ToolManager = None,
+        skills: list = [],
+        description: str = "",
+        instruction: str = "",
+        tool_names: Optional[List[str]] = None,
     ) -> AIMessage:
         """
         Async variant of _step3_final_response.
         Uses llm.ainvoke instead of llm.invoke for the summary call.
         """
         if is_tool_formatted:
-            history.add_message(
-                HumanMessage(
-                    content=f"Based on the previous tool executions, please provide a final response to: {query}"
-                )
+            _history = self._final_messages(
+                query,
+                history,
+                max_history=max_history,
+                tools_manager=tools_manager,
+                skills=skills,
+                description=description,
+                instruction=instruction,
+                tool_names=tool_names,
             )
-            history = history.get_history(max_history=max_history)
-            final_message = await self.llm.ainvoke(
-                history
-            )  # ← only difference from sync
+            final_message = await self.llm.ainvoke(_history)
             history.add_message(final_message)
         else:
-            final_message = tool_message
+            final_message = self._final_tool_message(tool_messages)
 
-        self.guardrail_executor.check_output_guardrail(final_message)
+        await self.guardrail_executor.acheck_output_guardrail(final_message)
 
         if memory and is_save_memory:
             final_content = (
@@ -217,7 +221,7 @@ class AsyncInvokeExecutor(AsyncInvokeExecutorBase, MessageHandler, PromptHandler
                 if hasattr(final_message, "content")
                 else str(final_message)
             )
-            memory.save_memory(message=final_content, user_id=user_id)
+            await memory.aingest(self.llm, final_content, user_id=user_id)
 
         return (
             final_message
@@ -1,10 +1,8 @@
-from typing import Union, AsyncGenerator
+from typing import TYPE_CHECKING, Callable, List, Optional, Union, AsyncGenerator, Type
 import asyncio
 from langchain_core.messages import HumanMessage, AIMessage
-from langchain_together import ChatTogether
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai.chat_models.base import BaseChatOpenAI
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import ToolMessage, ToolMessageChunk
 from langchain_core.messages.ai import AIMessageChunk
 from vinagent.executor.base import AgentResponse
 from vinagent.executor.base import MessageHandler
@@ -12,12 +10,17 @@ from vinagent.executor.base import AsyncStreamInvokeExecutorBase
 from vinagent.logger.logger import logger
 from vinagent.register.tool import ToolCall
 from vinagent.executor.guardrail import GuardrailExecutor
+from vinagent.structured import structured_output
 from vinagent.register.tool import ToolManager
 from vinagent.message.adapter import adapter_ai_response_with_tool_calls
 from vinagent.prompt.agent_prompt import PromptHandler
 from vinagent.memory.history import InConversationHistory
 from vinagent.memory.memory import Memory
-from vinagent.mcp.client import DistributedMCPClient
+
+if TYPE_CHECKING:
+    from langchain_together import ChatTogether
+    from langchain_openai.chat_models.base import BaseChatOpenAI
+    from vinagent.mcp.client import DistributedMCPClient
 
 
 class AsyncStreamInvokeExecutor(
@@ -34,7 +37,7 @@ class AsyncStreamInvokeExecutor(
 
     def __init__(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         guardrail_executor: GuardrailExecutor = None,
         *args,
         **kwargs,
@@ -50,11 +53,12 @@ class AsyncStreamInvokeExecutor(
         self,
         messages: list[Union[AIMessage, ToolMessage, HumanMessage]] = [],
         tools_manager: ToolManager = None,
+        response_model: Type[AgentResponse] = AgentResponse,
     ) -> AgentResponse:
         """Invoke the LLM with structured output to get an AgentResponse."""
         messages = self._sanitize_history(messages)
-        structured_llm = self.llm.with_structured_output(
-            AgentResponse, method="function_calling"
+        structured_llm = structured_output(
+            self.llm, response_model, method="function_calling"
         )
         try:
             response = await structured_llm.ainvoke(messages)
@@ -85,6 +89,7 @@ class AsyncStreamInvokeExecutor(
         description: str = "",
         instruction: str = "",
         history: InConversationHistory = None,
+        tool_names: Optional[List[str]] = None,
     ) -> AgentResponse:
         """
         Step 1: Build prompt and invoke LLM to get AgentResponse.
@@ -102,10 +107,22 @@ class AsyncStreamInvokeExecutor(
             description=description,
             instruction=instruction,
             history=history,
+            tool_names=tool_names,
         )
-        return await self.define_tools_async(
-            messages=_history, tools_manager=tools_manager
+        if not self._is_guardrail_fused(iteration, message):
+            return await self.define_tools_async(
+                messages=_history, tools_manager=tools_manager
+            )
+        # Fused mode: the input guardrail verdict comes with the tool decision
+        response = await self.define_tools_async(
+            messages=self._with_guardrail_prompt(
+                _history, await self.guardrail_executor.afused_prompt()
+            ),
+            tools_manager=tools_manager,
+            response_model=self.guardrail_executor.fused_response_model(AgentResponse),
         )
+        await self.guardrail_executor.acheck_fused_decision(response, message)
+        return response
 
     # ------------------------------------------------------------------
     # Step 2 — tool execution (no streaming, pure async I/O)
@@ -117,16 +134,17 @@ class AsyncStreamInvokeExecutor(
         response: AgentResponse,
         tools_manager: ToolManager,
         history: InConversationHistory,
-        mcp_client: DistributedMCPClient,
+        mcp_client: "DistributedMCPClient",
         mcp_server_name: str,
-    ) -> tuple[str, ToolMessage | None, bool]:
+        on_tool_output: Optional[Callable[[ToolMessageChunk], None]] = None,
+    ) -> tuple[str, ToolMessage | List[ToolMessage] | None, bool]:
         """
         Async variant of Step 2: execute the tool call (or fix_bug_command)
         from the ``AgentResponse``.
 
         Returns:
             current_query (str): Updated query for the next iteration.
-            tool_message (ToolMessage | None): Result of tool execution.
+            tool_messages (List[ToolMessage] | None): Results of the tool calls in tool_calls order.
             should_continue (bool): True if the loop should proceed.
         """
         # --- 2a. Handle fix_bug_command ---
@@ -137,15 +155,14 @@ class AsyncStreamInvokeExecutor(
             )
             return next_query, fix_msg, should_continue
 
-        # --- 2b. No tool call — direct answer ---
-        if not getattr(response, "requires_tool", False) or not getattr(
-            response, "tool_call", None
-        ):
+        # --- 2b. No tool call — agent has a direct answer ---
+        tool_calls = self._get_tool_calls(response)
+        if not getattr(response, "requires_tool", False) or not tool_calls:
             return current_query, None, False
 
         # --- 2c. Validate tool data ---
-        tool_data = response.tool_call.model_dump()
-        if not tool_data:
+        tool_datas = [tool_call.model_dump() for tool_call in tool_calls]
+        if not all(tool_datas):
             logger.warning(
                 "LLM generated empty or invalid tool_call. Prompting for correction."
             )
@@ -157,53 +174,58 @@ class AsyncStreamInvokeExecutor(
                 True,
             )
 
-        # --- 2d. Guardrail check ---
-        logger.info(f"Executing async-stream tool call: {tool_data}")
-        try:
-            is_valid_tool_permission = self.guardrail_executor.check_tool_guardrail(
-                llm=self.llm,
-                tool_name=tool_data.get("tool_name"),
-                user_input=current_query,
-            )
-        except Exception:
-            is_valid_tool_permission = False
+        # --- 2d. Check tool guardrail permission of every call ---
+        logger.info(f"Executing async-stream tool calls: {tool_datas}")
+        permissions = await self._acheck_tool_permissions(tool_datas, current_query)
 
-        # --- 2e. Wrap AIMessage with tool_calls metadata ---
-        content_val = response.answer if getattr(response, "answer", None) else ""
-        ai_message = adapter_ai_response_with_tool_calls(
-            tools_manager.load_tools(), AIMessage(content=content_val), tool_data
-        )
+        # --- 2e. Adapt AIMessage to carry tool_calls metadata ---
+        ai_message = self._adapt_tool_calls(response, tool_datas, tools_manager)
         history.add_message(ai_message)
 
-        # --- 2f. Execute tool asynchronously ---
-        if is_valid_tool_permission:
-            tool_message = await tools_manager._execute_tool(
-                tool_name=tool_data["tool_name"],
-                tool_type=tool_data["tool_type"],
-                arguments=tool_data["arguments"],
-                module_path=tool_data["module_path"],
+        # --- 2f. Execute permitted tools concurrently ---
+        executed = []
+        if any(permissions):
+            executed = await tools_manager._execute_tools(
+                tool_calls=[
+                    tool_data
+                    for tool_data, is_permitted in zip(tool_datas, permissions)
+                    if is_permitted
+                ],
                 mcp_client=mcp_client,
                 mcp_server_name=mcp_server_name,
+                on_output=on_tool_output,
             )
-            if tool_message is None:
-                tool_message = ToolMessage(
-                    content="Tool execution success without artifact",
-                    additional_kwargs={"is_error": False},
-                    tool_call_id=ai_message.tool_calls[0].get("id"),
-                )
-        else:
-            tool_message = ToolMessage(
-                content="Tool is not permitted by security rules.",
-                additional_kwargs={"is_error": True},
-                tool_call_id=ai_message.tool_calls[0].get("id"),
-            )
+        tool_messages = self._build_tool_messages(tool_datas, permissions, executed)
 
-        history.add_message(tool_message)
+        history.add_messages(tool_messages)
         _history = history.get_history()
 
-        # --- 2g. Build next-iteration context ---
-        next_query = self.prompt_tool(current_query, tool_data, tool_message, _history)
-        return next_query, tool_message, True
+        # --- 2g. Build next iteration context ---
+        next_query = self.prompt_tools(
+            current_query, tool_datas, tool_messages, _history
+        )
+        return next_query, tool_messages, True
+
+    async def _step2_tool_invoke_stream_async(
+        self, step2: asyncio.Task, chunks: asyncio.Queue
+    ) -> AsyncGenerator[ToolMessageChunk, None]:
+        """
+        Yield the tool output put in ``chunks`` until the ``step2`` task (running
+        `_step2_tool_invoke_async` with ``on_tool_output=chunks.put_nowait``)
+        finishes. Its result is then available from ``step2.result()``.
+        """
+        while True:
+            getter = asyncio.ensure_future(chunks.get())
+            done, _ = await asyncio.wait(
+                {getter, step2}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter in done:
+                yield getter.result()
+                continue
+            getter.cancel()
+            while not chunks.empty():
+                yield chunks.get_nowait()
+            return
 
     # ------------------------------------------------------------------
     # Step 3 — stream final LLM summarisation
@@ -212,13 +234,18 @@ class AsyncStreamInvokeExecutor(
     async def _step3_final_response_astream(
         self,
         query: str,
-        tool_message: ToolMessage | None,
+        tool_messages: ToolMessage | List[ToolMessage] | None,
         is_tool_formatted: bool,
         is_save_memory: bool,
         max_history: int = None,
         history: InConversationHistory = None,
         memory: Memory = None,
         user_id: str = None,
+        tools_manager: ToolManager = None,
+        skills: list = [],
+        description: str = "",
+        instruction: str = "",
+        tool_names: Optional[List[str]] = None,
     ) -> AsyncGenerator[AIMessageChunk, None]:
         """
         Step 3 (async stream variant): Stream or yield the final response
@@ -226,18 +253,22 @@ class AsyncStreamInvokeExecutor(
 
         If ``is_tool_formatted=True``, asks the LLM to summarise tool
         results and yields chunks in real time via ``llm.astream()``.
-        Otherwise yields the raw ``tool_message`` directly.
+        Otherwise yields the raw tool results (see ``_final_tool_message``).
 
         Yields:
             AIMessageChunk | ToolMessage: Streamed chunks or raw tool message.
         """
         if is_tool_formatted:
-            history.add_message(
-                HumanMessage(
-                    content=f"Based on the previous tool executions, please provide a final response to: {query}"
-                )
+            _history = self._final_messages(
+                query,
+                history,
+                max_history=max_history,
+                tools_manager=tools_manager,
+                skills=skills,
+                description=description,
+                instruction=instruction,
+                tool_names=tool_names,
             )
-            _history = history.get_history(max_history=max_history)
 
             full_content = AIMessageChunk(content="")
             async for chunk in self.llm.astream(_history):
@@ -246,14 +277,15 @@ class AsyncStreamInvokeExecutor(
 
             history.add_message(full_content)
             if memory and is_save_memory:
-                memory.save_memory(message=full_content.content, user_id=user_id)
+                await memory.aingest(self.llm, full_content.content, user_id=user_id)
         else:
-            self.guardrail_executor.check_output_guardrail(tool_message)
+            tool_message = self._final_tool_message(tool_messages)
+            await self.guardrail_executor.acheck_output_guardrail(tool_message)
             if memory and is_save_memory:
                 content = (
                     tool_message.content
                     if hasattr(tool_message, "content")
                     else str(tool_message)
                 )
-                memory.save_memory(message=content, user_id=user_id)
+                await memory.aingest(self.llm, content, user_id=user_id)
             yield tool_message
@@ -1,14 +1,26 @@
+import asyncio
+import functools
 from abc import ABC, abstractmethod
-from typing import Optional, Union, List, Any
+from typing import TYPE_CHECKING, Optional, Union, List, Any, Type
 from pydantic import BaseModel, Field
-from langchain_core.messages import AIMessage, ToolMessage, HumanMessage
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    ToolMessage,
+    HumanMessage,
+    SystemMessage,
+)
 from vinagent.register.tool import ToolCall
 from vinagent.memory.history import InConversationHistory
 from vinagent.register.tool import ToolManager
 from vinagent.logger.logger import logger
-from vinagent.mcp.client import DistributedMCPClient
 from vinagent.memory.memory import Memory
 from vinagent.prompt.agent_prompt import PromptHandler
+from vinagent.message.adapter import adapter_ai_response_with_tool_calls
+from vinagent.guardrail.parallel import run_parallel
+
+if TYPE_CHECKING:
+    from vinagent.mcp.client import DistributedMCPClient
 
 
 class AgentResponse(BaseModel):
@@ -37,6 +49,14 @@ class AgentResponse(BaseModel):
             "MUST be None when requires_tool=False."
         ),
     )
+    tool_calls: Optional[List[ToolCall]] = Field(
+        default=None,
+        description=(
+            "Optional list of INDEPENDENT tool calls executed in parallel in this step, "
+            "e.g. fetching data for several tickers at once. "
+            "Use it instead of tool_call only when no call depends on the result of another."
+        ),
+    )
     fix_bug_command: Optional[str] = Field(
         default=None,
         description=(
@@ -180,20 +200,157 @@ class MessageHandler(PromptHandler):
 
         return fix_msg, history
 
+    def _fill_tool_metadata(self, tool_data: dict, tools_manager: ToolManager) -> dict:
+        """Complete a raw tool call dict with the registered tool metadata."""
+        tool_name = tool_data.get("tool_name")
+        if tool_name:
+            meta = tools_manager.get(tool_name, {})
+            tool_data.setdefault("return", meta.get("return", "str"))
+            tool_data.setdefault("module_path", meta.get("module_path", ""))
+            tool_data.setdefault("tool_type", meta.get("tool_type", "function"))
+            tool_data.setdefault(
+                "tool_call_id", meta.get("tool_call_id", f"tool_{tool_name}")
+            )
+            tool_data.setdefault("is_runtime", meta.get("is_runtime", False))
+        return tool_data
+
     def _set_tool_metadata(self, response: AgentResponse, tools_manager: ToolManager):
-        if response.requires_tool and response.tool_call:
-            tool_name = response.tool_call.tool_name
-            if tool_name:
-                meta = tools_manager.get(tool_name, {})
-                response.tool_call.return_type = meta.get("return", "str")
-                response.tool_call.module_path = meta.get("module_path", "")
-                response.tool_call.tool_type = meta.get("tool_type", "function")
-                response.tool_call.tool_call_id = meta.get(
-                    "tool_call_id", f"tool_{tool_name}"
-                )
-                response.tool_call.is_runtime = meta.get("is_runtime", False)
+        if response.requires_tool:
+            for tool_call in self._get_tool_calls(response):
+                tool_name = tool_call.tool_name
+                if tool_name:
+                    meta = tools_manager.get(tool_name, {})
+                    tool_call.return_ = meta.get("return", "str")
+                    tool_call.module_path = meta.get("module_path", "")
+                    tool_call.tool_type = meta.get("tool_type", "function")
+                    tool_call.tool_call_id = meta.get(
+                        "tool_call_id", f"tool_{tool_name}"
+                    )
+                    tool_call.is_runtime = meta.get("is_runtime", False)
         return response
 
+    def _is_guardrail_fused(self, iteration: int, message: str = "") -> bool:
+        """
+        Whether this step-1 call also returns the input guardrail verdict.
+        Inputs settled by the guardrail pre-filter are not fused.
+        """
+        guardrail_executor = getattr(self, "guardrail_executor", None)
+        return (
+            iteration == 1
+            and guardrail_executor is not None
+            and guardrail_executor.is_fused
+            and not guardrail_executor.settle_input_by_prefilter(message)
+        )
+
+    def _with_guardrail_prompt(self, messages: list, guardrail_prompt: str) -> list:
+        """Append the fused guardrail instructions to the last user message of this call only."""
+        *head, last = messages
+        return head + [HumanMessage(content=f"{last.content}\n{guardrail_prompt}")]
+
+    def _get_tool_calls(self, response: AgentResponse) -> List[ToolCall]:
+        """Return every tool call of the response, ``tool_calls`` first."""
+        tool_calls = list(getattr(response, "tool_calls", None) or [])
+        tool_call = getattr(response, "tool_call", None)
+        if tool_call and not tool_calls:
+            tool_calls = [tool_call]
+        return tool_calls
+
+    def _check_tool_permissions(
+        self, tool_datas: List[dict], user_input: str
+    ) -> List[bool]:
+        """Check the tool guardrail of every tool call concurrently. Errors deny the call."""
+
+        def _check(tool_data: dict) -> bool:
+            try:
+                return self.guardrail_executor.check_tool_guardrail(
+                    llm=self.llm,
+                    tool_name=tool_data.get("tool_name"),
+                    user_input=user_input,
+                )
+            except Exception:
+                return False
+
+        return run_parallel([functools.partial(_check, td) for td in tool_datas])
+
+    async def _acheck_tool_permissions(
+        self, tool_datas: List[dict], user_input: str
+    ) -> List[bool]:
+        """Async variant of `_check_tool_permissions`, checking calls concurrently."""
+
+        async def _check(tool_data: dict) -> bool:
+            try:
+                return await self.guardrail_executor.acheck_tool_guardrail(
+                    llm=self.llm,
+                    tool_name=tool_data.get("tool_name"),
+                    user_input=user_input,
+                )
+            except Exception:
+                return False
+
+        return list(await asyncio.gather(*[_check(td) for td in tool_datas]))
+
+    def _adapt_tool_calls(
+        self,
+        response: AgentResponse,
+        tool_datas: List[dict],
+        tools_manager: ToolManager,
+    ) -> AIMessage:
+        """
+        Wrap the tool calls into an AIMessage carrying ``tool_calls`` metadata and
+        store on each tool data the id of the AIMessage tool call it answers.
+        """
+        content_val = response.answer if getattr(response, "answer", None) else ""
+        ai_message = adapter_ai_response_with_tool_calls(
+            tools_manager.load_tools(), AIMessage(content=content_val), tool_datas
+        )
+        for tool_data, tool_call in zip(tool_datas, ai_message.tool_calls):
+            tool_data["tool_call_id"] = tool_call["id"]
+        return ai_message
+
+    def _build_tool_messages(
+        self,
+        tool_datas: List[dict],
+        permissions: List[bool],
+        executed: List[ToolMessage],
+    ) -> List[ToolMessage]:
+        """
+        Merge the executed tool messages with "not permitted" messages for the
+        calls rejected by the tool guardrail, keeping the tool_calls order.
+        """
+        executed = iter(executed)
+        tool_messages = []
+        for tool_data, is_permitted in zip(tool_datas, permissions):
+            if is_permitted:
+                tool_messages.append(next(executed))
+            else:
+                tool_messages.append(
+                    ToolMessage(
+                        content="Tool is not permitted by security rules.",
+                        additional_kwargs={"is_error": True},
+                        tool_call_id=tool_data["tool_call_id"],
+                    )
+                )
+        return tool_messages
+
+    def _final_tool_message(
+        self, tool_messages: ToolMessage | List[ToolMessage] | None
+    ) -> ToolMessage | AIMessage | None:
+        """
+        Raw response of the last step when ``is_tool_formatted=False``: the tool
+        message of a single call, or one AIMessage joining the results of every
+        call in tool_calls order (including the calls rejected by the guardrail).
+        The tool messages, with their artifacts, are kept in
+        ``additional_kwargs["tool_messages"]``.
+        """
+        if not isinstance(tool_messages, list):
+            return tool_messages
+        if len(tool_messages) == 1:
+            return tool_messages[0]
+        return AIMessage(
+            content="\n\n".join(str(message.content) for message in tool_messages),
+            additional_kwargs={"tool_messages": tool_messages},
+        )
+
     def _parse_agent_response(self, content: str, tools_manager: ToolManager):
         # Attempt to parse the whole string as AgentResponse JSON
         import json, re
@@ -204,7 +361,10 @@ class MessageHandler(PromptHandler):
             # logger.info(f"json_str: {json_str}")
             parsed = json.loads(json_str)
             if isinstance(parsed, dict) and (
-                "requires_tool" in parsed or "tool_call" in parsed or "answer" in parsed
+                "requires_tool" in parsed
+                or "tool_call" in parsed
+                or "tool_calls" in parsed
+                or "answer" in parsed
             ):
                 tc = parsed.get("tool_call")
                 if tc and isinstance(tc, str):
@@ -216,21 +376,22 @@ class MessageHandler(PromptHandler):
                         pass
 
                 if tc and isinstance(tc, dict):
-                    tool_name = tc.get("tool_name")
-                    if tool_name:
-                        meta = tools_manager.get(tool_name, {})
-                        tc.setdefault("return", meta.get("return", "str"))
-                        tc.setdefault("module_path", meta.get("module_path", ""))
-                        tc.setdefault("tool_type", meta.get("tool_type", "function"))
-                        tc.setdefault(
-                            "tool_call_id",
-                            meta.get("tool_call_id", f"tool_{tool_name}"),
-                        )
-                        tc.setdefault("is_runtime", meta.get("is_runtime", False))
-                    parsed["tool_call"] = ToolCall(**tc)
+                    parsed["tool_call"] = ToolCall(
+                        **self._fill_tool_metadata(tc, tools_manager)
+                    )
                 elif "tool_call" in parsed:
                     del parsed["tool_call"]
 
+                tcs = parsed.get("tool_calls")
+                if tcs and isinstance(tcs, list):
+                    parsed["tool_calls"] = [
+                        ToolCall(**self._fill_tool_metadata(tc, tools_manager))
+                        for tc in tcs
+                        if isinstance(tc, dict)
+                    ]
+                elif "tool_calls" in parsed:
+                    del parsed["tool_calls"]
+
                 return AgentResponse(**parsed)
         except Exception as e:
             logger.debug(f"Could not parse as AgentResponse json: {e}")
@@ -246,17 +407,7 @@ class MessageHandler(PromptHandler):
                 except json.JSONDecodeError:
                     return AgentResponse(requires_tool=False, answer=content)
             if isinstance(tool_data, dict):
-                tool_name = tool_data.get("tool_name")
-                if tool_name:
-                    registered = tools_manager.load_tools()
-                    meta = registered.get(tool_name, {})
-                    tool_data.setdefault("return", meta.get("return", "str"))
-                    tool_data.setdefault("module_path", meta.get("module_path", ""))
-                    tool_data.setdefault("tool_type", meta.get("tool_type", "function"))
-                    tool_data.setdefault(
-                        "tool_call_id", meta.get("tool_call_id", f"tool_{tool_name}")
-                    )
-                    tool_data.setdefault("is_runtime", meta.get("is_runtime", False))
+                self._fill_tool_metadata(tool_data, tools_manager)
                 try:
                     return AgentResponse(
                         requires_tool=True, tool_call=ToolCall(**tool_data)
@@ -270,6 +421,60 @@ class MessageHandler(PromptHandler):
                     return AgentResponse(requires_tool=False, answer=content)
         return AgentResponse(requires_tool=False, answer=content)
 
+    def _agent_system_prompt(
+        self,
+        tools_manager: ToolManager,
+        skills: list = [],
+        description: str = "",
+        instruction: str = "",
+        tool_names: Optional[List[str]] = None,
+    ) -> SystemMessage:
+        """
+        System prompt of the agent, prepended to the step-1 and step-3 calls.
+        It is cached on the registry version, so both calls share the same prefix.
+        """
+        if tools_manager is None:
+            return self.system_prompt(skills, description, instruction)
+        tools_version, tools = tools_manager.registry.snapshot()
+        return self.system_prompt(
+            skills,
+            description,
+            instruction,
+            tools=tools,
+            cache_key=(id(tools_manager.registry), tools_version),
+            tools_in_task=tool_names is not None,
+        )
+
+    def _final_messages(
+        self,
+        query: str,
+        history: InConversationHistory,
+        max_history: int = None,
+        tools_manager: ToolManager = None,
+        skills: list = [],
+        description: str = "",
+        instruction: str = "",
+        tool_names: Optional[List[str]] = None,
+    ) -> List[BaseMessage]:
+        """
+        Step 3: Ask for the final response to ``query`` and return the messages of
+        the formatting call, led by the same system prompt as step 1.
+        """
+        history.add_message(
+            HumanMessage(
+                content=f"Based on the previous tool executions, please provide a final response to: {query}"
+            )
+        )
+        _history = [
+            msg
+            for msg in history.get_history(max_history=max_history)
+            if not isinstance(msg, SystemMessage)
+        ]
+        _system_prompt = self._agent_system_prompt(
+            tools_manager, skills, description, instruction, tool_names
+        )
+        return [_system_prompt] + _history
+
     def _preprocessing_messages(
         self,
         iteration: int = 1,
@@ -282,24 +487,83 @@ class MessageHandler(PromptHandler):
         description: str = "",
         instruction: str = "",
         history: InConversationHistory = None,
+        tool_names: Optional[List[str]] = None,
     ) -> AgentResponse:
         """
-        Step 1: Build prompt and invoke LLM to get AgentResponse.
-        On the first iteration, initializes conversation history with system + user messages.
-        On subsequent iterations, appends the updated query as a new HumanMessage.
+        Step 1: Build the messages sent to the LLM.
+        The system prompt (description, skills, instruction and tools) is kept
+        out of the history and prepended on every iteration, so the prompt
+        prefix stays byte-identical across iterations and turns. Each iteration
+        appends the user/memory/task prompt as a new HumanMessage.
+        If ``tool_names`` is given (see ``_step0_retrieve_tools``), only those
+        tools are rendered, in the message of this call rather than in the
+        system prompt, and they are not stored in the history.
+        """
+        _system_prompt = self._agent_system_prompt(
+            tools_manager, skills, description, instruction, tool_names
+        )
+        prompt = self.build_prompt(user_id, message, memory)
+        history.add_message(HumanMessage(content=prompt))
+
+        _history = [
+            msg
+            for msg in history.get_history(max_history=max_history)
+            if not isinstance(msg, SystemMessage)
+        ]
+        if tool_names is not None:
+            retrieved = {}
+            for name in tool_names:
+                tool = tools_manager.registry.get(name)
+                if tool is not None:
+                    retrieved[name] = tool
+            _history[-1] = HumanMessage(
+                content=self.tools_task_prompt(retrieved, _history[-1].content)
+            )
+        return [_system_prompt] + _history
+
+    def _step0_retrieve_tools(
+        self,
+        query: str,
+        tools_manager: ToolManager,
+        top_k: Optional[int] = None,
+        pinned_tools: Optional[List[str]] = None,
+    ) -> Optional[List[str]]:
+        """
+        Step 0: Select the tools exposed to the LLM for this query.
+
+        Ranks the registered tools against the query with the BM25 index of the
+        ToolManager and keeps the ``top_k`` best ones plus the pinned tools.
+        Returns None (all tools) if ``top_k`` is not set or the catalog is
+        already small enough.
         """
-        tools = tools_manager.load_tools()
-        prompt = self.build_prompt(user_id, message, tools, memory)
-        _system_prompt = self.system_prompt(skills, description, instruction)
+        if not top_k or len(tools_manager.registry) <= top_k:
+            return None
+        tool_names = tools_manager.retrieve_tools(
+            query=str(query), top_k=top_k, pinned_tools=pinned_tools
+        )
+        logger.info(f"Selected tools for the query: {tool_names}")
+        return tool_names
 
-        if iteration == 1:
-            messages = [_system_prompt, HumanMessage(content=prompt)]
-            history.add_messages(messages)
-        else:
-            history.add_message(HumanMessage(content=prompt))
+    def _step0_retrieve_memory(
+        self,
+        query: str,
+        memory: Optional[Memory],
+        user_id: str = "unknown_user",
+        top_k: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """
+        Step 0: Select the long-term memory injected into the prompt.
 
-        _history = history.get_history(max_history=max_history)
-        return _history
+        Returns the ``top_k`` memory facts of the user most relevant to the
+        query, capped to ``max_tokens``. With neither limit set, every fact is
+        returned. Returns an empty string if the agent has no memory.
+        """
+        if memory is None:
+            return ""
+        return memory.retrieve_memory(
+            str(query), user_id=user_id, top_k=top_k, max_tokens=max_tokens
+        )
 
     def _handle_fix_bug_command(
         self, fix_cmd: str, query: str, response: AgentResponse
@@ -326,6 +590,7 @@ class InvokeExecutorBase(ABC):
         self,
         messages: list[Union[AIMessage, ToolMessage, HumanMessage]] = [],
         tools_manager: ToolManager = None,
+        response_model: Type[AgentResponse] = AgentResponse,
     ) -> AgentResponse:
         pass
 
@@ -342,6 +607,7 @@ class InvokeExecutorBase(ABC):
         description: str = "",
         instruction: str = "",
         history: InConversationHistory = None,
+        tool_names: Optional[List[str]] = None,
     ) -> AgentResponse:
         pass
 
@@ -352,15 +618,15 @@ class InvokeExecutorBase(ABC):
         response: AgentResponse,
         tools_manager: ToolManager,
         history: InConversationHistory,
-        mcp_client: DistributedMCPClient,
+        mcp_client: "DistributedMCPClient",
         mcp_server_name: str,
-    ) -> tuple[str, ToolMessage | None, bool]:
+    ) -> tuple[str, ToolMessage | List[ToolMessage] | None, bool]:
         pass
 
     def _step3_final_response(
         self,
         query: str,
-        tool_message: ToolMessage | None,
+        tool_messages: ToolMessage | List[ToolMessage] | None,
         is_tool_formatted: bool,
         is_save_memory: bool,
         max_history: int = None,
@@ -387,14 +653,14 @@ class AsyncInvokeExecutorBase(ABC):
         query: str,
         current_query: str,
         response: AgentResponse,
-    ) -> tuple[str, ToolMessage | None, bool]:
+    ) -> tuple[str, ToolMessage | List[ToolMessage] | None, bool]:
         pass
 
     @abstractmethod
     async def _step3_final_response_async(
         self,
         query: str,
-        tool_message: ToolMessage | None,
+        tool_messages: ToolMessage | List[ToolMessage] | None,
         is_tool_formatted: bool,
         is_save_memory: bool,
         max_history: int = None,
@@ -408,6 +674,7 @@ class StreamInvokeExecutorBase(ABC):
         self,
         messages: list[Union[AIMessage, ToolMessage, HumanMessage]] = [],
         tools_manager: ToolManager = None,
+        response_model: Type[AgentResponse] = AgentResponse,
     ) -> AgentResponse:
         pass
 
@@ -424,6 +691,7 @@ class StreamInvokeExecutorBase(ABC):
         description: str = "",
         instruction: str = "",
         history: InConversationHistory = None,
+        tool_names: Optional[List[str]] = None,
     ) -> AgentResponse:
         pass
 
@@ -434,15 +702,15 @@ class StreamInvokeExecutorBase(ABC):
         response: AgentResponse,
         tools_manager: ToolManager,
         history: InConversationHistory,
-        mcp_client: DistributedMCPClient,
+        mcp_client: "DistributedMCPClient",
         mcp_server_name: str,
-    ) -> tuple[str, ToolMessage | None, bool]:
+    ) -> tuple[str, ToolMessage | List[ToolMessage] | None, bool]:
         pass
 
     def _step3_final_response_stream(
         self,
         query: str,
-        tool_message: ToolMessage | None,
+        tool_messages: ToolMessage | List[ToolMessage] | None,
         is_tool_formatted: bool,
         is_save_memory: bool,
         max_history: int = None,
@@ -459,6 +727,7 @@ class AsyncStreamInvokeExecutorBase(ABC):
         self,
         messages: list[Union[AIMessage, ToolMessage, HumanMessage]] = [],
         tools_manager: ToolManager = None,
+        response_model: Type[AgentResponse] = AgentResponse,
     ) -> AgentResponse:
         pass
 
@@ -475,6 +744,7 @@ class AsyncStreamInvokeExecutorBase(ABC):
         description: str = "",
         instruction: str = "",
         history: InConversationHistory = None,
+        tool_names: Optional[List[str]] = None,
     ) -> AgentResponse:
         pass
 
@@ -494,7 +764,7 @@ class AsyncStreamInvokeExecutorBase(ABC):
     async def _step3_final_response_astream(
         self,
         query: str,
-        tool_message: Any,
+        tool_messages: Any,
         is_tool_formatted: bool,
         is_save_memory: bool,
         max_history: int = None,
@@ -1,21 +1,26 @@
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from vinagent.executor.guardrail import GuardrailExecutor
 from vinagent.memory.history import InConversationHistory
 from vinagent.memory.memory import Memory
-from vinagent.graph.operator import FlowStateGraph
 from vinagent.logger.logger import logger
 from vinagent.executor.base import GraphExecutorBase
 
+if TYPE_CHECKING:
+    from vinagent.graph.operator import FlowStateGraph
+
 
 class GraphExecutor(GraphExecutorBase):
     def __init__(
         self,
-        compiled_graph: FlowStateGraph,
+        compiled_graph: "FlowStateGraph",
         guardrail_executor: GuardrailExecutor = None,
         user_id: str = None,
         thread_id: str = None,
+        llm: Any = None,
     ):
         self.compiled_graph = compiled_graph
+        # Language model used to extract memories from the graph output
+        self.llm = llm
         self.guardrail_executor = guardrail_executor
         self.user_id = user_id
         self.thread_id = thread_id
@@ -39,6 +44,10 @@ class GraphExecutor(GraphExecutorBase):
         )
         return {"input": input_state, "config": config}
 
+    @staticmethod
+    def _memory_text(result: Any) -> str:
+        return str(getattr(result, "content", result))
+
     def _invoke_compiled_graph(
         self,
         query: str,
@@ -65,7 +74,7 @@ class GraphExecutor(GraphExecutorBase):
             self.guardrail_executor.check_output_guardrail(result)
             history.add_message(result)
             if memory and is_save_memory:
-                memory.save_memory(message=result, user_id=self.user_id)
+                memory.ingest(self.llm, self._memory_text(result), user_id=user_id)
             return result
         except ValueError as e:
             logger.error(f"Error in compiled_graph.invoke: {e}")
@@ -90,10 +99,12 @@ class GraphExecutor(GraphExecutorBase):
 
         try:
             result = await self.compiled_graph.ainvoke(**input_state)
-            self.guardrail_executor.check_output_guardrail(result)
+            await self.guardrail_executor.acheck_output_guardrail(result)
             history.add_message(result)
             if memory and is_save_memory:
-                memory.save_memory(message=result, user_id=user_id)
+                await memory.aingest(
+                    self.llm, self._memory_text(result), user_id=user_id
+                )
             return result
         except ValueError as e:
             logger.error(f"Error in compiled_graph.ainvoke: {e}")
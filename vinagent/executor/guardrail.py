@@ -1,9 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, Optional, Type
+from pydantic import BaseModel, Field, create_model
 from langchain_core.language_models.base import BaseLanguageModel
 from vinagent.logger.logger import logger
 from vinagent.guardrail import GuardrailManager, GuardRailBase
 
+FUSED_GUARDRAIL_PROMPT = """
+INPUT GUARDRAIL
+Before deciding on any tool, evaluate the user request above against the
+following guardrails and fill the `input_guardrail` field:
+{sections}
+
+FINAL DECISION RULES:
+- If any critical violation exists → action = "block"
+- If unsafe but can be rewritten → action = "rewrite"
+- Otherwise → action = "allow"
+If the request is not allowed, do not call any tool.
+"""
+
 
 class GuardrailExecutorBase(ABC):
     @abstractmethod
@@ -26,14 +40,117 @@ class GuardrailExecutor(GuardrailExecutorBase):
         input_guardrail: Optional[GuardRailBase] = None,
         output_guardrail: Optional[GuardRailBase] = None,
         llm: BaseLanguageModel = None,
+        fuse_input_guardrail: bool = False,
     ):
+        """
+        Args:
+            fuse_input_guardrail (bool): Get the input guardrail verdict from the first
+                step-1 tool-decision call instead of separate LLM calls, see `fused_prompt`.
+        """
         self.guardrail_manager = guardrail_manager
         self.input_guardrail = input_guardrail
         self.output_guardrail = output_guardrail
         self.llm = llm
+        self.fuse_input_guardrail = fuse_input_guardrail
+        self._input_decision_model = None
+        self._fused_models: Dict[Type[BaseModel], Type[BaseModel]] = {}
+
+    @property
+    def input_decision_model(self) -> Optional[Any]:
+        """GuardrailDecision model of the input guardrails, or None if there is none."""
+        if self._input_decision_model is None:
+            if self.guardrail_manager:
+                if self.guardrail_manager.input_guardrails:
+                    self._input_decision_model = self.guardrail_manager.add_guardrails(
+                        self.guardrail_manager.input_guardrails
+                    )
+            elif self.input_guardrail and getattr(
+                self.input_guardrail, "_enabled_guardrails", None
+            ):
+                self._input_decision_model = self.input_guardrail
+        return self._input_decision_model
+
+    @property
+    def is_fused(self) -> bool:
+        """Whether the input guardrail is checked by the first step-1 call."""
+        return self.fuse_input_guardrail and self.input_decision_model is not None
+
+    def settle_input_by_prefilter(self, query: str) -> bool:
+        """
+        Check the input with the pre-filter of the guardrail manager, if any.
+        Returns True when it allowed the input and raises ValueError when it blocked it.
+        """
+        if not self.guardrail_manager or not self.guardrail_manager.prefilter:
+            return False
+        decision = self.guardrail_manager.prefilter_input(query)
+        if decision is None:
+            return False
+        if not decision.allowed:
+            logger.error(f"Input is not allowed: {decision.reason}")
+            raise ValueError(decision.reason)
+        return True
+
+    def fused_response_model(self, response_model: Type[BaseModel]) -> Type[BaseModel]:
+        """Subclass of ``response_model`` carrying the input guardrail verdict."""
+        if response_model not in self._fused_models:
+            self._fused_models[response_model] = create_model(
+                f"Guarded{response_model.__name__}",
+                __base__=response_model,
+                input_guardrail=(
+                    Optional[self.input_decision_model],
+                    Field(
+                        default=None,
+                        description=(
+                            "Input guardrail verdict on the user request. "
+                            "MUST always be populated, before any tool is chosen."
+                        ),
+                    ),
+                ),
+            )
+        return self._fused_models[response_model]
+
+    def fused_prompt(self) -> str:
+        """Guardrail instructions appended to the first step-1 prompt in the fused mode."""
+        sections = self.input_decision_model.build_fused_sections()
+        return FUSED_GUARDRAIL_PROMPT.format(sections=sections)
+
+    async def afused_prompt(self) -> str:
+        sections = await self.input_decision_model.abuild_fused_sections()
+        return FUSED_GUARDRAIL_PROMPT.format(sections=sections)
+
+    def check_fused_decision(self, response: BaseModel, query: str):
+        """
+        Gate a fused step-1 response on its input guardrail verdict. Responses
+        without a verdict (e.g. parsed by the plain LLM fallback) are checked by
+        the regular input guardrail instead.
+        """
+        decision = getattr(response, "input_guardrail", None)
+        if decision is None:
+            logger.warning("No fused input guardrail verdict, checking the input.")
+            return self.check_input_guardrail(query)
+        decision = self.input_decision_model.check_fused(
+            decision, llm=self.llm, user_input=query
+        )
+        if not decision.allowed:
+            logger.error(f"Input is not allowed: {decision.reason}")
+            raise ValueError(decision.reason)
+        return False
+
+    async def acheck_fused_decision(self, response: BaseModel, query: str):
+        decision = getattr(response, "input_guardrail", None)
+        if decision is None:
+            logger.warning("No fused input guardrail verdict, checking the input.")
+            return await self.acheck_input_guardrail(query)
+        decision = self.input_decision_model.check_fused(
+            decision, llm=self.llm, user_input=query
+        )
+        if not decision.allowed:
+            logger.error(f"Input is not allowed: {decision.reason}")
+            raise ValueError(decision.reason)
+        return False
 
     def check_input_guardrail(self, query: str):
-        if self.guardrail_manager:
+        if self.guardrail_manager and self.guardrail_manager.input_guardrails:
             decision = self.guardrail_manager.validate_input(self.llm, query)
             if not decision.allowed:
                 logger.error(f"Input is not allowed: {decision.reason}")
@@ -47,8 +164,23 @@ class GuardrailExecutor(GuardrailExecutorBase):
                 return False
         return True
 
+    async def acheck_input_guardrail(self, query: str):
+        if self.guardrail_manager and self.guardrail_manager.input_guardrails:
+            decision = await self.guardrail_manager.avalidate_input(self.llm, query)
+            if not decision.allowed:
+                logger.error(f"Input is not allowed: {decision.reason}")
+                raise ValueError(decision.reason)
+            return False
+        else:
+            if self.input_guardrail:
+                decision = await self.input_guardrail.avalidate(self.llm, query)
+                if not decision.allowed:
+                    raise ValueError(decision.reason)
+                return False
+        return True
+
     def check_output_guardrail(self, output_text: str):
-        if self.guardrail_manager:
+        if self.guardrail_manager and self.guardrail_manager.output_guardrails:
             decision = self.guardrail_manager.validate_output(self.llm, output_text)
             if not decision.allowed:
                 logger.error(f"Output is not allowed: {decision.reason}")
@@ -64,6 +196,25 @@ class GuardrailExecutor(GuardrailExecutorBase):
                 return False
         return True
 
+    async def acheck_output_guardrail(self, output_text: str):
+        if self.guardrail_manager and self.guardrail_manager.output_guardrails:
+            decision = await self.guardrail_manager.avalidate_output(
+                self.llm, output_text
+            )
+            if not decision.allowed:
+                logger.error(f"Output is not allowed: {decision.reason}")
+                raise ValueError(decision.reason)
+            return False
+        else:
+            if self.output_guardrail:
+                decision = await self.output_guardrail.avalidate(self.llm, output_text)
+                logger.info(decision)
+                if not decision.allowed:
+                    logger.error(f"Output is not allowed: {decision.reason}")
+                    raise ValueError(decision.reason)
+                return False
+        return True
+
     def check_tool_guardrail(self, llm, tool_name: str, user_input: str):
         if self.guardrail_manager:
             decisions = self.guardrail_manager.validate_tools(
@@ -73,5 +224,15 @@ class GuardrailExecutor(GuardrailExecutorBase):
                 if not decision.allowed:
                     logger.error(f"Tool {tool_name} is not allowed: {decision.reason}")
                     raise ValueError(decision.reason)
-                return False
+        return True
+
+    async def acheck_tool_guardrail(self, llm, tool_name: str, user_input: str):
+        if self.guardrail_manager:
+            decisions = await self.guardrail_manager.avalidate_tools(
+                llm=self.llm, tool_name=tool_name, user_input=user_input
+            )
+            for decision in decisions:
+                if not decision.allowed:
+                    logger.error(f"Tool {tool_name} is not allowed: {decision.reason}")
+                    raise ValueError(decision.reason)
         return True
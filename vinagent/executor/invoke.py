@@ -1,11 +1,7 @@
-from typing import Union, List
-import asyncio
+from typing import TYPE_CHECKING, Optional, Union, List, Type
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import BaseTool
-from langchain_openai import ChatOpenAI
-from langchain_together import ChatTogether
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai.chat_models.base import BaseChatOpenAI
 from langchain_core.messages import ToolMessage, BaseMessage
 from vinagent.executor.base import AgentResponse
 from vinagent.executor.base import MessageHandler
@@ -17,14 +13,20 @@ from vinagent.message.adapter import adapter_ai_response_with_tool_calls
 from vinagent.prompt.agent_prompt import PromptHandler
 from vinagent.memory.history import InConversationHistory
 from vinagent.memory.memory import Memory
-from vinagent.mcp.client import DistributedMCPClient
 from vinagent.executor.base import InvokeExecutorBase
+from vinagent.executor.runner import run_sync
+from vinagent.structured import structured_output
+
+if TYPE_CHECKING:
+    from langchain_together import ChatTogether
+    from langchain_openai.chat_models.base import BaseChatOpenAI
+    from vinagent.mcp.client import DistributedMCPClient
 
 
 class InvokeExecutor(InvokeExecutorBase, MessageHandler, PromptHandler):
     def __init__(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         guardrail_executor: GuardrailExecutor = None,
         *args,
         **kwargs,
@@ -36,13 +38,14 @@ class InvokeExecutor(InvokeExecutorBase, MessageHandler, PromptHandler):
         self,
         messages: list[Union[AIMessage, ToolMessage, HumanMessage]] = [],
         tools_manager: ToolManager = None,
+        response_model: Type[AgentResponse] = AgentResponse,
     ) -> AgentResponse:
         messages = self._sanitize_history(messages)
-        self.structured_llm = self.llm.with_structured_output(
-            AgentResponse, method="function_calling"
+        structured_llm = structured_output(
+            self.llm, response_model, method="function_calling"
         )
         try:
-            response = self.structured_llm.invoke(messages)
+            response = structured_llm.invoke(messages)
             # Validate it's a proper AgentResponse, not a mis-packed string
             if isinstance(response, AgentResponse) and isinstance(
                 response.requires_tool, bool
@@ -68,6 +71,7 @@ class InvokeExecutor(InvokeExecutorBase, MessageHandler, PromptHandler):
         description: str = "",
         instruction: str = "",
         history: InConversationHistory = None,
+        tool_names: Optional[List[str]] = None,
     ) -> AgentResponse:
         """
         Step 1: Build prompt and invoke LLM to get AgentResponse.
@@ -85,8 +89,20 @@ class InvokeExecutor(InvokeExecutorBase, MessageHandler, PromptHandler):
             description=description,
             instruction=instruction,
             history=history,
+            tool_names=tool_names,
+        )
+        if not self._is_guardrail_fused(iteration, message):
+            return self.define_tools(messages=_history, tools_manager=tools_manager)
+        # Fused mode: the input guardrail verdict comes with the tool decision
+        response = self.define_tools(
+            messages=self._with_guardrail_prompt(
+                _history, self.guardrail_executor.fused_prompt()
+            ),
+            tools_manager=tools_manager,
+            response_model=self.guardrail_executor.fused_response_model(AgentResponse),
         )
-        return self.define_tools(messages=_history, tools_manager=tools_manager)
+        self.guardrail_executor.check_fused_decision(response, message)
+        return response
 
     def _step2_tool_invoke(
         self,
@@ -94,15 +110,15 @@ class InvokeExecutor(InvokeExecutorBase, MessageHandler, PromptHandler):
         response: AgentResponse,
         tools_manager: ToolManager,
         history: InConversationHistory,
-        mcp_client: DistributedMCPClient,
+        mcp_client: "DistributedMCPClient",
         mcp_server_name: str,
-    ) -> tuple[str, ToolMessage | None, bool]:
+    ) -> tuple[str, ToolMessage | List[ToolMessage] | None, bool]:
         """
         Step 2: Execute tool call (or fix_bug_command) based on AgentResponse.
 
         Returns:
             current_query (str): Updated query for the next iteration.
-            tool_message (ToolMessage | None): Result of the tool execution, or None if no tool ran.
+            tool_messages (List[ToolMessage] | None): Results of the tool calls in tool_calls order, or None if no tool ran.
             should_continue (bool): True if the loop should continue to the next iteration.
         """
         # --- 2a. Handle fix_bug_command if present ---
@@ -114,14 +130,13 @@ class InvokeExecutor(InvokeExecutorBase, MessageHandler, PromptHandler):
             return next_query, fix_msg, should_continue
 
         # --- 2b. No tool call — agent has a direct answer ---
-        if not getattr(response, "requires_tool", False) or not getattr(
-            response, "tool_call", None
-        ):
+        tool_calls = self._get_tool_calls(response)
+        if not getattr(response, "requires_tool", False) or not tool_calls:
             return current_query, None, False
 
         # --- 2c. Validate tool data ---
-        tool_data = response.tool_call.model_dump()
-        if not tool_data:
+        tool_datas = [tool_call.model_dump() for tool_call in tool_calls]
+        if not all(tool_datas):
             logger.warning(
                 "LLM generated empty or invalid tool_call. Prompting for correction."
             )
@@ -133,85 +148,78 @@ class InvokeExecutor(InvokeExecutorBase, MessageHandler, PromptHandler):
                 True,
             )
 
-        # --- 2d. Check tool guardrail permission ---
-        logger.info(f"Executing tool call: {tool_data}")
-        try:
-            is_valid_tool_permission = self.guardrail_executor.check_tool_guardrail(
-                llm=self.llm,
-                tool_name=tool_data.get("tool_name"),
-                user_input=current_query,
-            )
-        except Exception:
-            is_valid_tool_permission = False
+        # --- 2d. Check tool guardrail permission of every call ---
+        logger.info(f"Executing tool calls: {tool_datas}")
+        permissions = self._check_tool_permissions(tool_datas, current_query)
 
         # --- 2e. Adapt AIMessage to carry tool_calls metadata ---
-        content_val = response.answer if getattr(response, "answer", None) else ""
-        ai_message = adapter_ai_response_with_tool_calls(
-            tools_manager.load_tools(), AIMessage(content=content_val), tool_data
-        )
+        ai_message = self._adapt_tool_calls(response, tool_datas, tools_manager)
         history.add_message(ai_message)
 
-        # --- 2f. Execute tool ---
-        if is_valid_tool_permission:
-            tool_message = asyncio.run(
-                tools_manager._execute_tool(
-                    tool_name=tool_data["tool_name"],
-                    tool_type=tool_data["tool_type"],
-                    arguments=tool_data["arguments"],
-                    module_path=tool_data["module_path"],
+        # --- 2f. Execute permitted tools concurrently ---
+        executed = []
+        if any(permissions):
+            executed = run_sync(
+                tools_manager._execute_tools(
+                    tool_calls=[
+                        tool_data
+                        for tool_data, is_permitted in zip(tool_datas, permissions)
+                        if is_permitted
+                    ],
                     mcp_client=mcp_client,
                     mcp_server_name=mcp_server_name,
                 )
             )
-            if tool_message is None:
-                tool_message = ToolMessage(
-                    content="Tool execution success without artifact",
-                    additional_kwargs={"is_error": False},
-                    tool_call_id=ai_message.tool_calls[0].get("id"),
-                )
-        else:
-            tool_message = ToolMessage(
-                content="Tool is not permitted by security rules.",
-                additional_kwargs={"is_error": True},
-                tool_call_id=ai_message.tool_calls[0].get("id"),
-            )
+        tool_messages = self._build_tool_messages(tool_datas, permissions, executed)
 
-        history.add_message(tool_message)
+        history.add_messages(tool_messages)
         _history = history.get_history()
 
         # --- 2g. Build next iteration context ---
-        next_query = self.prompt_tool(current_query, tool_data, tool_message, _history)
-        return next_query, tool_message, True
+        next_query = self.prompt_tools(
+            current_query, tool_datas, tool_messages, _history
+        )
+        return next_query, tool_messages, True
 
     def _step3_final_response(
         self,
         query: str,
-        tool_message: ToolMessage | None,
+        tool_messages: ToolMessage | List[ToolMessage] | None,
         is_tool_formatted: bool,
         is_save_memory: bool,
         max_history: int = None,
         history: InConversationHistory = None,
         memory: Memory = None,
         user_id: str = None,
+        tools_manager: ToolManager = None,
+        skills: list = [],
+        description: str = "",
+        instruction: str = "",
+        tool_names: Optional[List[str]] = None,
     ) -> AIMessage:
         """
         Step 3: Format and return the final response after the tool loop ends.
-        If is_tool_formatted=True, asks the LLM to summarize tool results.
-        Otherwise returns the raw last tool_message.
+        If is_tool_formatted=True, asks the LLM to summarize tool results, with the
+        agent system prompt of step 1 (see _final_messages).
+        Otherwise returns the raw tool results (see _final_tool_message).
         """
         if is_tool_formatted:
-            history.add_message(
-                HumanMessage(
-                    content=f"Based on the previous tool executions, please provide a final response to: {query}"
-                )
+            _history = self._final_messages(
+                query,
+                history,
+                max_history=max_history,
+                tools_manager=tools_manager,
+                skills=skills,
+                description=description,
+                instruction=instruction,
+                tool_names=tool_names,
             )
-            _history = history.get_history(max_history=max_history)
             final_message = self.llm.invoke(_history)
             history.add_message(final_message)
         else:
-            final_message = tool_message
+            final_message = self._final_tool_message(tool_messages)
 
-        self.check_output_guardrail(final_message)
+        self.guardrail_executor.check_output_guardrail(final_message)
 
         if memory and is_save_memory:
             final_content = (
@@ -219,10 +227,10 @@ class InvokeExecutor(InvokeExecutorBase, MessageHandler, PromptHandler):
                 if hasattr(final_message, "content")
                 else str(final_message)
             )
-            memory.save_memory(message=final_content, user_id=user_id)
+            memory.ingest(self.llm, final_content, user_id=user_id)
 
         return (
             final_message
             if hasattr(final_message, "content")
             else AIMessage(content=final_message)
-        ), history
+        )
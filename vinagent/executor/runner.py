@@ -0,0 +1,131 @@
+import os
+import atexit
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Coroutine, Optional
+from vinagent.logger.logger import logger
+
+
+class BackgroundEventLoop:
+    """
+    Long-lived asyncio event loop running in a daemon thread.
+
+    The sync executors submit their coroutines (tool execution, MCP calls) to this
+    loop instead of calling ``asyncio.run`` each time. The loop is created once, so
+    there is no per-call setup/teardown, it works when the calling thread already
+    runs an event loop (Jupyter, web servers) and connections opened on it (e.g.
+    MCP sessions) stay usable across calls.
+    """
+
+    def __init__(self, name: str = "vinagent-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Return the running background loop, starting it on first use."""
+        with self._lock:
+            # A forked child inherits the loop object but not its thread.
+            if self._loop is None or self._pid != os.getpid() or self._loop.is_closed():
+                self._start()
+            return self._loop
+
+    def _start(self) -> None:
+        ready = threading.Event()
+        loop = asyncio.new_event_loop()
+
+        def _run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=_run, name=self.name, daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop = loop
+        self._thread = thread
+        self._pid = os.getpid()
+        logger.debug(f"Started background event loop {self.name}")
+
+    def in_loop_thread(self) -> bool:
+        """True if the caller is running on the background loop thread."""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the background loop without waiting for it.
+
+        Returns:
+            concurrent.futures.Future: Future resolved with the coroutine result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the background loop and block until it completes.
+
+        Args:
+            coro (Coroutine): Coroutine to execute.
+            timeout (float, optional): Seconds to wait before cancelling it.
+
+        Returns:
+            Any: The coroutine result. Exceptions are re-raised in the caller.
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError(
+                "Cannot block on the background event loop from its own thread; "
+                "await the coroutine instead."
+            )
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+        except KeyboardInterrupt:
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """Stop the loop and wait for its thread to finish."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread, self._pid = None, None, None
+        if loop is None or loop.is_closed():
+            return
+        if thread is not None and thread.is_alive():
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+        if not loop.is_running():
+            # Cancel what is left, e.g. MCP session owners and idle reapers, so
+            # that they exit cleanly instead of being destroyed while pending
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.wait(pending, timeout=5))
+            loop.close()
+
+
+_background_loop = BackgroundEventLoop()
+atexit.register(_background_loop.close)
+
+
+def get_background_loop() -> BackgroundEventLoop:
+    """Return the process-wide background event loop."""
+    return _background_loop
+
+
+def run_sync(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    The coroutine is executed on the shared background event loop, so this works
+    whether or not the calling thread already has a running event loop.
+    """
+    return _background_loop.run(coro, timeout=timeout)
@@ -1,12 +1,10 @@
-from typing import Union, List
-import asyncio
+import queue
+import threading
+from typing import TYPE_CHECKING, Callable, Generator, Optional, Union, List, Type
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import BaseTool
-from langchain_openai import ChatOpenAI
-from langchain_together import ChatTogether
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai.chat_models.base import BaseChatOpenAI
-from langchain_core.messages import ToolMessage, BaseMessage
+from langchain_core.messages import ToolMessage, ToolMessageChunk, BaseMessage
 from vinagent.executor.base import AgentResponse
 from vinagent.executor.base import MessageHandler
 from vinagent.logger.logger import logger
@@ -17,14 +15,20 @@ from vinagent.message.adapter import adapter_ai_response_with_tool_calls
 from vinagent.prompt.agent_prompt import PromptHandler
 from vinagent.memory.history import InConversationHistory
 from vinagent.memory.memory import Memory
-from vinagent.mcp.client import DistributedMCPClient
 from vinagent.executor.base import StreamInvokeExecutorBase
+from vinagent.executor.runner import run_sync
+from vinagent.structured import structured_output
+
+if TYPE_CHECKING:
+    from langchain_together import ChatTogether
+    from langchain_openai.chat_models.base import BaseChatOpenAI
+    from vinagent.mcp.client import DistributedMCPClient
 
 
 class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandler):
     def __init__(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         guardrail_executor: GuardrailExecutor = None,
         *args,
         **kwargs,
@@ -36,13 +40,14 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
         self,
         messages: list[Union[AIMessage, ToolMessage, HumanMessage]] = [],
         tools_manager: ToolManager = None,
+        response_model: Type[AgentResponse] = AgentResponse,
     ) -> AgentResponse:
         messages = self._sanitize_history(messages)
-        self.structured_llm = self.llm.with_structured_output(
-            AgentResponse, method="function_calling"
+        structured_llm = structured_output(
+            self.llm, response_model, method="function_calling"
         )
         try:
-            response = self.structured_llm.invoke(messages)
+            response = structured_llm.invoke(messages)
             # Validate it's a proper AgentResponse, not a mis-packed string
             if isinstance(response, AgentResponse) and isinstance(
                 response.requires_tool, bool
@@ -68,6 +73,7 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
         description: str = "",
         instruction: str = "",
         history: InConversationHistory = None,
+        tool_names: Optional[List[str]] = None,
     ) -> AgentResponse:
         """
         Step 1: Build prompt and invoke LLM to get AgentResponse.
@@ -85,8 +91,20 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
             description=description,
             instruction=instruction,
             history=history,
+            tool_names=tool_names,
+        )
+        if not self._is_guardrail_fused(iteration, message):
+            return self.define_tools(messages=_history, tools_manager=tools_manager)
+        # Fused mode: the input guardrail verdict comes with the tool decision
+        response = self.define_tools(
+            messages=self._with_guardrail_prompt(
+                _history, self.guardrail_executor.fused_prompt()
+            ),
+            tools_manager=tools_manager,
+            response_model=self.guardrail_executor.fused_response_model(AgentResponse),
         )
-        return self.define_tools(messages=_history, tools_manager=tools_manager)
+        self.guardrail_executor.check_fused_decision(response, message)
+        return response
 
     def _step2_tool_invoke(
         self,
@@ -94,15 +112,17 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
         response: AgentResponse,
         tools_manager: ToolManager,
         history: InConversationHistory,
-        mcp_client: DistributedMCPClient,
+        mcp_client: "DistributedMCPClient",
         mcp_server_name: str,
-    ) -> tuple[str, ToolMessage | None, bool]:
+        on_tool_output: Optional[Callable[[ToolMessageChunk], None]] = None,
+    ) -> tuple[str, ToolMessage | List[ToolMessage] | None, bool]:
         """
         Step 2: Execute tool call (or fix_bug_command) based on AgentResponse.
+        ``on_tool_output`` receives the output of agentskill commands while they run.
 
         Returns:
             current_query (str): Updated query for the next iteration.
-            tool_message (ToolMessage | None): Result of the tool execution, or None if no tool ran.
+            tool_messages (List[ToolMessage] | None): Results of the tool calls in tool_calls order, or None if no tool ran.
             should_continue (bool): True if the loop should continue to the next iteration.
         """
         # --- 2a. Handle fix_bug_command if present ---
@@ -114,14 +134,13 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
             return next_query, fix_msg, should_continue
 
         # --- 2b. No tool call — agent has a direct answer ---
-        if not getattr(response, "requires_tool", False) or not getattr(
-            response, "tool_call", None
-        ):
+        tool_calls = self._get_tool_calls(response)
+        if not getattr(response, "requires_tool", False) or not tool_calls:
             return current_query, None, False
 
         # --- 2c. Validate tool data ---
-        tool_data = response.tool_call.model_dump()
-        if not tool_data:
+        tool_datas = [tool_call.model_dump() for tool_call in tool_calls]
+        if not all(tool_datas):
             logger.warning(
                 "LLM generated empty or invalid tool_call. Prompting for correction."
             )
@@ -133,66 +152,92 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
                 True,
             )
 
-        # --- 2d. Check tool guardrail permission ---
-        logger.info(f"Executing tool call: {tool_data}")
-        try:
-            is_valid_tool_permission = self.guardrail_executor.check_tool_guardrail(
-                llm=self.llm,
-                tool_name=tool_data.get("tool_name"),
-                user_input=current_query,
-            )
-        except Exception:
-            is_valid_tool_permission = False
+        # --- 2d. Check tool guardrail permission of every call ---
+        logger.info(f"Executing tool calls: {tool_datas}")
+        permissions = self._check_tool_permissions(tool_datas, current_query)
 
         # --- 2e. Adapt AIMessage to carry tool_calls metadata ---
-        content_val = response.answer if getattr(response, "answer", None) else ""
-        ai_message = adapter_ai_response_with_tool_calls(
-            tools_manager.load_tools(), AIMessage(content=content_val), tool_data
-        )
+        ai_message = self._adapt_tool_calls(response, tool_datas, tools_manager)
         history.add_message(ai_message)
 
-        # --- 2f. Execute tool ---
-        if is_valid_tool_permission:
-            tool_message = asyncio.run(
-                tools_manager._execute_tool(
-                    tool_name=tool_data["tool_name"],
-                    tool_type=tool_data["tool_type"],
-                    arguments=tool_data["arguments"],
-                    module_path=tool_data["module_path"],
+        # --- 2f. Execute permitted tools concurrently ---
+        executed = []
+        if any(permissions):
+            executed = run_sync(
+                tools_manager._execute_tools(
+                    tool_calls=[
+                        tool_data
+                        for tool_data, is_permitted in zip(tool_datas, permissions)
+                        if is_permitted
+                    ],
                     mcp_client=mcp_client,
                     mcp_server_name=mcp_server_name,
+                    on_output=on_tool_output,
                 )
             )
-            if tool_message is None:
-                tool_message = ToolMessage(
-                    content="Tool execution success without artifact",
-                    additional_kwargs={"is_error": False},
-                    tool_call_id=ai_message.tool_calls[0].get("id"),
-                )
-        else:
-            tool_message = ToolMessage(
-                content="Tool is not permitted by security rules.",
-                additional_kwargs={"is_error": True},
-                tool_call_id=ai_message.tool_calls[0].get("id"),
-            )
+        tool_messages = self._build_tool_messages(tool_datas, permissions, executed)
 
-        history.add_message(tool_message)
+        history.add_messages(tool_messages)
         _history = history.get_history()
 
         # --- 2g. Build next iteration context ---
-        next_query = self.prompt_tool(current_query, tool_data, tool_message, _history)
-        return next_query, tool_message, True
+        next_query = self.prompt_tools(
+            current_query, tool_datas, tool_messages, _history
+        )
+        return next_query, tool_messages, True
+
+    def _step2_tool_invoke_stream(
+        self, **kwargs
+    ) -> Generator[
+        ToolMessageChunk, None, tuple[str, ToolMessage | List[ToolMessage] | None, bool]
+    ]:
+        """
+        Step 2 yielding the output of the running tools as ToolMessageChunks.
+
+        The tools run in a worker thread while this generator forwards their
+        output. Use with ``yield from``, which evaluates to the result of
+        `_step2_tool_invoke`.
+        """
+        chunks: queue.Queue = queue.Queue()
+        done = object()
+        result = {}
+
+        def _worker():
+            try:
+                result["value"] = self._step2_tool_invoke(
+                    on_tool_output=chunks.put, **kwargs
+                )
+            except BaseException as e:
+                result["error"] = e
+            finally:
+                chunks.put(done)
+
+        worker = threading.Thread(
+            target=_worker, name="vinagent-tool-stream", daemon=True
+        )
+        worker.start()
+        while (chunk := chunks.get()) is not done:
+            yield chunk
+        worker.join()
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
 
     def _step3_final_response_stream(
         self,
         query: str,
-        tool_message: ToolMessage | None,
+        tool_messages: ToolMessage | List[ToolMessage] | None,
         is_tool_formatted: bool,
         is_save_memory: bool,
         max_history: int = None,
         history: InConversationHistory = None,
         memory: Memory = None,
         user_id: str = None,
+        tools_manager: ToolManager = None,
+        skills: list = [],
+        description: str = "",
+        instruction: str = "",
+        tool_names: Optional[List[str]] = None,
     ):
         """
         Step 3 (stream variant): Stream or yield the final response after
@@ -200,7 +245,7 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
 
         If ``is_tool_formatted=True``, asks the LLM to summarise tool
         results and yields chunks in real time.  Otherwise yields the raw
-        ``tool_message`` directly.
+        tool results (see ``_final_tool_message``).
 
         Yields:
             AIMessageChunk | ToolMessage: Streamed chunks (formatted) or
@@ -209,12 +254,16 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
         from langchain_core.messages.ai import AIMessageChunk
 
         if is_tool_formatted:
-            history.add_message(
-                HumanMessage(
-                    content=f"Based on the previous tool executions, please provide a final response to: {query}"
-                )
+            _history = self._final_messages(
+                query,
+                history,
+                max_history=max_history,
+                tools_manager=tools_manager,
+                skills=skills,
+                description=description,
+                instruction=instruction,
+                tool_names=tool_names,
             )
-            _history = history.get_history(max_history=max_history)
 
             full_content = AIMessageChunk(content="")
             for chunk in self.llm.stream(_history):
@@ -223,8 +272,9 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
 
             history.add_message(full_content)
             if memory and is_save_memory:
-                memory.save_memory(message=full_content.content, user_id=user_id)
+                memory.ingest(self.llm, full_content.content, user_id=user_id)
         else:
+            tool_message = self._final_tool_message(tool_messages)
             self.guardrail_executor.check_output_guardrail(tool_message)
             if memory and is_save_memory:
                 content = (
@@ -232,5 +282,5 @@ class StreamInvokeExecutor(StreamInvokeExecutorBase, MessageHandler, PromptHandl
                     if hasattr(tool_message, "content")
                     else str(tool_message)
                 )
-                memory.save_memory(message=content, user_id=user_id)
+                memory.ingest(self.llm, content, user_id=user_id)
             yield tool_message
@@ -1,4 +1,14 @@
-from .operator import FlowStateGraph
-from .function_graph import FunctionStateGraph
+from typing import TYPE_CHECKING
+from vinagent.lazy import lazy_exports
 
-__all__ = ["FlowStateGraph", "FunctionStateGraph"]
+_EXPORTS = {
+    "FlowStateGraph": ".operator",
+    "FunctionStateGraph": ".function_graph",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .operator import FlowStateGraph
+    from .function_graph import FunctionStateGraph
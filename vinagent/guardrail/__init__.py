@@ -1,36 +1,42 @@
-from .core import (
-    GuardrailDecision,
-    OutputGuardrailDecision,
-    GuardRailBase,
-    PIIGuardrail,
-    ScopeGuardrail,
-    ToxicityGuardrail,
-    PromptInjectionGuardrail,
-)
-from .core import (
-    OutputGuardRailBase,
-    OutputPIIGuardrail,
-    OutputToxicityGuardrail,
-    HallucinationGuardrail,
-)
-from .os_permision import OSPermissionGuardrail
-from .authen import AuthenticationGuardrail
-from .manager import GuardrailManager
+from typing import TYPE_CHECKING
+from vinagent.lazy import lazy_exports
 
+_EXPORTS = {
+    "GuardrailDecision": ".core",
+    "OutputGuardrailDecision": ".core",
+    "GuardRailBase": ".core",
+    "PIIGuardrail": ".core",
+    "ScopeGuardrail": ".core",
+    "ToxicityGuardrail": ".core",
+    "PromptInjectionGuardrail": ".core",
+    "OutputGuardRailBase": ".core",
+    "OutputPIIGuardrail": ".core",
+    "OutputToxicityGuardrail": ".core",
+    "HallucinationGuardrail": ".core",
+    "OSPermissionGuardrail": ".os_permision",
+    "AuthenticationGuardrail": ".authen",
+    "GuardrailManager": ".manager",
+    "GuardrailPreFilter": ".prefilter",
+}
 
-__all__ = [
-    "GuardrailDecision",
-    "GuardRailBase",
-    "PIIGuardrail",
-    "ScopeGuardrail",
-    "ToxicityGuardrail",
-    "PromptInjectionGuardrail",
-    "OutputGuardrailDecision",
-    "OutputGuardRailBase",
-    "OutputPIIGuardrail",
-    "OutputToxicityGuardrail",
-    "HallucinationGuardrail",
-    "AuthenticationGuardrail",
-    "GuardrailManager",
-    "OSPermissionGuardrail",
-]
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .core import (
+        GuardrailDecision,
+        OutputGuardrailDecision,
+        GuardRailBase,
+        PIIGuardrail,
+        ScopeGuardrail,
+        ToxicityGuardrail,
+        PromptInjectionGuardrail,
+        OutputGuardRailBase,
+        OutputPIIGuardrail,
+        OutputToxicityGuardrail,
+        HallucinationGuardrail,
+    )
+    from .os_permision import OSPermissionGuardrail
+    from .authen import AuthenticationGuardrail
+    from .manager import GuardrailManager
+    from .prefilter import GuardrailPreFilter
@@ -1,7 +1,10 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from pydantic import BaseModel
-from vinagent.guardrail.core import GuardRailBase
-from vinagent.oauth2.client import AuthenCard
+from vinagent.guardrail.basemodel import GuardRailBase
+from vinagent.guardrail.parallel import memoize
+
+if TYPE_CHECKING:
+    from vinagent.oauth2.client import AuthenCard
 
 
 class AuthenticationGuardrailResult(BaseModel):
@@ -18,12 +21,21 @@ class AuthenticationGuardrail(GuardRailBase):
     access_token: str | None = None
     api_url: str | None = None
 
-    def _build_auth_card(self) -> AuthenCard:
+    def _build_auth_card(self) -> "AuthenCard":
+        from vinagent.oauth2.client import AuthenCard
+
         if self.secret_path:
             return AuthenCard.from_config(self.secret_path)
         return AuthenCard(token=self.access_token, api_url=self.api_url)
 
     def validate(self, **kwargs) -> AuthenticationGuardrailResult:
+        # Verified once per request, see `vinagent.guardrail.parallel`
+        return memoize(
+            ("authentication", self.secret_path, self.access_token, self.api_url),
+            self._verify,
+        )
+
+    def _verify(self) -> AuthenticationGuardrailResult:
         try:
             auth_card = self._build_auth_card()
             is_valid = auth_card.verify_access_token()
@@ -41,8 +53,7 @@ class AuthenticationGuardrail(GuardRailBase):
                 allowed=False, reason=f"Authentication failed: {str(e)}"
             )
 
-    def prompt_section(self) -> str:
-        authen_result = self.validate()
+    def _format_prompt_section(self, authen_result: AuthenticationGuardrailResult):
         return f"""
 AUTHENTICATION CHECK
 Determine whether authentication violates based on authentication result:
@@ -52,5 +63,11 @@ Authentication result:
 {authen_result}
 """
 
+    def prompt_section(self) -> str:
+        return self._format_prompt_section(self.validate())
+
+    async def aprompt_section(self) -> str:
+        return self._format_prompt_section(await self.avalidate())
+
     def result_field(self) -> str:
         return "authentication"
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional, Literal, List, Any
 from pydantic import BaseModel, Field
 from abc import ABC, abstractmethod
@@ -20,6 +21,10 @@ class GuardRailBase(BaseModel, ABC):
     def validate(self, **kwargs) -> Any:
         """Deterministic validation of guardrail"""
 
+    async def avalidate(self, **kwargs) -> Any:
+        """Async validation of guardrail, runs `validate` in a worker thread by default"""
+        return await asyncio.to_thread(self.validate, **kwargs)
+
 
 class OutputGuardRailBase(BaseModel, ABC):
     name: str = Field(description="The name of guardrail")
@@ -39,3 +44,7 @@ class OutputGuardRailBase(BaseModel, ABC):
 
     def validate(self, **kwargs) -> Any:
         """Deterministic validation of guardrail"""
+
+    async def avalidate(self, **kwargs) -> Any:
+        """Async validation of guardrail, runs `validate` in a worker thread by default"""
+        return await asyncio.to_thread(self.validate, **kwargs)
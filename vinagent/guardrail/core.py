@@ -1,9 +1,13 @@
+import asyncio
+import functools
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, Field, create_model
-from typing import Optional, Literal, List, Type, ClassVar
+from typing import Dict, Optional, Literal, List, Tuple, Type, ClassVar
 from vinagent.guardrail.basemodel import GuardRailBase, OutputGuardRailBase
 from vinagent.guardrail.authen import AuthenticationGuardrail
 from vinagent.guardrail.os_permision import OSPermissionGuardrail
+from vinagent.structured import structured_output
+from vinagent.guardrail.parallel import run_parallel
 
 
 class PIIGuardrail(GuardRailBase):
@@ -75,6 +79,10 @@ Examples:
         return "prompt_injection"
 
 
+# Guardrail configuration -> dynamic GuardrailDecision subclass
+_decision_models: Dict[Tuple, Type["GuardrailDecision"]] = {}
+
+
 class BaseGuardrailDecision(BaseModel):
     allowed: bool = Field(description="Final decision whether the input is allowed")
     action: Literal["allow", "block", "rewrite"]
@@ -92,7 +100,22 @@ class GuardrailDecision(BaseGuardrailDecision):
     ) -> Type["GuardrailDecision"]:
         """
         Returns a GuardrailDecision subclass with selected guardrails enabled.
+
+        The subclass is built once per guardrail configuration (types and
+        parameters of the guardrails) and reused by later calls.
         """
+        key = (cls, tuple((type(g), g.model_dump_json()) for g in guardrails))
+        DynamicDecision = _decision_models.get(key)
+        if DynamicDecision is None:
+            DynamicDecision = _decision_models.setdefault(
+                key, cls._build_decision_model(guardrails)
+            )
+        return DynamicDecision
+
+    @classmethod
+    def _build_decision_model(
+        cls, guardrails: List[GuardRailBase]
+    ) -> Type["GuardrailDecision"]:
         fields = {}
 
         for g in guardrails:
@@ -105,7 +128,7 @@ class GuardrailDecision(BaseGuardrailDecision):
             "DynamicGuardrailDecision", __base__=cls, **fields
         )
 
-        DynamicDecision._enabled_guardrails = guardrails
+        DynamicDecision._enabled_guardrails = list(guardrails)
         return DynamicDecision
 
     @classmethod
@@ -113,17 +136,104 @@ class GuardrailDecision(BaseGuardrailDecision):
         if not cls._enabled_guardrails:
             raise ValueError("No guardrails enabled")
 
+        def _section(g) -> str:
+            if isinstance(g, AuthenticationGuardrail):
+                return str(g.prompt_section())
+            elif isinstance(g, OSPermissionGuardrail):
+                return str(g.prompt_section(llm=llm, user_input=user_input))
+            return g.prompt_section()
+
+        # Guardrails validated while building their section run concurrently
+        calls = [functools.partial(_section, g) for g in cls._enabled_guardrails]
+        validated = (AuthenticationGuardrail, OSPermissionGuardrail)
+        if sum(isinstance(g, validated) for g in cls._enabled_guardrails) > 1:
+            list_guardrails = run_parallel(calls)
+        else:
+            list_guardrails = [call() for call in calls]
+
+        return cls._compose_prompt(list_guardrails, user_input)
+
+    @classmethod
+    async def abuild_prompt(cls, llm, user_input: str) -> str:
+        """Async variant of `build_prompt`, checking the guardrails concurrently."""
+        if not cls._enabled_guardrails:
+            raise ValueError("No guardrails enabled")
+
+        async def _section(g) -> str:
+            if isinstance(g, AuthenticationGuardrail):
+                return str(await g.aprompt_section())
+            elif isinstance(g, OSPermissionGuardrail):
+                return str(await g.aprompt_section(llm=llm, user_input=user_input))
+            return g.prompt_section()
+
+        list_guardrails = await asyncio.gather(
+            *[_section(g) for g in cls._enabled_guardrails]
+        )
+        return cls._compose_prompt(list_guardrails, user_input)
+
+    @classmethod
+    def build_fused_sections(cls) -> str:
+        """
+        Guardrail sections of the fused step-1 prompt (see `GuardrailExecutor.fused_prompt`).
+        No section makes its own LLM call.
+        """
+        if not cls._enabled_guardrails:
+            raise ValueError("No guardrails enabled")
+
         list_guardrails = []
         for g in cls._enabled_guardrails:
-            if isinstance(g, AuthenticationGuardrail):
+            if isinstance(g, OSPermissionGuardrail):
+                list_guardrails.append(g.fused_prompt_section())
+            else:
                 list_guardrails.append(str(g.prompt_section()))
+        return "\n".join(list_guardrails)
+
+    @classmethod
+    async def abuild_fused_sections(cls) -> str:
+        """Async variant of `build_fused_sections`, checking the guardrails concurrently."""
+        if not cls._enabled_guardrails:
+            raise ValueError("No guardrails enabled")
+
+        async def _section(g) -> str:
+            if isinstance(g, AuthenticationGuardrail):
+                return str(await g.aprompt_section())
             elif isinstance(g, OSPermissionGuardrail):
-                list_guardrails.append(
-                    str(g.prompt_section(llm=llm, user_input=user_input))
-                )
-            else:
-                list_guardrails.append(g.prompt_section())
+                return g.fused_prompt_section()
+            return g.prompt_section()
+
+        list_guardrails = await asyncio.gather(
+            *[_section(g) for g in cls._enabled_guardrails]
+        )
+        return "\n".join(list_guardrails)
+
+    @classmethod
+    def check_fused(
+        cls, decision: "GuardrailDecision", llm=None, user_input: str = None
+    ) -> "GuardrailDecision":
+        """
+        Apply the deterministic checks to a verdict returned by the fused step-1 call:
+        a denied OS permission blocks the input whatever the model decided.
+        Given ``llm`` and ``user_input``, the extracted OS-permission intent is
+        memoized for the tool guardrails of the request.
+        """
+        for g in cls._enabled_guardrails:
+            if isinstance(g, OSPermissionGuardrail):
+                extracted = getattr(decision, g.result_field(), None)
+                if llm is not None and user_input is not None:
+                    g.remember_extracted(llm, user_input, extracted)
+                result = g.validate_extracted(extracted)
+                if not result.allowed:
+                    return decision.model_copy(
+                        update={
+                            "allowed": False,
+                            "action": "block",
+                            "reason": f"{g.name}: {result.reason}",
+                        }
+                    )
+        return decision
 
+    @staticmethod
+    def _compose_prompt(list_guardrails: List[str], user_input: str) -> str:
         sections = "\n".join(list_guardrails)
 
         return f"""
@@ -149,10 +259,17 @@ User input:
     @classmethod
     def validate(cls, llm, user_input: str):
         prompt = cls.build_prompt(llm, user_input)
-        guardrail_llm = llm.with_structured_output(cls)
+        guardrail_llm = structured_output(llm, cls)
         decision = guardrail_llm.invoke(prompt)
         return decision
 
+    @classmethod
+    async def avalidate(cls, llm, user_input: str):
+        prompt = await cls.abuild_prompt(llm, user_input)
+        guardrail_llm = structured_output(llm, cls)
+        decision = await guardrail_llm.ainvoke(prompt)
+        return decision
+
 
 class OutputPIIGuardrail(OutputGuardRailBase):
     name: str = "pii"
@@ -1,8 +1,8 @@
-from typing import List, Union
+import asyncio
+import functools
+from typing import List, Optional, Union
 import yaml
-from langchain_together import ChatTogether
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai.chat_models.base import BaseChatOpenAI
 
 from vinagent.guardrail import (
     AuthenticationGuardrail,
@@ -16,17 +16,38 @@ from vinagent.guardrail import (
     HallucinationGuardrail,
     OSPermissionGuardrail,
 )
+from vinagent.guardrail.prefilter import GuardrailPreFilter
+from vinagent.guardrail.parallel import run_parallel
 
 
 class GuardrailManager:
 
-    def __init__(self, yaml_path: str):
+    def __init__(
+        self,
+        yaml_path: str,
+        prefilter: Union[bool, GuardrailPreFilter, None] = None,
+    ):
+        """
+        Args:
+            yaml_path (str): Path to the guardrails YAML file.
+            prefilter (Union[bool, GuardrailPreFilter], optional): Deterministic pre-filter
+                settling input and output checks without an LLM call when it can, see
+                `GuardrailPreFilter`. Defaults to the ``guardrails.prefilter`` key of the
+                YAML file, a flag or the `GuardrailPreFilter` options, itself False by default.
+        """
         self.yaml_path = yaml_path
         self.config = self._load_yaml()
         self.input_guardrails = []
         self.output_guardrails = []
         self.tool_guardrails = {}
         self._initialize_guardrails()
+        if prefilter is None:
+            prefilter = self.config.get("guardrails", {}).get("prefilter", False)
+        if prefilter is True:
+            prefilter = GuardrailPreFilter()
+        elif isinstance(prefilter, dict):
+            prefilter = GuardrailPreFilter(**prefilter)
+        self.prefilter: Optional[GuardrailPreFilter] = prefilter or None
 
     def _load_yaml(self):
         with open(self.yaml_path, "r") as f:
@@ -65,43 +86,109 @@ class GuardrailManager:
         DecisionModel = GuardrailDecision.add_guardrails(guardrails)
         return DecisionModel
 
+    def _prefilter(self, DecisionModel, text: str):
+        """Decision settled by the pre-filter, or None to ask the LLM."""
+        if self.prefilter is None:
+            return None
+        return self.prefilter.decide(DecisionModel, text)
+
+    def prefilter_input(self, user_input: str):
+        """Input decision settled by the pre-filter alone, or None."""
+        if not self.input_guardrails:
+            return None
+        return self._prefilter(self.add_guardrails(self.input_guardrails), user_input)
+
     def validate_input(self, llm, user_input: str, **kwargs):
         DecisionModel = self.add_guardrails(self.input_guardrails)
-        result = DecisionModel.validate(llm, user_input)
+        result = self._prefilter(DecisionModel, user_input)
+        if result is None:
+            result = DecisionModel.validate(llm, user_input)
+        return result
+
+    async def avalidate_input(self, llm, user_input: str, **kwargs):
+        DecisionModel = self.add_guardrails(self.input_guardrails)
+        result = self._prefilter(DecisionModel, user_input)
+        if result is None:
+            result = await DecisionModel.avalidate(llm, user_input)
         return result
 
+    def _check_os_permission_kwargs(self, **kwargs):
+        llm = kwargs.get("llm")
+        user_input = kwargs.get("user_input")
+        if llm is None or user_input is None:
+            missing = []
+            if llm is None:
+                missing.append("llm")
+            if user_input is None:
+                missing.append("user_input")
+            raise ValueError(
+                f"Missing required argument(s) for OSPermissionGuardrail: "
+                f"{', '.join(missing)}. "
+                f"Please call validate_tools(..., llm=..., user_input=...)"
+            )
+
     def validate_tools(self, tool_name: str | None = None, **kwargs):
         def _validate(guardrail):
             if isinstance(guardrail, OSPermissionGuardrail):
-                llm = kwargs.get("llm")
-                user_input = kwargs.get("user_input")
-                if llm is None or user_input is None:
-                    missing = []
-                    if llm is None:
-                        missing.append("llm")
-                    if user_input is None:
-                        missing.append("user_input")
-                    raise ValueError(
-                        f"Missing required argument(s) for OSPermissionGuardrail: "
-                        f"{', '.join(missing)}. "
-                        f"Please call validate_tools(..., llm=..., user_input=...)"
-                    )
-
+                self._check_os_permission_kwargs(**kwargs)
                 return guardrail.validate(
                     llm=kwargs.get("llm"),
                     user_input=kwargs.get("user_input"),
                 )
             return guardrail.validate(**kwargs)
 
+        # Every guardrail of every selected tool is evaluated concurrently
         if tool_name:
-            return [_validate(g) for g in self.tool_guardrails.get(tool_name, [])]
-
-        return {
-            name: [_validate(g) for g in guardrails]
+            return run_parallel(
+                [
+                    functools.partial(_validate, g)
+                    for g in self.tool_guardrails.get(tool_name, [])
+                ]
+            )
+
+        pairs = [
+            (name, g)
             for name, guardrails in self.tool_guardrails.items()
-        }
+            for g in guardrails
+        ]
+        results = run_parallel([functools.partial(_validate, g) for _, g in pairs])
+        grouped = {name: [] for name in self.tool_guardrails}
+        for (name, _), result in zip(pairs, results):
+            grouped[name].append(result)
+        return grouped
+
+    async def avalidate_tools(self, tool_name: str | None = None, **kwargs):
+        async def _validate(guardrail):
+            if isinstance(guardrail, OSPermissionGuardrail):
+                self._check_os_permission_kwargs(**kwargs)
+                return await guardrail.avalidate(
+                    llm=kwargs.get("llm"),
+                    user_input=kwargs.get("user_input"),
+                )
+            return await guardrail.avalidate(**kwargs)
+
+        async def _validate_all(guardrails):
+            return list(await asyncio.gather(*[_validate(g) for g in guardrails]))
+
+        if tool_name:
+            return await _validate_all(self.tool_guardrails.get(tool_name, []))
+
+        names = list(self.tool_guardrails)
+        results = await asyncio.gather(
+            *[_validate_all(self.tool_guardrails[name]) for name in names]
+        )
+        return dict(zip(names, results))
 
     def validate_output(self, llm, output_text: str, **kwargs):
         DecisionModel = self.add_guardrails(self.output_guardrails)
-        result = DecisionModel.validate(llm, output_text)
+        result = self._prefilter(DecisionModel, output_text)
+        if result is None:
+            result = DecisionModel.validate(llm, output_text)
+        return result
+
+    async def avalidate_output(self, llm, output_text: str, **kwargs):
+        DecisionModel = self.add_guardrails(self.output_guardrails)
+        result = self._prefilter(DecisionModel, output_text)
+        if result is None:
+            result = await DecisionModel.avalidate(llm, output_text)
         return result
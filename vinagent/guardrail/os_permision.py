@@ -3,6 +3,8 @@ from typing import Literal, Optional
 from pydantic import BaseModel
 import logging
 from vinagent.guardrail.basemodel import GuardRailBase
+from vinagent.structured import structured_output
+from vinagent.guardrail.parallel import amemoize, memoize
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -66,11 +68,32 @@ User input:
             )
             return FileIntent(file_path=self.file_name, action=self.action)
         prompt = self.intent_extraction_prompt(user_input)
-        intent_llm = llm.with_structured_output(FileIntent)
-        # Replace with your LLM call
-        llm_response = intent_llm.invoke(prompt)
-        # Expecting strict JSON
-        return llm_response
+        intent_llm = structured_output(llm, FileIntent)
+        # Extracted once per request, shared by the input and tool guardrails
+        return memoize(
+            self._intent_key(llm, user_input), lambda: intent_llm.invoke(prompt)
+        )
+
+    async def _aextract_intent(self, llm, user_input: str) -> FileIntent:
+        if self.file_name and self.action:
+            return FileIntent(file_path=self.file_name, action=self.action)
+        prompt = self.intent_extraction_prompt(user_input)
+        intent_llm = structured_output(llm, FileIntent)
+        return await amemoize(
+            self._intent_key(llm, user_input), lambda: intent_llm.ainvoke(prompt)
+        )
+
+    @staticmethod
+    def _intent_key(llm, user_input: str) -> tuple:
+        return ("os_permission_intent", id(llm), user_input)
+
+    def remember_extracted(
+        self, llm, user_input: str, extracted: Optional["OSPermissionGuardrail"]
+    ) -> None:
+        """Memoize, for the current request, the intent filled by the fused step-1 call."""
+        if extracted is not None and not (self.file_name and self.action):
+            intent = FileIntent(file_path=extracted.file_name, action=extracted.action)
+            memoize(self._intent_key(llm, user_input), lambda: intent)
 
     # ------------------------------------
     # 2. Deterministic Permission Check
@@ -117,21 +140,33 @@ User input:
     # ------------------------------------
     # 3. Public Validate
     # ------------------------------------
+    def _validate_intent(self, intent: FileIntent) -> OSPermissionGuardrailResult:
+        if not intent.file_path or not intent.action:
+            return OSPermissionGuardrailResult(
+                allowed=False,
+                file_path=intent.file_path,
+                permission_type=intent.action,
+                reason="Could not extract file operation intent.",
+            )
+        return self._validate_permission(intent.file_path, intent.action)
+
     def validate(self, llm, user_input: str, **kwargs) -> OSPermissionGuardrailResult:
         try:
             intent = self._extract_intent(llm, user_input)
+            return self._validate_intent(intent)
 
-            if not intent.file_path or not intent.action:
-                return OSPermissionGuardrailResult(
-                    allowed=False,
-                    file_path=intent.file_path,
-                    permission_type=intent.action,
-                    reason="Could not extract file operation intent.",
-                )
-            validate_permission = self._validate_permission(
-                intent.file_path, intent.action
+        except Exception as e:
+            return OSPermissionGuardrailResult(
+                allowed=False,
+                reason=f"Guardrail execution failed: {str(e)}",
             )
-            return validate_permission
+
+    async def avalidate(
+        self, llm, user_input: str, **kwargs
+    ) -> OSPermissionGuardrailResult:
+        try:
+            intent = await self._aextract_intent(llm, user_input)
+            return self._validate_intent(intent)
 
         except Exception as e:
             return OSPermissionGuardrailResult(
@@ -139,8 +174,9 @@ User input:
                 reason=f"Guardrail execution failed: {str(e)}",
             )
 
-    def prompt_section(self, llm, user_input: str) -> str:
-        validate_result = self.validate(llm=llm, user_input=user_input)
+    def _format_prompt_section(
+        self, validate_result: OSPermissionGuardrailResult
+    ) -> str:
         return f"""
 OS PERMISSION CHECK
 Determine whether OS permission violates based on validation result:
@@ -150,5 +186,41 @@ Validation result:
 {validate_result}
 """
 
+    def fused_prompt_section(self) -> str:
+        """
+        Section of the fused step-1 prompt: the model fills the requested file
+        operation into the ``os_permission`` field instead of a separate
+        intent-extraction call, and `validate_extracted` checks it afterwards.
+        """
+        if self.file_name and self.action:
+            return self._format_prompt_section(self.validate_extracted(None))
+        return """
+OS PERMISSION CHECK
+Fill the `os_permission` field with the file operation requested by the user:
+- file_name: the file or directory path, null if no path is found
+- action: "read" to view, list or open; "write" to modify, delete or create; "execute" to run; null if no operation is found
+The OS permission itself is checked on the file system after your answer.
+"""
+
+    def validate_extracted(
+        self, extracted: Optional["OSPermissionGuardrail"]
+    ) -> OSPermissionGuardrailResult:
+        """Deterministic check of the intent filled by the fused step-1 call."""
+        if self.file_name and self.action:
+            intent = FileIntent(file_path=self.file_name, action=self.action)
+        elif extracted is not None:
+            intent = FileIntent(file_path=extracted.file_name, action=extracted.action)
+        else:
+            intent = FileIntent()
+        return self._validate_intent(intent)
+
+    def prompt_section(self, llm, user_input: str) -> str:
+        validate_result = self.validate(llm=llm, user_input=user_input)
+        return self._format_prompt_section(validate_result)
+
+    async def aprompt_section(self, llm, user_input: str) -> str:
+        validate_result = await self.avalidate(llm=llm, user_input=user_input)
+        return self._format_prompt_section(validate_result)
+
     def result_field(self) -> str:
         return "os_permission"
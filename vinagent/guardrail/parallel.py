@@ -0,0 +1,169 @@
+import asyncio
+import inspect
+import functools
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Hashable, Iterator, List, Optional
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+MAX_GUARDRAIL_WORKERS = 8
+_POOL_THREAD_PREFIX = "vinagent-guardrail"
+
+
+class GuardrailMemo:
+    """
+    Results of guardrail evaluations within one request, keyed by (guardrail, input).
+
+    Concurrent evaluations of the same key share one computation, so e.g. the
+    OS-permission intent is extracted once per request even when both the
+    input guardrail and the tool guardrails need it.
+    """
+
+    def __init__(self):
+        self._results: dict = {}
+        self._lock = threading.Lock()
+
+    def _claim(self, key: Hashable):
+        with self._lock:
+            future = self._results.get(key)
+            if future is not None:
+                return future, False
+            future = self._results[key] = Future()
+            return future, True
+
+    def _fail(self, key: Hashable, future: Future, e: BaseException) -> None:
+        # Failures are shared with the current waiters but not memoized
+        with self._lock:
+            self._results.pop(key, None)
+        future.set_exception(e)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        future, owner = self._claim(key)
+        if owner:
+            try:
+                future.set_result(compute())
+            except BaseException as e:
+                self._fail(key, future, e)
+                raise
+        return future.result()
+
+    async def aget_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        future, owner = self._claim(key)
+        if owner:
+            try:
+                future.set_result(await compute())
+            except BaseException as e:
+                self._fail(key, future, e)
+                raise
+            return future.result()
+        return await asyncio.wrap_future(future)
+
+
+_request_memo: contextvars.ContextVar[Optional[GuardrailMemo]] = contextvars.ContextVar(
+    "vinagent_guardrail_memo", default=None
+)
+
+
+@contextmanager
+def guardrail_request() -> Iterator[GuardrailMemo]:
+    """
+    Scope of one request: guardrail results are memoized until it exits.
+    Nested scopes share the memo of the outermost one.
+    """
+    previous = _request_memo.get()
+    memo = previous or GuardrailMemo()
+    # Restore by value rather than by token: generators may resume in another context
+    _request_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _request_memo.set(previous)
+
+
+def guardrail_scope(func: Callable) -> Callable:
+    """Decorator running a function, coroutine or (async) generator in a `guardrail_request`."""
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def _async_gen(*args, **kwargs):
+            with guardrail_request():
+                async for item in func(*args, **kwargs):
+                    yield item
+
+        return _async_gen
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def _async(*args, **kwargs):
+            with guardrail_request():
+                return await func(*args, **kwargs)
+
+        return _async
+
+    if inspect.isgeneratorfunction(func):
+
+        @functools.wraps(func)
+        def _gen(*args, **kwargs):
+            with guardrail_request():
+                yield from func(*args, **kwargs)
+
+        return _gen
+
+    @functools.wraps(func)
+    def _sync(*args, **kwargs):
+        with guardrail_request():
+            return func(*args, **kwargs)
+
+    return _sync
+
+
+def memoize(key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Compute a guardrail result once per request, or every time outside a request."""
+    memo = _request_memo.get()
+    if memo is None:
+        return compute()
+    return memo.get_or_compute(key, compute)
+
+
+async def amemoize(key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Async variant of `memoize`."""
+    memo = _request_memo.get()
+    if memo is None:
+        return await compute()
+    return await memo.aget_or_compute(key, compute)
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=MAX_GUARDRAIL_WORKERS,
+                thread_name_prefix=_POOL_THREAD_PREFIX,
+            )
+        return _pool
+
+
+def run_parallel(calls: List[Callable[[], Any]]) -> List[Any]:
+    """
+    Run blocking guardrail evaluations concurrently and return their results in order.
+
+    Each call runs in a copy of the caller's context, so it shares the request
+    memo. A single call, or calls made from a pool thread (nested evaluations),
+    run inline so that the pool can never wait on itself. The first exception
+    is raised after every call has completed.
+    """
+    if len(calls) <= 1 or threading.current_thread().name.startswith(
+        _POOL_THREAD_PREFIX
+    ):
+        return [call() for call in calls]
+    pool = _get_pool()
+    futures = [pool.submit(contextvars.copy_context().run, call) for call in calls]
+    wait(futures)
+    return [future.result() for future in futures]
@@ -0,0 +1,38 @@
+import sys
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build the module ``__getattr__`` and ``__dir__`` of a package with lazy exports.
+
+    Each exported name is imported from its submodule on first access (PEP 562)
+    and then cached in the package namespace, so importing the package itself
+    does not import its heavy dependencies.
+
+    Args:
+        package (str): ``__name__`` of the package.
+        exports (Dict[str, str]): Exported name -> relative submodule, e.g. ``{"Agent": ".agent"}``.
+
+    Returns:
+        Tuple[Callable, Callable]: The ``__getattr__`` and ``__dir__`` functions of the package.
+
+    Example:
+        __getattr__, __dir__ = lazy_exports(__name__, {"Agent": ".agent"})
+    """
+
+    def __getattr__(name: str) -> Any:
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -1,3 +1,13 @@
-from .tools import load_mcp_tools, load_mcp_tools_sync
+from typing import TYPE_CHECKING
+from vinagent.lazy import lazy_exports
 
-__all__ = ["load_mcp_tools", "load_mcp_tools_sync"]
+_EXPORTS = {
+    "load_mcp_tools": ".tools",
+    "load_mcp_tools_sync": ".tools",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .tools import load_mcp_tools, load_mcp_tools_sync
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from mcp.types import Tool as MCPTool
+
+from .sessions import Connection
+
+logger = logging.getLogger(__name__)
+
+
+def connection_cache_key(connection: Connection) -> str:
+    """Return a stable hash of a connection config.
+
+    Any change of the command, arguments, URL, headers or environment of a server
+    gives a new key, so a cache entry never outlives the config it was built for.
+    """
+    payload = json.dumps(connection, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolSchemaCache:
+    """On-disk cache of the MCP tool schemas advertised by each server.
+
+    Entries are keyed by `connection_cache_key` and store the raw `list_tools`
+    result, so cached tools can be rebuilt without contacting the server. The
+    file is rewritten atomically (temporary file + `os.replace`).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Path to the JSON cache file
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring invalid MCP tools cache {self.path}: {e}")
+            return {}
+
+    def _write(self, data: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=str(self.path.parent), prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def get(self, connection: Connection) -> list[MCPTool] | None:
+        """Return the cached tools of a connection, or None on a cache miss."""
+        with self._lock:
+            entry = self._read().get(connection_cache_key(connection))
+        if not entry:
+            return None
+        try:
+            return [MCPTool.model_validate(tool) for tool in entry["tools"]]
+        except Exception as e:
+            logger.warning(f"Ignoring invalid MCP tools cache entry: {e}")
+            return None
+
+    def set(self, connection: Connection, tools: list[MCPTool]) -> None:
+        """Store the tools listed by a server."""
+        entry = {
+            "transport": connection.get("transport"),
+            "updated_at": time.time(),
+            "tools": [
+                tool.model_dump(mode="json", exclude_none=True) for tool in tools
+            ],
+        }
+        with self._lock:
+            data = self._read()
+            data[connection_cache_key(connection)] = entry
+            self._write(data)
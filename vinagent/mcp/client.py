@@ -1,4 +1,9 @@
+import asyncio
+import logging
+import weakref
+from functools import partial
 from contextlib import asynccontextmanager
+from pathlib import Path
 from types import TracebackType
 from typing import Any, AsyncIterator
 
@@ -6,7 +11,17 @@ from langchain_core.documents.base import Blob
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.tools import BaseTool
 from mcp import ClientSession
+from mcp.types import CallToolResult
+from mcp.types import Tool as MCPTool
 
+from .cache import ToolSchemaCache
+from .pool import (
+    DEFAULT_HEALTH_CHECK_INTERVAL,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_MAX_POOL_SIZE,
+    DEFAULT_RETRY_BACKOFF,
+    MCPSessionPool,
+)
 from .prompts import load_mcp_prompt
 from .resources import load_mcp_resources
 from .sessions import (
@@ -17,7 +32,9 @@ from .sessions import (
     WebsocketConnection,
     create_session,
 )
-from .tools import load_mcp_tools
+from .tools import convert_mcp_tool_to_langchain_tool, load_mcp_tools
+
+logger = logging.getLogger(__name__)
 
 ASYNC_CONTEXT_MANAGER_ERROR = (
     "DistributedMCPClient cannot be used as a context manager (e.g., async with DistributedMCPClient(...)). "
@@ -36,14 +53,24 @@ class DistributedMCPClient:
     def __init__(
         self,
         connections: dict[str, Connection] | None = None,
+        *,
+        max_pool_size: int = DEFAULT_MAX_POOL_SIZE,
+        pool_idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        pool_health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        tools_cache_path: str | Path | None = None,
     ) -> None:
         """Initialize a DistributedMCPClient with MCP servers connections.
 
         Args:
             connections: A dictionary mapping server names to connection configurations.
                 If None, no initial connections are established.
+            max_pool_size: Maximum number of pooled sessions per server
+            pool_idle_timeout: Seconds after which an unused pooled session is closed
+            pool_health_check_interval: Idle seconds after which a pooled session is pinged before reuse
+            tools_cache_path: Optional JSON file caching the tool schemas of each server. Cached
+                tools are returned immediately by `get_tools` and revalidated in the background.
 
-        Example: basic usage (starting a new session on each tool call)
+        Example: basic usage (tool calls borrow pooled sessions)
 
         ```python
         from vinagent.mcp.client import DistributedMCPClient
@@ -80,6 +107,99 @@ class DistributedMCPClient:
         self.connections: dict[str, Connection] = (
             connections if connections is not None else {}
         )
+        self.max_pool_size = max_pool_size
+        self.pool_idle_timeout = pool_idle_timeout
+        self.pool_health_check_interval = pool_health_check_interval
+        # Sessions are bound to the event loop that opened them, so pools are
+        # kept per loop and dropped together with it.
+        self._pools: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, MCPSessionPool]
+        ] = weakref.WeakKeyDictionary()
+        self.tools_cache = (
+            ToolSchemaCache(tools_cache_path) if tools_cache_path is not None else None
+        )
+        self._revalidation_tasks: set[asyncio.Task] = set()
+
+    def _check_server(self, server_name: str) -> None:
+        if server_name not in self.connections:
+            raise ValueError(
+                f"Couldn't find a server with name '{server_name}', expected one of '{list(self.connections.keys())}'"
+            )
+
+    def get_pool(self, server_name: str) -> MCPSessionPool:
+        """Return the session pool of a server for the running event loop.
+
+        Args:
+            server_name: Name of the server connection
+
+        Raises:
+            ValueError: If the server name is not found in the connections
+        """
+        self._check_server(server_name)
+        pools = self._pools.setdefault(asyncio.get_running_loop(), {})
+        pool = pools.get(server_name)
+        if pool is None:
+            pool = MCPSessionPool(
+                self.connections[server_name],
+                max_size=self.max_pool_size,
+                idle_timeout=self.pool_idle_timeout,
+                health_check_interval=self.pool_health_check_interval,
+            )
+            pools[server_name] = pool
+        return pool
+
+    @asynccontextmanager
+    async def borrow_session(self, server_name: str) -> AsyncIterator[ClientSession]:
+        """Borrow an initialized session from the server pool.
+
+        Unlike `session`, the connection is kept open after the context exits and
+        reused by the next borrower. A session is dropped from the pool if a
+        transport error escapes the context.
+
+        Args:
+            server_name: Name to identify this server connection
+
+        Yields:
+            An initialized ClientSession
+        """
+        async with self.get_pool(server_name).session() as session:
+            yield session
+
+    async def call_tool(
+        self,
+        server_name: str,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        *,
+        retries: int = 1,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+    ) -> CallToolResult:
+        """Call a tool on a pooled session, retrying when no session can be opened.
+
+        The call itself is never retried: once the request is sent, a timeout or
+        transport error may come after the server ran the tool, and running a
+        non-idempotent tool twice is worse than failing.
+
+        Args:
+            server_name: Name of the server exposing the tool
+            name: Name of the tool
+            arguments: Tool arguments
+            retries: Number of retries when connecting to the server fails
+            retry_backoff: Seconds before the first retry, doubled on every retry
+
+        Returns:
+            The raw MCP CallToolResult
+        """
+        pool = self.get_pool(server_name)
+        async with pool.session(
+            retries=retries, retry_backoff=retry_backoff
+        ) as session:
+            return await session.call_tool(name, arguments)
+
+    async def aclose(self) -> None:
+        """Close the pooled sessions opened on the running event loop."""
+        pools = self._pools.pop(asyncio.get_running_loop(), {})
+        await asyncio.gather(*(pool.close() for pool in pools.values()))
 
     @asynccontextmanager
     async def session(
@@ -100,40 +220,99 @@ class DistributedMCPClient:
         Yields:
             An initialized ClientSession
         """
-        if server_name not in self.connections:
-            raise ValueError(
-                f"Couldn't find a server with name '{server_name}', expected one of '{list(self.connections.keys())}'"
-            )
+        self._check_server(server_name)
 
         async with create_session(self.connections[server_name]) as session:
             if auto_initialize:
                 await session.initialize()
             yield session
 
-    async def get_tools(self, *, server_name: str | None = None) -> list[BaseTool]:
+    async def list_server_tools(self, server_name: str) -> list[MCPTool]:
+        """List the raw MCP tools of a server and refresh the schema cache.
+
+        Args:
+            server_name: Name of the server connection
+        """
+        async with self.borrow_session(server_name) as session:
+            result = await session.list_tools()
+        if self.tools_cache is not None:
+            try:
+                await asyncio.to_thread(
+                    self.tools_cache.set, self.connections[server_name], result.tools
+                )
+            except OSError as e:
+                logger.warning(f"Could not write MCP tools cache: {e}")
+        return result.tools
+
+    async def _revalidate_server_tools(self, server_name: str) -> None:
+        try:
+            await self.list_server_tools(server_name)
+        except Exception as e:
+            logger.warning(f"Could not revalidate MCP tools of '{server_name}': {e}")
+
+    async def _load_server_tools(
+        self, server_name: str, *, use_cache: bool
+    ) -> list[BaseTool]:
+        connection = self.connections[server_name]
+        tools = None
+        if use_cache and self.tools_cache is not None:
+            tools = await asyncio.to_thread(self.tools_cache.get, connection)
+        if tools is None:
+            tools = await self.list_server_tools(server_name)
+        else:
+            # Serve the cached schemas now and refresh them in the background
+            task = asyncio.create_task(self._revalidate_server_tools(server_name))
+            self._revalidation_tasks.add(task)
+            task.add_done_callback(self._revalidation_tasks.discard)
+
+        return [
+            convert_mcp_tool_to_langchain_tool(
+                None,
+                tool,
+                connection=connection,
+                session_provider=partial(self.borrow_session, server_name),
+            )
+            for tool in tools
+        ]
+
+    async def get_tools(
+        self, *, server_name: str | None = None, use_cache: bool = True
+    ) -> list[BaseTool]:
         """Get a list of all tools from all connected servers.
 
+        Servers are queried concurrently. If a `tools_cache_path` is configured,
+        servers with cached schemas are not waited for: their cached tools are
+        returned and revalidated in the background.
+
         Args:
             server_name: Optional name of the server to get tools from.
                 If None, all tools from all servers will be returned (default).
+            use_cache: Whether to serve cached tool schemas when available
 
-        NOTE: a new session will be created for each tool call
+        NOTE: the returned tools borrow a pooled session on each tool call
 
         Returns:
             A list of LangChain tools
         """
         if server_name is not None:
-            if server_name not in self.connections:
-                raise ValueError(
-                    f"Couldn't find a server with name '{server_name}', expected one of '{list(self.connections.keys())}'"
-                )
-            return await load_mcp_tools(None, connection=self.connections[server_name])
+            server_names = [server_name]
+        else:
+            server_names = list(self.connections)
+        for name in server_names:
+            self._check_server(name)
+
+        server_tools = await asyncio.gather(
+            *(
+                self._load_server_tools(name, use_cache=use_cache)
+                for name in server_names
+            )
+        )
+        return [tool for tools in server_tools for tool in tools]
 
-        all_tools: list[BaseTool] = []
-        for connection in self.connections.values():
-            tools = await load_mcp_tools(None, connection=connection)
-            all_tools.extend(tools)
-        return all_tools
+    async def wait_for_revalidation(self) -> None:
+        """Wait until the background revalidations of cached tools are done."""
+        if self._revalidation_tasks:
+            await asyncio.gather(*list(self._revalidation_tasks))
 
     async def get_prompt(
         self,
@@ -143,7 +322,7 @@ class DistributedMCPClient:
         arguments: dict[str, Any] | None = None,
     ) -> list[HumanMessage | AIMessage]:
         """Get a prompt from a given MCP server."""
-        async with self.session(server_name) as session:
+        async with self.borrow_session(server_name) as session:
             prompt = await load_mcp_prompt(session, prompt_name, arguments=arguments)
             return prompt
 
@@ -159,7 +338,7 @@ class DistributedMCPClient:
         Returns:
             A list of LangChain Blobs
         """
-        async with self.session(server_name) as session:
+        async with self.borrow_session(server_name) as session:
             resources = await load_mcp_resources(session, uris=uris)
             return resources
 
@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+
+from .sessions import Connection, create_session
+
+DEFAULT_MAX_POOL_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+DEFAULT_PING_TIMEOUT = 5.0
+DEFAULT_RETRY_BACKOFF = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """An initialized MCP session kept open by a dedicated owner task.
+
+    The transports of `create_session` are anyio task groups, which must be exited
+    by the task that entered them. The owner task enters the session context,
+    signals readiness and keeps the context open until `close` is called, so the
+    session can be borrowed by any task running on the same event loop.
+    """
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self.session: ClientSession | None = None
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: BaseException | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> "PooledSession":
+        """Open and initialize the session.
+
+        Raises:
+            Exception: The connection or `initialize` error, if any.
+        """
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    async def _run(self) -> None:
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except BaseException as e:  # noqa: BLE001 - surfaced through start()
+            if not self._ready.is_set():
+                self._error = e
+            else:
+                logger.debug(f"MCP session closed with error: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self.session is not None
+            and self._task is not None
+            and not self._task.done()
+            and not self._closing.is_set()
+        )
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_used
+
+    async def ping(self, timeout: float = DEFAULT_PING_TIMEOUT) -> bool:
+        """Check that the server still answers on this session."""
+        if not self.is_alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            logger.info(f"MCP session failed health check: {e}")
+            return False
+
+    async def close(self) -> None:
+        """Close the session and wait for its owner task to exit."""
+        self._closing.set()
+        if self._task is not None and not self._task.done():
+            try:
+                await self._task
+            except BaseException as e:  # noqa: BLE001
+                logger.debug(f"Error while closing MCP session: {e}")
+
+
+class MCPSessionPool:
+    """Pool of initialized sessions to a single MCP server.
+
+    Sessions are created on demand up to `max_size`, reused across tool calls,
+    health-checked with a ping when they were idle for longer than
+    `health_check_interval` and closed once idle for longer than `idle_timeout`,
+    by a reaper task running while idle sessions remain. A pool is bound to the
+    event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        *,
+        max_size: int = DEFAULT_MAX_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        ping_timeout: float = DEFAULT_PING_TIMEOUT,
+    ) -> None:
+        """Initialize a session pool.
+
+        Args:
+            connection: Connection config of the MCP server
+            max_size: Maximum number of open sessions, borrowed or idle
+            idle_timeout: Seconds after which an unused session is closed
+            health_check_interval: Idle seconds after which a session is pinged before reuse
+            ping_timeout: Seconds to wait for the ping answer
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.connection = connection
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self._idle: deque[PooledSession] = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = asyncio.Condition()
+        self._closing: set[asyncio.Task] = set()
+        self._reaper: asyncio.Task | None = None
+
+    @property
+    def size(self) -> int:
+        """Number of open sessions, borrowed or idle."""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        """Number of idle sessions."""
+        return len(self._idle)
+
+    def _discard_later(self, pooled: PooledSession) -> None:
+        self._size -= 1
+        task = asyncio.create_task(pooled.close())
+        # Keep a reference until the session is closed
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _prune_idle(self) -> None:
+        # The oldest idle sessions are on the left.
+        while self._idle and (
+            not self._idle[0].is_alive or self._idle[0].idle_for() > self.idle_timeout
+        ):
+            self._discard_later(self._idle.popleft())
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None and not self._closed:
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def _reap(self) -> None:
+        """Close expired idle sessions, so servers do not outlive an agent that stopped calling them.
+
+        Exits once no idle session is left; `release` starts it again.
+        """
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            async with self._condition:
+                self._prune_idle()
+                if not self._idle or self._closed:
+                    self._reaper = None
+                    return
+
+    async def acquire(
+        self, *, retries: int = 0, retry_backoff: float = DEFAULT_RETRY_BACKOFF
+    ) -> PooledSession:
+        """Borrow a healthy session, opening a new one if needed.
+
+        Args:
+            retries: Number of retries when the session cannot be opened
+            retry_backoff: Seconds before the first retry, doubled on every retry
+
+        Raises:
+            RuntimeError: If the pool is closed
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._acquire()
+            except Exception as e:
+                if attempt >= retries or self._closed:
+                    raise
+                delay = retry_backoff * 2**attempt
+                attempt += 1
+                logger.info(
+                    f"Could not open an MCP session ({e}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _acquire(self) -> PooledSession:
+        while True:
+            async with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("MCP session pool is closed")
+                    self._prune_idle()
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        pooled = None
+                        break
+                    await self._condition.wait()
+
+            if pooled is None:
+                try:
+                    return await PooledSession(self.connection).start()
+                except BaseException:
+                    async with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+            if pooled.idle_for() <= self.health_check_interval or await pooled.ping(
+                self.ping_timeout
+            ):
+                return pooled
+            # Unhealthy session: drop it and try again
+            await self.release(pooled, discard=True)
+
+    async def release(self, pooled: PooledSession, *, discard: bool = False) -> None:
+        """Give a borrowed session back to the pool.
+
+        Args:
+            pooled: The borrowed session
+            discard: Close the session instead of reusing it, e.g. after a transport error
+        """
+        async with self._condition:
+            if discard or self._closed or not pooled.is_alive:
+                self._discard_later(pooled)
+            else:
+                pooled.last_used = time.monotonic()
+                pooled.uses += 1
+                self._idle.append(pooled)
+                self._ensure_reaper()
+            self._condition.notify()
+
+    @asynccontextmanager
+    async def session(
+        self, *, retries: int = 0, retry_backoff: float = DEFAULT_RETRY_BACKOFF
+    ) -> AsyncIterator[ClientSession]:
+        """Borrow a session for the duration of the context.
+
+        The session is discarded if an exception escapes the context, so that a
+        broken connection is never handed out again. Error responses of the
+        server (`McpError`) keep the session, since the connection is fine.
+        Only opening the session is retried (see `acquire`), never the body of
+        the context, which may have reached the server.
+        """
+        pooled = await self.acquire(retries=retries, retry_backoff=retry_backoff)
+        discard = False
+        try:
+            yield pooled.session
+        except McpError:
+            raise
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            await self.release(pooled, discard=discard)
+
+    async def close(self) -> None:
+        """Close every idle session and refuse new borrows."""
+        async with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+            reaper, self._reaper = self._reaper, None
+        if reaper is not None:
+            reaper.cancel()
+        await asyncio.gather(*(pooled.close() for pooled in idle), *list(self._closing))
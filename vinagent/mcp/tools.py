@@ -1,4 +1,5 @@
-from typing import Any, cast
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Callable, cast
 import logging
 from langchain_core.tools import BaseTool, StructuredTool, ToolException
 from mcp import ClientSession
@@ -15,6 +16,7 @@ from mcp.types import (
 from .sessions import Connection, create_session
 
 NonTextContent = ImageContent | EmbeddedResource
+SessionProvider = Callable[[], AbstractAsyncContextManager[ClientSession]]
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -49,6 +51,7 @@ def convert_mcp_tool_to_langchain_tool(
     tool: MCPTool,
     *,
     connection: Connection | None = None,
+    session_provider: SessionProvider | None = None,
 ) -> BaseTool:
     """Convert an MCP tool to a LangChain tool.
 
@@ -58,18 +61,25 @@ def convert_mcp_tool_to_langchain_tool(
         session: MCP client session
         tool: MCP tool to convert
         connection: Optional connection config to use to create a new session if a `session` is not provided
+        session_provider: Optional factory of session contexts, e.g. `DistributedMCPClient.borrow_session`,
+            used instead of creating a new session from `connection` on every call
 
     Returns:
         a LangChain tool
     """
-    if session is None and connection is None:
-        raise ValueError("Either a session or a connection config must be provided")
+    if session is None and connection is None and session_provider is None:
+        raise ValueError(
+            "Either a session, a session provider or a connection config must be provided"
+        )
     logger.info(f"mcp original tool: {tool}")
 
     async def call_tool(
         **arguments: dict[str, Any],
     ) -> tuple[str | list[str], list[NonTextContent] | None]:
-        if session is None:
+        if session is None and session_provider is not None:
+            async with session_provider() as tool_session:
+                call_tool_result = await tool_session.call_tool(tool.name, arguments)
+        elif session is None:
             # If a session is not provided, we will create one on the fly
             async with create_session(connection) as tool_session:
                 await tool_session.initialize()
@@ -93,20 +103,28 @@ async def load_mcp_tools(
     session: ClientSession | None,
     *,
     connection: Connection | None = None,
+    session_provider: SessionProvider | None = None,
 ) -> list[BaseTool]:
     """Load all available MCP tools and convert them to LangChain tools.
 
     Args:
         session: MCP client session
         connection: Optional connection config to use to create a new session if a `session` is not provided
+        session_provider: Optional factory of session contexts used to list the tools and,
+            later, to execute them when no `session` is provided
 
     Returns:
         a list of LangChain tools
     """
-    if session is None and connection is None:
-        raise ValueError("Either a session or a connection config must be provided")
+    if session is None and connection is None and session_provider is None:
+        raise ValueError(
+            "Either a session, a session provider or a connection config must be provided"
+        )
 
-    if session is None:
+    if session is None and session_provider is not None:
+        async with session_provider() as tool_session:
+            tools = await tool_session.list_tools()
+    elif session is None:
         # If a session is not provided, we will create one on the fly
         async with create_session(connection) as tool_session:
             await tool_session.initialize()
@@ -115,7 +133,9 @@ async def load_mcp_tools(
         tools = await session.list_tools()
 
     return [
-        convert_mcp_tool_to_langchain_tool(session, tool, connection=connection)
+        convert_mcp_tool_to_langchain_tool(
+            session, tool, connection=connection, session_provider=session_provider
+        )
         for tool in tools.tools
     ]
 
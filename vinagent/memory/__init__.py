@@ -1,3 +1,20 @@
-from .memory import Memory
+from typing import TYPE_CHECKING
+from vinagent.lazy import lazy_exports
 
-__all__ = ["Memory"]
+_EXPORTS = {
+    "Memory": ".memory",
+    "SessionStore": ".session",
+    "MemoryStore": ".store",
+    "JSONMemoryStore": ".store",
+    "SQLiteMemoryStore": ".store",
+    "MemoryRetriever": ".retrieval",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .memory import Memory
+    from .session import SessionStore
+    from .store import MemoryStore, JSONMemoryStore, SQLiteMemoryStore
+    from .retrieval import MemoryRetriever
@@ -1,24 +1,96 @@
-from typing import List
-from langchain_core.messages import BaseMessage
+import json
+import math
+from typing import Callable, List, Optional
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
 from collections import deque
+from itertools import islice
+
+
+def approx_token_count(text: str) -> int:
+    """Cheap token estimate (about four characters per token)."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def message_text(message: BaseMessage) -> str:
+    """Text of a message as sent to the LLM, including its tool calls."""
+    content = message.content
+    text = content if isinstance(content, str) else json.dumps(content, default=str)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        text += json.dumps(message.tool_calls, default=str)
+    return text
 
 
 class InConversationHistory:
-    def __init__(self, messages: List[BaseMessage] = [], max_length: int = 10):
+    """
+    Sliding window of the messages of a conversation.
+
+    The window keeps at most ``max_length`` messages. If ``max_tokens`` is set,
+    `get_history` additionally returns only the most recent messages that fit in
+    that token budget, counted with ``token_counter`` (cached per message). A tool
+    call and its tool messages are never split: tool messages whose call falls
+    out of the window are dropped with it. Tool messages larger than
+    ``max_tool_message_tokens`` are shortened when added, by ``summarizer`` if
+    given, otherwise by keeping the head and the tail of their content.
+    """
+
+    def __init__(
+        self,
+        messages: List[BaseMessage] = [],
+        max_length: int = 10,
+        max_tokens: Optional[int] = None,
+        max_tool_message_tokens: Optional[int] = None,
+        token_counter: Optional[Callable[[str], int]] = None,
+        summarizer: Optional[Callable[[str], str]] = None,
+    ):
         self.max_length = max_length
-        self.history = deque(iterable=messages, maxlen=max_length)
+        self.max_tokens = max_tokens
+        self.max_tool_message_tokens = max_tool_message_tokens
+        self.token_counter = token_counter or approx_token_count
+        self.summarizer = summarizer
+        self.history = deque(maxlen=max_length)
+        # Token count of each message in `history`, kept aligned with it
+        self._token_counts = deque(maxlen=max_length)
+        self.add_messages(messages)
+
+    def _shorten(self, text: str, num_tokens: int) -> str:
+        if self.summarizer is not None:
+            return self.summarizer(text)
+        # Keep the head and the tail, where commands print their header and their errors
+        keep_chars = max(1, int(len(text) * self.max_tool_message_tokens / num_tokens))
+        head = text[: keep_chars // 2]
+        tail = text[len(text) - keep_chars // 2 :]
+        return f"{head}\n... [{num_tokens - self.max_tool_message_tokens} tokens truncated] ...\n{tail}"
+
+    def _prepare(self, message: BaseMessage) -> tuple:
+        num_tokens = self.token_counter(message_text(message))
+        if (
+            self.max_tool_message_tokens
+            and isinstance(message, ToolMessage)
+            and isinstance(message.content, str)
+            and num_tokens > self.max_tool_message_tokens
+        ):
+            message = message.model_copy(
+                update={"content": self._shorten(message.content, num_tokens)}
+            )
+            num_tokens = self.token_counter(message_text(message))
+        return message, num_tokens
 
     def add_message(self, message: BaseMessage) -> None:
+        message, num_tokens = self._prepare(message)
         self.history.append(message)
+        self._token_counts.append(num_tokens)
 
     def add_messages(self, messages: List[BaseMessage]) -> None:
-        self.history.extend(messages)
+        for message in messages:
+            self.add_message(message)
 
     def pop_left(self) -> None:
         self.history.popleft()
+        self._token_counts.popleft()
 
     def pop(self) -> None:
         self.history.pop()
+        self._token_counts.pop()
 
     def append(self) -> None:
         self.history.append()
@@ -26,9 +98,52 @@ class InConversationHistory:
     def append_left(self) -> None:
         self.history.appendleft()
 
-    def get_history(self, max_history: int = None) -> List[BaseMessage]:
+    def __len__(self) -> int:
+        return len(self.history)
+
+    @property
+    def num_tokens(self) -> int:
+        """Token count of every message in the window."""
+        return sum(self._token_counts)
+
+    def _window_start(
+        self, max_history: Optional[int], max_tokens: Optional[int]
+    ) -> int:
         len_history = len(self.history)
-        if max_history:
-            return list(self.history)[-min(max_history, len_history) :]
-        else:
-            return list(self.history)
+        start = len_history - min(max_history, len_history) if max_history else 0
+        if max_tokens:
+            used = 0
+            budget_start = len_history
+            for i, num_tokens in enumerate(reversed(self._token_counts)):
+                used += num_tokens
+                # The last message is always kept, even if it exceeds the budget
+                if used > max_tokens and i > 0:
+                    break
+                budget_start = len_history - 1 - i
+            start = max(start, budget_start)
+        # Tool messages whose tool call was cut off would be orphaned
+        end = start
+        while end < len_history and isinstance(self.history[end], ToolMessage):
+            end += 1
+        if end < len_history:
+            return end
+        # Only tool messages are left: keep the tool call that produced them
+        while start > 0 and isinstance(self.history[start], ToolMessage):
+            start -= 1
+        return start
+
+    def get_history(
+        self, max_history: int = None, max_tokens: Optional[int] = None
+    ) -> List[BaseMessage]:
+        """
+        Return the most recent messages of the window.
+
+        Args:
+            max_history (int, optional): Maximum number of messages. Defaults to None (all).
+            max_tokens (int, optional): Token budget. Defaults to ``self.max_tokens``.
+
+        Returns:
+            List[BaseMessage]: The selected messages, only those are copied.
+        """
+        start = self._window_start(max_history, max_tokens or self.max_tokens)
+        return list(islice(self.history, start, None))
@@ -0,0 +1,180 @@
+import atexit
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional, Union
+from langchain_core.language_models.base import BaseLanguageModel
+
+if TYPE_CHECKING:
+    from langchain_together import ChatTogether
+    from langchain_openai.chat_models.base import BaseChatOpenAI
+    from vinagent.memory.memory import Memory
+
+logger = logging.getLogger(__name__)
+
+_live_queues: "weakref.WeakSet[MemoryIngestionQueue]" = weakref.WeakSet()
+
+
+class MemoryIngestionQueue:
+    """
+    Background queue that turns messages into graph memory off the request path.
+
+    Messages are buffered per user. A worker thread takes up to ``max_batch_size``
+    pending messages of a user, extracts their graph with a single
+    ``LLMGraphTransformer.generate_graph`` call and applies it with
+    ``Memory.upsert_memory``. A user is processed by at most one worker at a time,
+    so updates are applied in submission order. While a batch is being extracted,
+    new messages of the same user accumulate and are extracted together next.
+    """
+
+    def __init__(
+        self,
+        memory: "Memory",
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
+        max_workers: int = 2,
+        max_batch_size: int = 8,
+        linger: float = 0.5,
+    ):
+        """
+        Initialize the ingestion queue.
+
+        Args:
+            memory (Memory): The memory receiving the extracted graphs.
+            llm (Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI]): Language model for graph generation.
+            max_workers (int, optional): Number of worker threads. Defaults to 2.
+            max_batch_size (int, optional): Maximum number of messages extracted in one LLM call. Defaults to 8.
+            linger (float, optional): Seconds a worker waits for more messages before extracting
+                an incomplete batch. Defaults to 0.5.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.memory = memory
+        self.llm = llm
+        self.max_batch_size = max_batch_size
+        self.linger = linger
+        self._pending: Dict[str, deque] = defaultdict(deque)
+        self._active: set = set()
+        self._flushing = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vinagent-memory"
+        )
+        self.processed = 0
+        self.failed = 0
+        _live_queues.add(self)
+
+    @property
+    def pending(self) -> int:
+        """Number of messages waiting to be extracted."""
+        with self._cond:
+            return sum(len(messages) for messages in self._pending.values())
+
+    def submit(self, message: str, user_id: str = "unknown_user") -> None:
+        """
+        Queue a message for extraction and return immediately.
+
+        Args:
+            message (str): The message to convert and store.
+            user_id (str, optional): The user identifier. Defaults to "unknown_user".
+
+        Raises:
+            RuntimeError: If the queue is closed.
+        """
+        if not message:
+            return
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Memory ingestion queue is closed")
+            self._pending[user_id].append(message)
+            if user_id not in self._active:
+                self._active.add(user_id)
+                self._executor.submit(self._drain, user_id)
+            else:
+                self._cond.notify_all()
+
+    def _next_batch(self, user_id: str) -> Optional[list]:
+        with self._cond:
+            pending = self._pending[user_id]
+            self._cond.wait_for(
+                lambda: len(pending) >= self.max_batch_size
+                or self._flushing
+                or self._closed,
+                timeout=self.linger,
+            )
+            if not pending:
+                del self._pending[user_id]
+                self._active.discard(user_id)
+                self._cond.notify_all()
+                return None
+            return [
+                pending.popleft() for _ in range(min(len(pending), self.max_batch_size))
+            ]
+
+    def _drain(self, user_id: str) -> None:
+        while True:
+            batch = self._next_batch(user_id)
+            if batch is None:
+                return
+            start = time.perf_counter()
+            try:
+                self.memory.save_short_term_memory(
+                    self.llm, "\n\n".join(batch), user_id=user_id
+                )
+                with self._cond:
+                    self.processed += len(batch)
+                logger.info(
+                    f"Saved {len(batch)} messages of {user_id} to memory in {time.perf_counter() - start:.2f}s"
+                )
+            except Exception as e:
+                with self._cond:
+                    self.failed += len(batch)
+                logger.error(f"Failed to save {len(batch)} messages to memory: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Extract every pending message now and wait until the memory is up to date.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Defaults to None (no limit).
+
+        Returns:
+            bool: True if the queue was drained, False on timeout.
+        """
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: not self._active, timeout=timeout)
+            finally:
+                self._flushing -= 1
+
+    async def aflush(self, timeout: Optional[float] = None) -> bool:
+        """Async version of `flush`, waiting in a worker thread."""
+        return await asyncio.to_thread(self.flush, timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Refuse new messages, extract the pending ones and stop the workers.
+
+        Args:
+            wait (bool, optional): Block until the pending messages are saved. Defaults to True.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._executor.shutdown(wait=wait)
+
+
+@atexit.register
+def _close_queues() -> None:
+    for queue in list(_live_queues):
+        queue.close(wait=True)
@@ -1,12 +1,16 @@
+import asyncio
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Literal, Union
-import json
+from typing import TYPE_CHECKING, Optional, Literal, Union
 import logging
-from aucodb.graph import LLMGraphTransformer
-from langchain_together import ChatTogether
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai.chat_models.base import BaseChatOpenAI
+from vinagent.memory.store import MemoryStore, JSONMemoryStore, SQLiteMemoryStore
+from vinagent.memory.retrieval import MemoryRetriever
+
+if TYPE_CHECKING:
+    from langchain_together import ChatTogether
+    from langchain_openai.chat_models.base import BaseChatOpenAI
+    from vinagent.memory.ingest import MemoryIngestionQueue
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -32,7 +36,7 @@ class MemoryMeta(ABC):
     @abstractmethod
     def save_short_term_memory(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         message: str,
         user_id: str = "unknown_user",
         *args,
@@ -73,7 +77,7 @@ class MemoryMeta(ABC):
 class Memory(MemoryMeta):
     """
     Concrete implementation of MemoryMeta for storing and managing conversational memory.
-    Memory is persisted in a JSON Lines file, with support for user-specific data and graph-based representations.
+    Memory is persisted by a pluggable MemoryStore (SQLite by default), with support for user-specific data and graph-based representations.
     """
 
     def __init__(
@@ -81,6 +85,9 @@ class Memory(MemoryMeta):
         memory_path: Optional[Union[Path, str]] = Path("templates/memory.jsonl"),
         is_reset_memory: bool = False,
         is_logging: bool = False,
+        backend: Literal["sqlite", "json"] = "sqlite",
+        store: Optional[MemoryStore] = None,
+        retriever: Optional[MemoryRetriever] = None,
         *args,
         **kwargs,
     ):
@@ -92,13 +99,19 @@ class Memory(MemoryMeta):
                 Defaults to Path("templates/memory.jsonl").
             is_reset_memory (bool, optional): If True, resets the memory file to an empty JSON object. Defaults to False.
             is_logging (bool, optional): If True, enables logging of memory operations. Defaults to False.
+            backend (Literal["sqlite", "json"], optional): Storage backend. "sqlite" stores the memory in
+                `memory_path` with a .db suffix and migrates an existing JSON memory file on first use;
+                "json" keeps the whole memory in the JSON file. Defaults to "sqlite".
+            store (MemoryStore, optional): Custom storage backend, overrides `backend`. Defaults to None.
+            retriever (MemoryRetriever, optional): Relevance ranking used by `retrieve_memory`, e.g. with an
+                embedding function. Defaults to a lexical MemoryRetriever.
             *args, **kwargs: Additional arguments for future extensions.
 
         Behavior:
             - Converts memory_path to a Path object if provided as a string.
             - Creates the parent directory for memory_path if it does not exist.
-            - Initializes an empty JSON file if it does not exist.
-            - Resets the memory file if is_reset_memory is True.
+            - Opens the storage backend, creating it if it does not exist.
+            - Resets the memory if is_reset_memory is True.
         """
         if isinstance(memory_path, str) and memory_path:
             self.memory_path = Path(memory_path)
@@ -107,10 +120,103 @@ class Memory(MemoryMeta):
         self.memory_path.parent.mkdir(parents=True, exist_ok=True)
         self.is_reset_memory = is_reset_memory
         self.is_logging = is_logging
-        if not self.memory_path.exists():
-            self.memory_path.write_text(json.dumps({}, indent=4), encoding="utf-8")
+        if store is not None:
+            self.store = store
+        elif backend == "json":
+            self.store = JSONMemoryStore(self.memory_path)
+        elif backend == "sqlite":
+            if self.memory_path.suffix in (".db", ".sqlite", ".sqlite3"):
+                self.store = SQLiteMemoryStore(self.memory_path)
+            else:
+                self.store = SQLiteMemoryStore(
+                    self.memory_path.with_suffix(".db"),
+                    legacy_json_path=self.memory_path,
+                )
+        else:
+            raise ValueError(f"Unknown memory backend: {backend}")
         if self.is_reset_memory:
-            self.memory_path.write_text(json.dumps({}, indent=4), encoding="utf-8")
+            self.store.reset()
+        self.retriever = retriever or MemoryRetriever()
+        # Set by `enable_background_ingestion`
+        self.ingestion_queue: Optional["MemoryIngestionQueue"] = None
+
+    def enable_background_ingestion(
+        self,
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
+        max_workers: int = 2,
+        max_batch_size: int = 8,
+        linger: float = 0.5,
+    ) -> "MemoryIngestionQueue":
+        """
+        Route `ingest` through a background MemoryIngestionQueue.
+
+        Args:
+            llm (Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI]): Language model for graph generation.
+            max_workers (int, optional): Number of worker threads. Defaults to 2.
+            max_batch_size (int, optional): Maximum number of messages extracted in one LLM call. Defaults to 8.
+            linger (float, optional): Seconds to wait for more messages before extracting a batch. Defaults to 0.5.
+
+        Returns:
+            MemoryIngestionQueue: The queue, also stored in `self.ingestion_queue`.
+        """
+        from vinagent.memory.ingest import MemoryIngestionQueue
+
+        if self.ingestion_queue is None:
+            self.ingestion_queue = MemoryIngestionQueue(
+                self,
+                llm,
+                max_workers=max_workers,
+                max_batch_size=max_batch_size,
+                linger=linger,
+            )
+        return self.ingestion_queue
+
+    def ingest(
+        self,
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
+        message: str,
+        user_id: str = "unknown_user",
+    ) -> None:
+        """
+        Save a message to memory, in the background if an ingestion queue is enabled.
+
+        Args:
+            llm (Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI]): Language model used when saving synchronously.
+            message (str): The message to convert and store.
+            user_id (str, optional): The user identifier. Defaults to "unknown_user".
+        """
+        if self.ingestion_queue is not None:
+            self.ingestion_queue.submit(message, user_id=user_id)
+        else:
+            self.save_short_term_memory(llm, message, user_id=user_id)
+
+    async def aingest(
+        self,
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
+        message: str,
+        user_id: str = "unknown_user",
+    ) -> None:
+        """Async version of `ingest`, never blocking the event loop."""
+        if self.ingestion_queue is not None:
+            self.ingestion_queue.submit(message, user_id=user_id)
+        else:
+            await asyncio.to_thread(
+                self.save_short_term_memory, llm, message, user_id=user_id
+            )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued message is saved. Returns False on timeout.
+        """
+        if self.ingestion_queue is None:
+            return True
+        return self.ingestion_queue.flush(timeout=timeout)
+
+    async def aflush(self, timeout: Optional[float] = None) -> bool:
+        """Async version of `flush`."""
+        if self.ingestion_queue is None:
+            return True
+        return await self.ingestion_queue.aflush(timeout=timeout)
 
     def load_memory_by_user(
         self,
@@ -128,10 +234,7 @@ class Memory(MemoryMeta):
         Returns:
             Union[List[dict], str]: List of memory entries if load_type is "list", or a string representation if "string".
         """
-        data = self.load_all_memory()
-        data_user = []
-        if user_id in data:
-            data_user = data[user_id]
+        data_user = self.store.load_user(user_id)
 
         if load_type == "list":
             return data_user
@@ -139,6 +242,34 @@ class Memory(MemoryMeta):
             message = self.revert_object_mess(data_user)
             return message
 
+    def retrieve_memory(
+        self,
+        query: str,
+        user_id: str = "unknown_user",
+        top_k: Optional[int] = 20,
+        max_tokens: Optional[int] = None,
+        load_type: Literal["list", "string"] = "string",
+    ):
+        """
+        Load only the memory entries of a user that are relevant to a query.
+
+        Args:
+            query (str): The current user query.
+            user_id (str, optional): The user identifier. Defaults to "unknown_user".
+            top_k (int, optional): Maximum number of entries. None keeps every entry. Defaults to 20.
+            max_tokens (int, optional): Token budget of the rendered entries. Defaults to None (no cap).
+            load_type (Literal["list", "string"], optional): Format of the returned data. Defaults to "string".
+
+        Returns:
+            Union[List[dict], str]: The selected entries, most relevant first.
+        """
+        entries = self.retriever.retrieve(
+            self.store, query, user_id=user_id, top_k=top_k, max_tokens=max_tokens
+        )
+        if load_type == "list":
+            return entries
+        return self.revert_object_mess(entries)
+
     def load_all_memory(self):
         """
         Load all memory data from the memory file.
@@ -146,30 +277,25 @@ class Memory(MemoryMeta):
         Returns:
             dict: The entire memory data as a dictionary, with user IDs as keys and lists of memory entries as values.
         """
-        with open(self.memory_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data
+        return self.store.load_all()
 
     def save_memory(self, obj: list, memory_path: Path, user_id: str = "unknown_user"):
         """
-        Save a list of memory entries for a specific user to the memory file.
+        Replace the memory entries of a specific user in the memory store.
 
         Args:
             obj (list): List of memory entries to save.
-            memory_path (Path): Path to the memory file.
+            memory_path (Path): Kept for backward compatibility, the entries are written to `self.store`.
             user_id (str, optional): The user identifier. Defaults to "unknown_user".
         """
-        memory = self.load_all_memory()
-        memory[user_id] = obj
-        with open(memory_path, "w", encoding="utf-8") as f:
-            json.dump(memory, f, indent=4, ensure_ascii=False)
+        self.store.replace_user(user_id, obj)
 
         if self.is_logging:
             logger.info(f"Saved memory!")
 
     def save_short_term_memory(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         message: str,
         user_id: str = "unknown_user",
         *args,
@@ -187,9 +313,11 @@ class Memory(MemoryMeta):
         Returns:
             list: The generated graph representation of the message.
         """
+        from aucodb.graph import LLMGraphTransformer
+
         graph_transformer = LLMGraphTransformer(llm=llm)
         graph = graph_transformer.generate_graph(message)
-        self.update_memory(user_id=user_id, graph=graph)
+        self.upsert_memory(graph, user_id=user_id)
         return graph
 
     def revert_object_mess(self, object: list[dict]):
@@ -221,51 +349,31 @@ class Memory(MemoryMeta):
             user_id (str, optional): The user identifier. Defaults to "unknown_user".
 
         Returns:
-            list: The updated list of memory entries for the user.
+            list: The updated list of memory entries for the user. Use
+                `upsert_memory` to get only the entries added or replaced.
         """
-        memory_about_user = self.load_memory_by_user(load_type="list", user_id=user_id)
-        if memory_about_user:
-            index_memory = [
-                (item["head"], item["relation"], item["tail"])
-                for item in memory_about_user
-            ]
-            index_memory_head_relation_tail_type = [
-                (item["head"], item["relation"], item["tail_type"])
-                for item in memory_about_user
-            ]
-        else:
-            index_memory = []
-            index_memory_head_relation_tail_type = []
+        self.upsert_memory(graph, user_id=user_id)
+        return self.load_memory_by_user(load_type="list", user_id=user_id)
 
-        if graph:
-            for line in graph:
-                head, head_type, relation, relation_properties, tail, tail_type = list(
-                    line.values()
-                )
-                lookup_hrt = (head, relation, tail)
-                lookup_hrttp = (head, relation, tail_type)
-                if lookup_hrt in index_memory:
-                    if self.is_logging:
-                        logger.info(f"Bypass {line}")
-                    pass
-                elif lookup_hrttp in index_memory_head_relation_tail_type:
-                    index_match = index_memory_head_relation_tail_type.index(
-                        lookup_hrttp
-                    )
-                    if self.is_logging:
-                        logger.info(
-                            f"Update new line: {line}\nfrom old line {memory_about_user[index_match]}"
-                        )
-                    memory_about_user[index_match] = line
-                else:
-                    if self.is_logging:
-                        logger.info(f"Insert new line: {line}")
-                    memory_about_user.append(line)
-        else:
+    def upsert_memory(self, graph: list, user_id: str = "unknown_user") -> list:
+        """
+        Merge graph entries into the user's memory without reading it back.
+
+        Args:
+            graph (list): List of graph entries, each with head, head_type, relation, relation_properties, tail, and tail_type.
+            user_id (str, optional): The user identifier. Defaults to "unknown_user".
+
+        Returns:
+            list: The entries added or replaced in the user's memory.
+        """
+        if not graph:
             if self.is_logging:
                 logger.info(f"No thing updated")
+            return []
 
-        self.save_memory(
-            obj=memory_about_user, memory_path=self.memory_path, user_id=user_id
-        )
-        return memory_about_user
+        # Indexed upsert: duplicates (head, relation, tail) are skipped and a
+        # matching (head, relation, tail_type) is replaced in place.
+        merged = self.store.upsert(user_id, graph)
+        if self.is_logging:
+            logger.info(f"Upserted {len(graph)} lines for {user_id}")
+        return merged
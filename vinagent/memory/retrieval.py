@@ -0,0 +1,206 @@
+import math
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+from vinagent.register.retrieval import BM25Index, tokenize
+from vinagent.memory.history import approx_token_count
+
+EmbedFunction = Callable[[List[str]], List[List[float]]]
+
+
+def fact_text(entry: dict) -> str:
+    """Render a memory triple as ``head -> relation[properties] -> tail``."""
+    relation_properties = entry.get("relation_properties")
+    relation_additional = f"[{relation_properties}]" if relation_properties else ""
+    return f"{entry.get('head', '')} -> {entry.get('relation', '')}{relation_additional} -> {entry.get('tail', '')}"
+
+
+class _UserIndex:
+    """Search structures over the triples of one user at one store revision."""
+
+    def __init__(self, entries: List[dict], entity_boost: int):
+        self.entries = entries
+        self.texts = [fact_text(entry) for entry in entries]
+        # Inverted index: entity (head or tail) -> triples mentioning it
+        self.entities: Dict[Tuple[str, ...], Set[int]] = defaultdict(set)
+        # First token of an entity -> entities starting with it
+        self.entity_heads: Dict[str, Set[Tuple[str, ...]]] = defaultdict(set)
+        documents = {}
+        for i, entry in enumerate(entries):
+            head = tuple(tokenize(str(entry.get("head", ""))))
+            tail = tuple(tokenize(str(entry.get("tail", ""))))
+            for entity in (head, tail):
+                if entity:
+                    self.entities[entity].add(i)
+                    self.entity_heads[entity[0]].add(entity)
+            documents[i] = (
+                list(head) * entity_boost
+                + tokenize(str(entry.get("relation", "")))
+                + tokenize(str(entry.get("relation_properties", "")))
+                + list(tail) * entity_boost
+            )
+        self.bm25 = BM25Index(documents)
+
+    def entity_matches(self, query_tokens: List[str]) -> Set[int]:
+        """Triples whose head or tail entity is mentioned in the query."""
+        query_set = set(query_tokens)
+        matches: Set[int] = set()
+        for token in query_set:
+            for entity in self.entity_heads.get(token, ()):
+                if query_set.issuperset(entity):
+                    matches |= self.entities[entity]
+        return matches
+
+
+class MemoryRetriever:
+    """
+    Select the memory triples of a user that are relevant to a query.
+
+    Triples are scored with BM25 over their entities and relation, plus a bonus
+    for triples whose head or tail entity is mentioned in the query (inverted
+    entity index). An optional embedding function adds a semantic similarity
+    score. The most recent triples fill the remaining slots when fewer than
+    ``top_k`` triples match, so generic questions still get some context.
+
+    Indexes are cached per user and rebuilt only when the store revision of the
+    user changes. Embeddings are cached per fact text, shared by the users, in a
+    bounded LRU.
+    """
+
+    def __init__(
+        self,
+        embed: Optional[EmbedFunction] = None,
+        embedding_weight: float = 1.0,
+        entity_boost: int = 2,
+        entity_bonus: float = 1.0,
+        token_counter: Callable[[str], int] = approx_token_count,
+        max_cached_users: int = 256,
+        max_cached_embeddings: int = 10000,
+    ):
+        """
+        Initialize the retriever.
+
+        Args:
+            embed (EmbedFunction, optional): Function embedding a list of texts, e.g.
+                ``OpenAIEmbeddings().embed_documents``. Defaults to None (lexical scoring only).
+            embedding_weight (float, optional): Weight of the cosine similarity in the score. Defaults to 1.0.
+            entity_boost (int, optional): Repetitions of entity tokens in the BM25 documents. Defaults to 2.
+            entity_bonus (float, optional): Score added to triples whose entity is named in the query. Defaults to 1.0.
+            token_counter (Callable[[str], int], optional): Counts the tokens of a rendered fact. Defaults to approx_token_count.
+            max_cached_users (int, optional): Number of user indexes kept in memory. Defaults to 256.
+            max_cached_embeddings (int, optional): Number of fact embeddings kept in memory. Defaults to 10000.
+        """
+        self.embed = embed
+        self.embedding_weight = embedding_weight
+        self.entity_boost = entity_boost
+        self.entity_bonus = entity_bonus
+        self.token_counter = token_counter
+        self.max_cached_users = max_cached_users
+        self.max_cached_embeddings = max_cached_embeddings
+        self._indexes: "OrderedDict[str, Tuple[Hashable, _UserIndex]]" = OrderedDict()
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_index(self, store, user_id: str) -> _UserIndex:
+        revision = store.revision(user_id)
+        with self._lock:
+            cached = self._indexes.get(user_id)
+            if cached is not None and cached[0] == revision:
+                self._indexes.move_to_end(user_id)
+                return cached[1]
+        index = _UserIndex(store.load_user(user_id), self.entity_boost)
+        with self._lock:
+            self._indexes[user_id] = (revision, index)
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_cached_users:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _embedding_scores(self, query: str, texts: List[str]) -> List[float]:
+        vectors: Dict[str, List[float]] = {}
+        with self._lock:
+            for text in set(texts):
+                vector = self._embeddings.get(text)
+                if vector is not None:
+                    self._embeddings.move_to_end(text)
+                    vectors[text] = vector
+        missing = [text for text in set(texts) if text not in vectors]
+        if missing:
+            # Embedded outside the lock, it may call a remote API
+            vectors.update(zip(missing, self.embed(missing)))
+            with self._lock:
+                for text in missing:
+                    self._embeddings[text] = vectors[text]
+                    self._embeddings.move_to_end(text)
+                while len(self._embeddings) > self.max_cached_embeddings:
+                    self._embeddings.popitem(last=False)
+        query_vector = self.embed([query])[0]
+        return [_cosine(query_vector, vectors[text]) for text in texts]
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop the cached index of a user, or of every user."""
+        with self._lock:
+            if user_id is None:
+                self._indexes.clear()
+                self._embeddings.clear()
+            else:
+                self._indexes.pop(user_id, None)
+
+    def retrieve(
+        self,
+        store,
+        query: str,
+        user_id: str = "unknown_user",
+        top_k: Optional[int] = 20,
+        max_tokens: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Return the memory triples of a user most relevant to ``query``.
+
+        Args:
+            store (MemoryStore): Store holding the triples.
+            query (str): The current user query.
+            user_id (str, optional): The user identifier. Defaults to "unknown_user".
+            top_k (int, optional): Maximum number of triples. None keeps every triple,
+                ranked by relevance. Defaults to 20.
+            max_tokens (int, optional): Token budget of the rendered triples. Defaults to None (no cap).
+
+        Returns:
+            List[dict]: Selected triples, most relevant first.
+        """
+        index = self._get_index(store, user_id)
+        if not index.entries:
+            return []
+        query_tokens = tokenize(query)
+        scores: Dict[int, float] = defaultdict(float, index.bm25.score(query_tokens))
+        for i in index.entity_matches(query_tokens):
+            scores[i] += self.entity_bonus
+        if self.embed is not None:
+            for i, similarity in enumerate(self._embedding_scores(query, index.texts)):
+                scores[i] += self.embedding_weight * similarity
+
+        # Ties (and non matching triples) are ordered from the most recent one
+        ranked = sorted(
+            range(len(index.entries)),
+            key=lambda i: (scores.get(i, 0.0), i),
+            reverse=True,
+        )
+        if top_k is not None:
+            ranked = ranked[:top_k]
+
+        selected = []
+        used_tokens = 0
+        for i in ranked:
+            if max_tokens is not None:
+                tokens = self.token_counter(index.texts[i])
+                if used_tokens + tokens > max_tokens:
+                    break
+                used_tokens += tokens
+            selected.append(index.entries[i])
+        return selected
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
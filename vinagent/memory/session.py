@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+from langchain_core.messages import messages_from_dict, messages_to_dict
+from vinagent.memory.history import InConversationHistory
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, str]
+
+
+class SessionStore:
+    """
+    In-conversation histories of many concurrent sessions keyed by ``(user_id, thread_id)``.
+
+    Sessions are kept in LRU order. When more than ``max_sessions`` are open, or a
+    session was not used for ``ttl`` seconds, it is evicted from memory. If a
+    ``spill_dir`` is set, evicted sessions are written to disk and transparently
+    restored on their next access; otherwise they are dropped. Sessions leased
+    by an in-flight call (see `lease`) are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1024,
+        ttl: Optional[float] = None,
+        spill_dir: Optional[Union[str, Path]] = None,
+        max_length: int = 10,
+        history_options: Optional[dict] = None,
+    ):
+        """
+        Initialize the session store.
+
+        Args:
+            max_sessions (int, optional): Maximum number of sessions kept in memory. Defaults to 1024.
+            ttl (float, optional): Seconds of inactivity after which a session is evicted. Defaults to None (no expiry).
+            spill_dir (Union[str, Path], optional): Directory receiving evicted sessions. Defaults to None (evicted sessions are dropped).
+            max_length (int, optional): Number of messages buffered per session. Defaults to 10.
+            history_options (dict, optional): Extra InConversationHistory arguments of every session,
+                e.g. ``max_tokens``. Defaults to None.
+        """
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.max_length = max_length
+        self.history_options = history_options or {}
+        self._sessions: "OrderedDict[SessionKey, list]" = OrderedDict()
+        # Number of in-flight leases per session, pinned sessions are not evicted
+        self._pins: Dict[SessionKey, int] = {}
+        self._lock = threading.RLock()
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, key: SessionKey) -> bool:
+        with self._lock:
+            if key in self._sessions:
+                return True
+            path = self._spill_path(key)
+            return path is not None and path.exists()
+
+    def _spill_path(self, key: SessionKey) -> Optional[Path]:
+        if not self.spill_dir:
+            return None
+        digest = hashlib.sha256("\0".join(key).encode("utf-8")).hexdigest()
+        return self.spill_dir / f"{digest}.json"
+
+    def _spill(self, key: SessionKey, history: InConversationHistory) -> None:
+        path = self._spill_path(key)
+        if path is None:
+            return
+        data = {
+            "user_id": key[0],
+            "thread_id": key[1],
+            "max_length": history.max_length,
+            "messages": messages_to_dict(list(history.history)),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not spill session {key}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def _restore(self, key: SessionKey) -> Optional[InConversationHistory]:
+        path = self._spill_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            history = InConversationHistory(
+                messages=messages_from_dict(data["messages"]),
+                max_length=data.get("max_length", self.max_length),
+                **self.history_options,
+            )
+        except Exception as e:
+            logger.warning(f"Could not restore session {key}: {e}")
+            history = None
+        # The in-memory session is authoritative from now on
+        path.unlink(missing_ok=True)
+        return history
+
+    def _evict(self) -> None:
+        deadline = time.monotonic() - self.ttl if self.ttl is not None else None
+        excess = len(self._sessions) - self.max_sessions
+        evicted = []
+        # Sessions are in LRU order: stop at the first one to keep
+        for key, (history, last_access) in self._sessions.items():
+            expired = deadline is not None and last_access <= deadline
+            if not expired and len(evicted) >= excess:
+                break
+            if key not in self._pins:
+                evicted.append((key, history))
+        for key, history in evicted:
+            del self._sessions[key]
+            self._spill(key, history)
+
+    def get(self, user_id: str, thread_id: str) -> InConversationHistory:
+        """
+        Return the history of a session, creating or restoring it if needed.
+
+        Args:
+            user_id (str): The user identifier.
+            thread_id (str): The conversation thread identifier.
+
+        Returns:
+            InConversationHistory: The history owned by this session.
+        """
+        key = (str(user_id), str(thread_id))
+        with self._lock:
+            self._evict()
+            entry = self._sessions.get(key)
+            if entry is None:
+                history = self._restore(key) or InConversationHistory(
+                    messages=[], max_length=self.max_length, **self.history_options
+                )
+                entry = [history, time.monotonic()]
+                self._sessions[key] = entry
+                self._evict()
+            else:
+                entry[1] = time.monotonic()
+                self._sessions.move_to_end(key)
+            return entry[0]
+
+    @contextmanager
+    def lease(self, user_id: str, thread_id: str) -> Iterator[InConversationHistory]:
+        """
+        Borrow the history of a session for the duration of a call.
+
+        The session is pinned while leased, so that it cannot be evicted (and
+        its later updates lost) by other sessions opened concurrently.
+
+        Args:
+            user_id (str): The user identifier.
+            thread_id (str): The conversation thread identifier.
+
+        Yields:
+            InConversationHistory: The history owned by this session.
+        """
+        key = (str(user_id), str(thread_id))
+        with self._lock:
+            # Pin first, so that opening the session cannot evict it right away
+            self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            yield self.get(user_id, thread_id)
+        finally:
+            with self._lock:
+                if self._pins[key] > 1:
+                    self._pins[key] -= 1
+                else:
+                    del self._pins[key]
+                self._evict()
+
+    def put(self, user_id: str, thread_id: str, history: InConversationHistory) -> None:
+        """Replace the history of a session."""
+        key = (str(user_id), str(thread_id))
+        with self._lock:
+            self._sessions[key] = [history, time.monotonic()]
+            self._sessions.move_to_end(key)
+            self._evict()
+
+    def drop(self, user_id: str, thread_id: str) -> None:
+        """Forget a session, including its spilled copy."""
+        key = (str(user_id), str(thread_id))
+        with self._lock:
+            self._sessions.pop(key, None)
+            path = self._spill_path(key)
+            if path is not None:
+                path.unlink(missing_ok=True)
+
+    def flush(self) -> None:
+        """Spill the in-memory sessions that are not leased to ``spill_dir`` and clear them."""
+        with self._lock:
+            for key in [key for key in self._sessions if key not in self._pins]:
+                history, _ = self._sessions.pop(key)
+                self._spill(key, history)
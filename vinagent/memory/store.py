@@ -0,0 +1,438 @@
+import os
+import json
+import sqlite3
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Union
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Order matters: Memory.revert_object_mess unpacks the entry values positionally.
+MEMORY_FIELDS = (
+    "head",
+    "head_type",
+    "relation",
+    "relation_properties",
+    "tail",
+    "tail_type",
+)
+
+
+def normalize_entry(line: dict) -> dict:
+    """Return a graph entry with the memory fields in their canonical order."""
+    if all(field in line for field in MEMORY_FIELDS):
+        return {field: line[field] for field in MEMORY_FIELDS}
+    # Entries produced by the graph transformer are positional
+    return dict(zip(MEMORY_FIELDS, line.values()))
+
+
+class MemoryStore(ABC):
+    """
+    Storage backend of the long-term memory graph, partitioned by user.
+    """
+
+    @abstractmethod
+    def load_user(self, user_id: str) -> List[dict]:
+        """Return the memory entries of a user, in insertion order."""
+
+    @abstractmethod
+    def load_all(self) -> Dict[str, List[dict]]:
+        """Return the memory entries of every user."""
+
+    @abstractmethod
+    def replace_user(self, user_id: str, entries: List[dict]) -> None:
+        """Replace all memory entries of a user."""
+
+    @abstractmethod
+    def upsert(self, user_id: str, graph: List[dict]) -> List[dict]:
+        """
+        Merge graph entries into the memory of a user.
+
+        An entry whose (head, relation, tail) is already known is skipped. An
+        entry matching an existing (head, relation, tail_type) replaces it in
+        place. Any other entry is appended.
+
+        Returns:
+            List[dict]: The entries that were appended or replaced.
+        """
+
+    @abstractmethod
+    def revision(self, user_id: str) -> Hashable:
+        """Value that changes on every change of the user's memory."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Remove the memory of every user."""
+
+    def close(self) -> None:
+        """Release the resources held by the store."""
+
+
+class JSONMemoryStore(MemoryStore):
+    """
+    Memory stored as a single JSON document ``{user_id: [entries]}``.
+
+    Kept for compatibility with existing memory files. Writes rewrite the whole
+    file atomically, so prefer ``SQLiteMemoryStore`` for large or shared memories.
+    The revision includes the stat of the file, so that writes of other processes
+    are noticed; they change the revision of every user.
+    """
+
+    def __init__(self, memory_path: Union[str, Path]):
+        self.memory_path = Path(memory_path)
+        self.memory_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._revisions: Dict[str, int] = {}
+        if not self.memory_path.exists():
+            self._write({})
+
+    def _read(self) -> Dict[str, List[dict]]:
+        with open(self.memory_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, data: Dict[str, List[dict]]) -> None:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=str(self.memory_path.parent),
+            prefix=f".{self.memory_path.name}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.memory_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def load_user(self, user_id: str) -> List[dict]:
+        with self._lock:
+            return self._read().get(user_id, [])
+
+    def load_all(self) -> Dict[str, List[dict]]:
+        with self._lock:
+            return self._read()
+
+    def replace_user(self, user_id: str, entries: List[dict]) -> None:
+        with self._lock:
+            data = self._read()
+            data[user_id] = entries
+            self._write(data)
+            self._revisions[user_id] = self._revisions.get(user_id, 0) + 1
+
+    def upsert(self, user_id: str, graph: List[dict]) -> List[dict]:
+        with self._lock:
+            data = self._read()
+            entries = data.get(user_id, [])
+            index_hrt = {(e["head"], e["relation"], e["tail"]) for e in entries}
+            index_hrtt = {}
+            for i, e in enumerate(entries):
+                index_hrtt.setdefault((e["head"], e["relation"], e["tail_type"]), i)
+
+            merged = []
+            for line in graph or []:
+                line = normalize_entry(line)
+                hrt = (line["head"], line["relation"], line["tail"])
+                hrtt = (line["head"], line["relation"], line["tail_type"])
+                if hrt in index_hrt:
+                    continue
+                if hrtt in index_hrtt:
+                    old = entries[index_hrtt[hrtt]]
+                    index_hrt.discard((old["head"], old["relation"], old["tail"]))
+                    entries[index_hrtt[hrtt]] = line
+                else:
+                    index_hrtt[hrtt] = len(entries)
+                    entries.append(line)
+                index_hrt.add(hrt)
+                merged.append(line)
+
+            data[user_id] = entries
+            self._write(data)
+            self._revisions[user_id] = self._revisions.get(user_id, 0) + 1
+            return merged
+
+    def revision(self, user_id: str) -> Hashable:
+        with self._lock:
+            try:
+                stat = os.stat(self.memory_path)
+            except OSError:
+                stat = None
+            file_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size) if stat else None
+            return self._revisions.get(user_id, 0), file_stamp
+
+    def reset(self) -> None:
+        with self._lock:
+            self._write({})
+            self._revisions = {uid: rev + 1 for uid, rev in self._revisions.items()}
+
+
+class SQLiteMemoryStore(MemoryStore):
+    """
+    Memory stored in SQLite (WAL mode), one row per graph entry.
+
+    Lookups and upserts go through the indexes on ``(user_id, head, relation, tail)``
+    and ``(user_id, head, relation, tail_type)``, so a write costs O(log n) and only
+    touches the rows of the graph being saved. Threads share a single connection
+    guarded by a lock, so the number of open connections does not grow with the
+    number of threads; writers of other processes are serialized by SQLite.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        legacy_json_path: Optional[Union[str, Path]] = None,
+        timeout: float = 30.0,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            db_path (Union[str, Path]): Path to the SQLite database.
+            legacy_json_path (Union[str, Path], optional): JSON memory file migrated into
+                the database the first time it is opened. Defaults to None.
+            timeout (float, optional): Seconds to wait for a concurrent writer. Defaults to 30.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        # Reentrant: transactions hold it while their statements run
+        self._lock = threading.RLock()
+        self._create_schema()
+        if legacy_json_path:
+            self._migrate_json(Path(legacy_json_path))
+
+    def _connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                conn = sqlite3.connect(
+                    str(self.db_path),
+                    timeout=self.timeout,
+                    isolation_level=None,
+                    check_same_thread=False,
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn = conn
+            return self._conn
+
+    def _fetchall(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._connection().executescript(
+                """
+            CREATE TABLE IF NOT EXISTS memory (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                head TEXT,
+                head_type TEXT,
+                relation TEXT,
+                relation_properties TEXT,
+                tail TEXT,
+                tail_type TEXT
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_memory_hrt
+                ON memory (user_id, head, relation, tail);
+            CREATE INDEX IF NOT EXISTS idx_memory_hrtt
+                ON memory (user_id, head, relation, tail_type);
+            CREATE TABLE IF NOT EXISTS memory_revision (
+                user_id TEXT PRIMARY KEY,
+                revision INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS memory_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+            )
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._connection, self._lock)
+
+    @staticmethod
+    def _row_to_entry(row) -> dict:
+        # dict/list values are stored as JSON text (see `_entry_values`)
+        entry = {}
+        for field, value in zip(MEMORY_FIELDS, row):
+            if isinstance(value, str) and value[:1] in ("{", "["):
+                try:
+                    decoded = json.loads(value)
+                except ValueError:
+                    decoded = None
+                if isinstance(decoded, (dict, list)):
+                    value = decoded
+            entry[field] = value
+        return entry
+
+    @staticmethod
+    def _entry_values(line: dict) -> tuple:
+        return tuple(
+            (
+                json.dumps(line[field], ensure_ascii=False)
+                if isinstance(line[field], (dict, list))
+                else line[field]
+            )
+            for field in MEMORY_FIELDS
+        )
+
+    def _bump_revision(self, conn: sqlite3.Connection, user_id: str) -> None:
+        conn.execute(
+            "INSERT INTO memory_revision (user_id, revision) VALUES (?, 1) "
+            "ON CONFLICT(user_id) DO UPDATE SET revision = revision + 1",
+            (user_id,),
+        )
+
+    def _insert_entries(
+        self, conn: sqlite3.Connection, user_id: str, entries: List[dict]
+    ) -> None:
+        conn.executemany(
+            "INSERT OR IGNORE INTO memory (user_id, head, head_type, relation, "
+            "relation_properties, tail, tail_type) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(user_id,) + self._entry_values(normalize_entry(e)) for e in entries],
+        )
+
+    def _migrate_json(self, json_path: Path) -> None:
+        with self._transaction() as conn:
+            migrated = conn.execute(
+                "SELECT value FROM memory_meta WHERE key = 'migrated_json'"
+            ).fetchone()
+            if migrated is not None:
+                return
+            if json_path.exists():
+                try:
+                    with open(json_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning(f"Could not migrate memory file {json_path}: {e}")
+                    data = {}
+                for user_id, entries in (data or {}).items():
+                    if entries:
+                        self._insert_entries(conn, user_id, entries)
+                        self._bump_revision(conn, user_id)
+                if data:
+                    logger.info(f"Migrated memory file {json_path} to {self.db_path}")
+            conn.execute(
+                "INSERT INTO memory_meta (key, value) VALUES ('migrated_json', ?)",
+                (str(json_path),),
+            )
+
+    def load_user(self, user_id: str) -> List[dict]:
+        rows = self._fetchall(
+            "SELECT head, head_type, relation, relation_properties, tail, tail_type "
+            "FROM memory WHERE user_id = ? ORDER BY seq",
+            (user_id,),
+        )
+        return [self._row_to_entry(row) for row in rows]
+
+    def load_all(self) -> Dict[str, List[dict]]:
+        rows = self._fetchall(
+            "SELECT user_id, head, head_type, relation, relation_properties, tail, "
+            "tail_type FROM memory ORDER BY seq"
+        )
+        data: Dict[str, List[dict]] = {}
+        for row in rows:
+            data.setdefault(row[0], []).append(self._row_to_entry(row[1:]))
+        return data
+
+    def replace_user(self, user_id: str, entries: List[dict]) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM memory WHERE user_id = ?", (user_id,))
+            self._insert_entries(conn, user_id, entries)
+            self._bump_revision(conn, user_id)
+
+    def upsert(self, user_id: str, graph: List[dict]) -> List[dict]:
+        merged = []
+        with self._transaction() as conn:
+            for line in graph or []:
+                line = normalize_entry(line)
+                found = conn.execute(
+                    "SELECT 1 FROM memory WHERE user_id = ? AND head = ? "
+                    "AND relation = ? AND tail = ?",
+                    (user_id, line["head"], line["relation"], line["tail"]),
+                ).fetchone()
+                if found:
+                    continue
+                match = conn.execute(
+                    "SELECT seq FROM memory WHERE user_id = ? AND head = ? "
+                    "AND relation = ? AND tail_type = ? ORDER BY seq LIMIT 1",
+                    (user_id, line["head"], line["relation"], line["tail_type"]),
+                ).fetchone()
+                if match:
+                    conn.execute(
+                        "UPDATE memory SET head = ?, head_type = ?, relation = ?, "
+                        "relation_properties = ?, tail = ?, tail_type = ? "
+                        "WHERE seq = ?",
+                        self._entry_values(line) + (match[0],),
+                    )
+                else:
+                    self._insert_entries(conn, user_id, [line])
+                merged.append(line)
+            if merged:
+                self._bump_revision(conn, user_id)
+        return merged
+
+    def revision(self, user_id: str) -> int:
+        rows = self._fetchall(
+            "SELECT revision FROM memory_revision WHERE user_id = ?", (user_id,)
+        )
+        return rows[0][0] if rows else 0
+
+    def reset(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM memory")
+            conn.execute("UPDATE memory_revision SET revision = revision + 1")
+
+    def close(self) -> None:
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+class _ImmediateTransaction:
+    """
+    ``BEGIN IMMEDIATE`` ... ``COMMIT``/``ROLLBACK`` on the shared autocommit
+    connection, holding the store lock so statements of other threads cannot
+    interleave with the transaction.
+    """
+
+    def __init__(
+        self, connect: Callable[[], sqlite3.Connection], lock: threading.RLock
+    ):
+        self.connect = connect
+        self.lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.lock.acquire()
+        try:
+            self.conn = self.connect()
+            # Take the database write lock up front, against other processes
+            self.conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.execute("COMMIT")
+            else:
+                self.conn.execute("ROLLBACK")
+        finally:
+            self.lock.release()
+        return False
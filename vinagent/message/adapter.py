@@ -1,14 +1,26 @@
+from typing import Union
 from langchain_core.messages.base import BaseMessage
 
 
 def adapter_ai_response_with_tool_calls(
-    all_tools: dict, response: BaseMessage, tool_call: dict
+    all_tools: dict, response: BaseMessage, tool_call: Union[dict, list[dict]]
 ):
-    adapt_tool = {}
-    selected_tool = all_tools[tool_call["tool_name"]]
-    adapt_tool["name"] = selected_tool["tool_name"]
-    adapt_tool["args"] = tool_call["arguments"]
-    adapt_tool["type"] = "tool_call"
-    adapt_tool["id"] = selected_tool["tool_call_id"]
-    response.tool_calls = [adapt_tool]
+    tool_calls = tool_call if isinstance(tool_call, list) else [tool_call]
+    adapt_tools = []
+    used_ids = set()
+    for idx, call in enumerate(tool_calls):
+        adapt_tool = {}
+        selected_tool = all_tools[call["tool_name"]]
+        adapt_tool["name"] = selected_tool["tool_name"]
+        adapt_tool["args"] = call["arguments"]
+        adapt_tool["type"] = "tool_call"
+        # The same tool can be called several times in one step, so every call
+        # needs its own id to pair it with its ToolMessage.
+        tool_call_id = selected_tool["tool_call_id"]
+        if tool_call_id in used_ids:
+            tool_call_id = f"{tool_call_id}_{idx}"
+        used_ids.add(tool_call_id)
+        adapt_tool["id"] = tool_call_id
+        adapt_tools.append(adapt_tool)
+    response.tool_calls = adapt_tools
     return response
@@ -73,7 +73,7 @@ def _patched_agent_invoke(original, self, *args, **kwargs):
         span.set_inputs(inputs)
 
         # Set agent-specific attributes
-        _set_span_attributes(span, self)
+        _set_span_attributes(span, self, inputs.get("user_id"))
 
         try:
             # Call the original invoke method
@@ -131,7 +131,7 @@ def _is_serializable(value):
         return False
 
 
-def _set_span_attributes(span: LiveSpan, instance):
+def _set_span_attributes(span: LiveSpan, instance, user_id=None):
     """
     Sets agent-specific attributes on the span.
     """
@@ -139,7 +139,7 @@ def _set_span_attributes(span: LiveSpan, instance):
         attributes = {
             "description": getattr(instance, "description", None),
             "skills": getattr(instance, "skills", None),
-            "user_id": getattr(instance, "_user_id", None),
+            "user_id": user_id or getattr(instance, "_user_id", None),
             "has_compiled_graph": hasattr(instance, "compiled_graph"),
             "has_memory": bool(getattr(instance, "memory", None)),
         }
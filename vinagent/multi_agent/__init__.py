@@ -1,4 +1,15 @@
-from .agent_node import AgentNode, UserFeedback
-from .crew import CrewAgent
+from typing import TYPE_CHECKING
+from vinagent.lazy import lazy_exports
 
-__all__ = ["AgentNode", "UserFeedback", "CrewAgent"]
+_EXPORTS = {
+    "AgentNode": ".agent_node",
+    "UserFeedback": ".agent_node",
+    "CrewAgent": ".crew",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .agent_node import AgentNode, UserFeedback
+    from .crew import CrewAgent
@@ -1,4 +1,4 @@
-from typing import Union, List, Awaitable, Any
+from typing import TYPE_CHECKING, Union, List, Awaitable, Any
 import copy
 from abc import ABC, abstractmethod
 import logging
@@ -6,12 +6,14 @@ from vinagent.logger.logger import logging_message, logging_user_input
 from vinagent.graph.operator import FlowStateGraph, END, START
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.utils.runnable import coerce_to_runnable
-from langchain_together import ChatTogether
 from langchain_core.tools import BaseTool
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai.chat_models.base import BaseChatOpenAI
 from vinagent.memory.history import InConversationHistory
-from vinagent.oauth2.client import AuthenCard
+
+if TYPE_CHECKING:
+    from langchain_together import ChatTogether
+    from langchain_openai.chat_models.base import BaseChatOpenAI
+    from vinagent.oauth2.client import AuthenCard
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -27,7 +29,7 @@ class CrewAgentMeta(ABC):
         checkpoint: MemorySaver = None,
         graph: FlowStateGraph = None,
         flow: list[str] = [],
-        authen_card: AuthenCard = None,
+        authen_card: "AuthenCard" = None,
         *args,
         **kwargs,
     ):
@@ -59,12 +61,12 @@ class CrewAgent:
 
     def __init__(
         self,
-        llm: Union[ChatTogether, BaseLanguageModel, BaseChatOpenAI],
+        llm: Union["ChatTogether", BaseLanguageModel, "BaseChatOpenAI"],
         checkpoint: MemorySaver = None,
         graph: FlowStateGraph = None,
         flow: list[str] = [],
         num_buffered_messages: int = 10,
-        authen_card: AuthenCard = None,
+        authen_card: "AuthenCard" = None,
     ):
         """
         Args:
@@ -1,4 +1,4 @@
-from typing import Union, List
+from typing import Hashable, Optional, Union, List
 from langchain_core.messages import (
     SystemMessage,
     ToolMessage,
@@ -10,7 +10,17 @@ import json
 
 
 class PromptHandler:
-    def format_tools_as_xml(self, tools: dict) -> str:
+    def format_tools_as_xml(self, tools: dict, cache_key: Hashable = None) -> str:
+        """
+        Render the tools as an XML block.
+
+        If ``cache_key`` is given (e.g. the tool registry version), the rendered
+        string is reused for as long as the key does not change.
+        """
+        cache = getattr(self, "_tools_xml_cache", None)
+        if cache_key is not None and cache is not None and cache[0] == cache_key:
+            return cache[1]
+
         parts = ["<tools>"]
         for name, tool in tools.items():
             parts.append(f'  <tool name="{name}">')
@@ -23,28 +33,32 @@ class PromptHandler:
             parts.append(f'    <docstring>\n{tool["docstring"]}\n    </docstring>')
             parts.append(f"  </tool>")
         parts.append("</tools>")
-        return "\n".join(parts)
-
-    def build_prompt(
-        self,
-        user_id: str,
-        message: str,
-        tools: dict,
-        memory: str = "",
-    ) -> str:
-        prompt = f"""You are a smart assistant that can answer questions and use tools to complete tasks.
+        tools_xml = "\n".join(parts)
 
-## User
-{user_id}
+        if cache_key is not None:
+            self._tools_xml_cache = (cache_key, tools_xml)
+        return tools_xml
 
-## Memory
-{memory.replace("I ", f"{user_id} ") if memory else "No memory available."}
+    def tools_instruction_prompt(
+        self, tools: Optional[dict], cache_key: Hashable = None
+    ) -> str:
+        """
+        Static part of the prompt: the available tools and the tool calling rules.
 
-## Task
-{message}
+        It does not depend on the user, the memory or the task, so it stays
+        byte-identical across iterations and can be served from the provider's
+        prompt cache. If ``tools`` is None, the tools are not listed here but in
+        each task message (see ``tools_task_prompt``).
+        """
+        available_tools = (
+            self.format_tools_as_xml(tools, cache_key=cache_key)
+            if tools is not None
+            else "The tools you can use are listed in the `## Available Tools` section of the current task."
+        )
+        return f"""You are a smart assistant that can answer questions and use tools to complete tasks.
 
 ## Available Tools
-{self.format_tools_as_xml(tools)}
+{available_tools}
 
 ---
 
@@ -83,7 +97,36 @@ The `command` value depends on `tool_type`:
 - Never make up tool names, module paths, or arguments not present in the tool definitions.
 - Never mix syntax from one tool into another.
 - If you are unsure which tool to use, answer directly and suggest where the user might find help.
+- If several INDEPENDENT tool calls are needed (no call uses the result of another), list them all in `tool_calls` instead of `tool_call`; they are executed in parallel.
 - Do not add explanation or commentary when outputting a tool call — output JSON only.
+"""
+
+    def tools_task_prompt(self, tools: dict, message: str) -> str:
+        """
+        Prepend the tools retrieved for the current task (see ``_step0_retrieve_tools``)
+        to its message. They change with every query, so they are sent with the task
+        rather than in the system prompt, whose prefix stays cacheable.
+        """
+        return f"## Available Tools\n{self.format_tools_as_xml(tools)}\n\n{message}"
+
+    def build_prompt(
+        self,
+        user_id: str,
+        message: str,
+        memory: str = "",
+    ) -> str:
+        """
+        Dynamic part of the prompt: the user, the memory and the current task.
+        The tools and the rules live in the system prompt (see ``system_prompt``).
+        """
+        prompt = f"""## User
+{user_id}
+
+## Memory
+{memory.replace("I ", f"{user_id} ") if memory else "No memory available."}
+
+## Task
+{message}
 """
         return prompt
 
@@ -125,38 +168,58 @@ The `command` value depends on `tool_type`:
         return _action_prompt
 
     def system_prompt(
-        self, skills: list[str], description: str, instruction: str
-    ) -> str:
+        self,
+        skills: list[str],
+        description: str,
+        instruction: str,
+        tools: dict = None,
+        cache_key: Hashable = None,
+        tools_in_task: bool = False,
+    ) -> SystemMessage:
+        """
+        Build the system message: agent description, skills, instruction and,
+        if ``tools`` is given, the tools block with the tool calling rules. With
+        ``tools_in_task``, only the rules are included and the tools are listed
+        in the task message instead (see ``tools_task_prompt``).
+
+        With a ``cache_key`` the same ``SystemMessage`` object is returned for as
+        long as the inputs do not change, so the prompt prefix is stable.
+        """
+        key = (
+            (tuple(skills), description, instruction, cache_key, tools_in_task)
+            if cache_key is not None
+            else None
+        )
+        cache = getattr(self, "_system_prompt_cache", None)
+        if key is not None and cache is not None and cache[0] == key:
+            return cache[1]
+
         skills = "- " + "- ".join(skills)
         content = (
             f"{description}\nYour skills:\n{skills}\nInstruction:\n{instruction}"
             if instruction
             else f"{description}\nYour skills:\n{skills}"
         )
+        if tools_in_task:
+            content = f"{content}\n\n{self.tools_instruction_prompt(None)}"
+        elif tools is not None:
+            content = f"{content}\n\n{self.tools_instruction_prompt(tools, cache_key)}"
         system_prompt = SystemMessage(content=content)
-        return system_prompt
 
-    def prompt_tool(
-        self,
-        query: str,
-        tool_call: str,
-        tool_message: ToolMessage,
-        history: list[BaseMessage],
-        *args,
-        **kwargs,
-    ) -> str:
-        # Check if the tool execution resulted in an error
-        is_error = tool_message.additional_kwargs.get("is_error", False)
+        if key is not None:
+            self._system_prompt_cache = (key, system_prompt)
+        return system_prompt
 
+    def _tool_result(self, tool_message: ToolMessage) -> str:
         # Include BOTH the summary content AND the full artifact (STDERR traceback)
         # so the LLM has the complete picture to generate a comprehensive fix.
         content_value = tool_message.content or ""
         artifact_value = getattr(tool_message, "artifact", None) or ""
         if artifact_value and artifact_value != content_value:
-            full_result = f"{content_value}\n\nFull output:\n{artifact_value}"
-        else:
-            full_result = content_value or artifact_value
+            return f"{content_value}\n\nFull output:\n{artifact_value}"
+        return content_value or artifact_value
 
+    def _tool_action_prompt(self, is_error: bool, history: list[BaseMessage]) -> str:
         if is_error:
             # Collect prior fix attempts from history for context
             prior_fixes = []
@@ -189,12 +252,25 @@ The `command` value depends on `tool_type`:
                     + "\n".join(prior_fixes)
                 )
 
-            _action_prompt = self.action_prompt(prior_fix_str)
-        else:
-            _action_prompt = (
-                "The tool executed SUCCESSFULLY. Please review the Tool's Result above.\n"
-                "If the task is complete, you MUST output a standard JSON response with `requires_tool`: false and provide a summary `answer` to the user. Do NOT call the same tool again."
-            )
+            return self.action_prompt(prior_fix_str)
+        return (
+            "The tool executed SUCCESSFULLY. Please review the Tool's Result above.\n"
+            "If the task is complete, you MUST output a standard JSON response with `requires_tool`: false and provide a summary `answer` to the user. Do NOT call the same tool again."
+        )
+
+    def prompt_tool(
+        self,
+        query: str,
+        tool_call: str,
+        tool_message: ToolMessage,
+        history: list[BaseMessage],
+        *args,
+        **kwargs,
+    ) -> str:
+        # Check if the tool execution resulted in an error
+        is_error = tool_message.additional_kwargs.get("is_error", False)
+        full_result = self._tool_result(tool_message)
+        _action_prompt = self._tool_action_prompt(is_error, history)
 
         tool_template = (
             f"- Question: {query}\n"
@@ -204,3 +280,37 @@ The `command` value depends on `tool_type`:
         )
 
         return tool_template
+
+    def prompt_tools(
+        self,
+        query: str,
+        tool_calls: list[dict],
+        tool_messages: list[ToolMessage],
+        history: list[BaseMessage],
+        *args,
+        **kwargs,
+    ) -> str:
+        """
+        Build the next query after the tool calls of one step. A single call keeps
+        the ``prompt_tool`` template; several calls list every tool with its
+        result, followed by one action prompt (the fix prompt if any call failed).
+        """
+        if len(tool_calls) == 1:
+            return self.prompt_tool(query, tool_calls[0], tool_messages[0], history)
+
+        is_error = any(
+            tool_message.additional_kwargs.get("is_error", False)
+            for tool_message in tool_messages
+        )
+        results = "".join(
+            f"- Tool Used ({idx}): {tool_call}\n"
+            f"- Tool's Result ({idx}):\n{self._tool_result(tool_message)}\n"
+            for idx, (tool_call, tool_message) in enumerate(
+                zip(tool_calls, tool_messages), start=1
+            )
+        )
+        return (
+            f"- Question: {query}\n"
+            f"{results}"
+            f"{self._tool_action_prompt(is_error, history)}"
+        )
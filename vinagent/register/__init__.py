@@ -1,12 +1,30 @@
-from .tool import ToolManager, FunctionTool, MCPTool, ModuleTool
-from .primary_fn import primary_function
-from .tool import ToolCall
+from typing import TYPE_CHECKING
+from vinagent.lazy import lazy_exports
 
-__all__ = [
-    "ToolManager",
-    "FunctionTool",
-    "MCPTool",
-    "ModuleTool",
-    "ToolCall",
-    "primary_function",
-]
+_EXPORTS = {
+    "ToolManager": ".tool",
+    "FunctionTool": ".tool",
+    "MCPTool": ".tool",
+    "ModuleTool": ".tool",
+    "ToolCall": ".tool",
+    "ToolRegistry": ".registry",
+    "primary_function": ".primary_fn",
+    "ToolResultCache": ".cache",
+    "CacheBackend": ".cache",
+    "MemoryCacheBackend": ".cache",
+    "DiskCacheBackend": ".cache",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .tool import ToolManager, FunctionTool, MCPTool, ModuleTool, ToolCall
+    from .registry import ToolRegistry
+    from .primary_fn import primary_function
+    from .cache import (
+        ToolResultCache,
+        CacheBackend,
+        MemoryCacheBackend,
+        DiskCacheBackend,
+    )
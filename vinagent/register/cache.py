@@ -0,0 +1,315 @@
+import json
+import time
+import pickle
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_arguments(arguments: Dict[str, Any]) -> str:
+    """Serialize tool arguments so that equal calls give equal strings."""
+    return json.dumps(
+        arguments or {},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=repr,
+    )
+
+
+def result_cache_key(tool_name: str, arguments: Dict[str, Any], version: str) -> str:
+    """Content address of a tool call: ``(tool_name, canonical arguments, version)``."""
+    payload = "\0".join([tool_name, canonical_arguments(arguments), version or ""])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Storage of the cached tool results."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored at key, or None if missing or expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        """Store a value for ``ttl`` seconds (None: no expiry)."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Release the resources held by the backend."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    SQLite cache shared by the processes using the same file.
+
+    Values are pickled; expired rows are removed when read and by `prune`.
+    Threads share a single connection guarded by a lock, like `SQLiteMemoryStore`.
+    """
+
+    def __init__(self, path: Union[str, Path] = Path("templates/tool_cache.db")):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                conn = sqlite3.connect(
+                    str(self.path), timeout=30, check_same_thread=False
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                self._conn = conn
+            return self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                yield conn
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        try:
+            return pickle.loads(value)
+        except Exception as e:
+            logger.warning(f"Dropping unreadable tool cache entry: {e}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tool_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value), expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM tool_cache")
+
+    def prune(self) -> int:
+        """Delete the expired entries and return how many were removed."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM tool_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+class CacheStats:
+    """Counters of a ToolResultCache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stores = 0
+        self.errors = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __repr__(self) -> str:
+        return f"CacheStats({self.as_dict()})"
+
+
+class ToolResultCache:
+    """
+    Memoization of deterministic tool calls.
+
+    Results are stored under `result_cache_key`, so a new tool version never
+    reads results of the previous one. Concurrent identical calls on the same
+    event loop are coalesced: only the first one executes the tool, the others
+    await its result (single flight).
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            backend (CacheBackend, optional): Storage of the results. Defaults to MemoryCacheBackend().
+        """
+        self.backend = backend or MemoryCacheBackend()
+        self.stats = CacheStats()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        ttl: Optional[float],
+        compute: Callable[[], Awaitable[Tuple[Any, bool]]],
+    ) -> Any:
+        """
+        Return the cached value of ``key`` or compute and store it.
+
+        Args:
+            key (str): Cache key, see `result_cache_key`.
+            ttl (float, optional): Seconds the value stays valid (None: no expiry).
+            compute (Callable[[], Awaitable[Tuple[Any, bool]]]): Coroutine function returning
+                the value and whether it may be cached (e.g. False for errors).
+
+        Returns:
+            Any: The cached or freshly computed value.
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"Tool cache read failed: {e}")
+            value = None
+        if value is not None:
+            self.stats.hits += 1
+            return value
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight is not None and inflight.get_loop() is loop:
+                self.stats.coalesced += 1
+            else:
+                inflight = None
+                future = loop.create_future()
+                self._inflight[key] = future
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        self.stats.misses += 1
+        try:
+            value, cacheable = await compute()
+            if cacheable:
+                try:
+                    self.backend.set(key, value, ttl)
+                    self.stats.stores += 1
+                except Exception as e:
+                    self.stats.errors += 1
+                    logger.warning(f"Tool cache write failed: {e}")
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody waits for it
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one entry, or every entry."""
+        if key is None:
+            self.backend.clear()
+        else:
+            self.backend.delete(key)
+
+    def close(self) -> None:
+        """Release the resources of the backend, e.g. its SQLite connection."""
+        self.backend.close()
@@ -0,0 +1,139 @@
+import ast
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+PRIMARY_DECORATOR = "primary_function"
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+
+def _decorator_name(decorator: ast.expr) -> Optional[str]:
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Name):
+        return decorator.id
+    if isinstance(decorator, ast.Attribute):
+        return decorator.attr
+    return None
+
+
+def _is_primary(node: FunctionNode) -> bool:
+    return any(
+        _decorator_name(decorator) == PRIMARY_DECORATOR
+        for decorator in node.decorator_list
+    )
+
+
+def _arguments(node: FunctionNode) -> Dict[str, str]:
+    args = node.args
+    positional = args.posonlyargs + args.args
+    # Defaults apply to the last positional parameters
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    params = list(zip(positional, defaults)) + list(
+        zip(args.kwonlyargs, args.kw_defaults)
+    )
+    arguments = {}
+    for arg, default in params:
+        annotation = ast.unparse(arg.annotation) if arg.annotation else "Any"
+        if default is not None:
+            annotation += f" = {ast.unparse(default)}"
+        arguments[arg.arg] = annotation
+    return arguments
+
+
+def _dependencies(tree: ast.Module) -> List[str]:
+    dependencies = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            root = name.split(".")[0]
+            if root not in dependencies:
+                dependencies.append(root)
+    return dependencies
+
+
+def extract_module_tools(source: str, module_path: str) -> List[Dict[str, Any]]:
+    """
+    Statically list the tools of a module, without importing it or calling an LLM.
+
+    The tools are the top-level functions decorated with ``@primary_function``
+    (bare, called with options or as an attribute). If the module has none, every
+    public top-level function is a tool.
+
+    Args:
+        source (str): Source code of the module.
+        module_path (str): Import path of the module, stored in the metadata.
+
+    Returns:
+        List[Dict[str, Any]]: Metadata of each tool: tool_name, arguments (annotation
+            and default of each parameter), return, docstring, dependencies and module_path.
+
+    Raises:
+        ValueError: If the source is not valid Python.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        raise ValueError(f"Cannot parse module {module_path}: {e}")
+
+    functions = [
+        node
+        for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+    selected = [node for node in functions if _is_primary(node)] or [
+        node for node in functions if not node.name.startswith("_")
+    ]
+    dependencies = _dependencies(tree)
+    return [
+        {
+            "tool_name": node.name,
+            "arguments": _arguments(node),
+            "return": ast.unparse(node.returns) if node.returns else "Any",
+            "docstring": ast.get_docstring(node) or "",
+            "dependencies": list(dependencies),
+            "module_path": module_path,
+        }
+        for node in selected
+    ]
+
+
+class ToolExtractor:
+    """
+    `extract_module_tools` memoized by the content hash of the module source.
+
+    Registering an unchanged module again (e.g. on every agent start) returns the
+    previous result without parsing the source.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def source_hash(source: str) -> str:
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def extract(self, source: str, module_path: str) -> List[Dict[str, Any]]:
+        """Return the tools of a module, see `extract_module_tools`."""
+        key = f"{module_path}:{self.source_hash(source)}"
+        with self._lock:
+            tools = self._results.get(key)
+            if tools is not None:
+                self._results.move_to_end(key)
+                return copy.deepcopy(tools)
+        tools = extract_module_tools(source, module_path)
+        with self._lock:
+            self._results[key] = tools
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return copy.deepcopy(tools)
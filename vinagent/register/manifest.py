@@ -0,0 +1,216 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import importlib.util
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# (source key, content hash) of a tool source
+Fingerprint = Tuple[str, str]
+
+_SKIPPED_DIRS = {"__pycache__", ".git"}
+
+
+def _hash_file(digest: "hashlib._Hash", path: Path) -> None:
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+
+
+def hash_source(path: Union[str, Path]) -> str:
+    """
+    Content hash of a tool source: a file, or a directory tree (names and contents).
+    """
+    path = Path(path)
+    digest = hashlib.sha256()
+    if path.is_dir():
+        for item in sorted(path.rglob("*")):
+            if not item.is_file() or _SKIPPED_DIRS.intersection(item.parts):
+                continue
+            digest.update(item.relative_to(path).as_posix().encode("utf-8") + b"\0")
+            _hash_file(digest, item)
+            digest.update(b"\0")
+    else:
+        _hash_file(digest, path)
+    return digest.hexdigest()
+
+
+class RegistrationManifest:
+    """
+    Tools registered from each source, keyed by the content hash of the source.
+
+    A source is a module file, a module import path (hashed through its file), a
+    directory tree, or an AgentSkill directory (hashed through its SKILL.md). When
+    a source is registered again with the same hash, its tool metadata is reused
+    as is: no copy, no import and no LLM call. The manifest is a JSON file next to
+    the tools file, kept when the tools are reset.
+
+    Several processes may share a manifest: every write re-reads the file and
+    applies its change under an exclusive lock on ``<manifest>.lock``, so the
+    entries recorded by the others are kept. Reads reload the file when it changed.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize the manifest.
+
+        Args:
+            path (Path): Path to the manifest JSON file, e.g. ``templates/tools.manifest.json``.
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._entries: Optional[Dict[str, Any]] = None
+        # (mtime_ns, size) of the file the entries were read from
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = threading.RLock()
+
+    def fingerprint(self, source: Union[str, Path]) -> Optional[Fingerprint]:
+        """
+        Return the key and content hash of a tool source, or None if it cannot be hashed.
+
+        Args:
+            source (Union[str, Path]): Path of a file, directory or AgentSkill, or a module import path.
+        """
+        try:
+            if os.path.isdir(source):
+                skill_file = Path(source) / "SKILL.md"
+                if skill_file.exists():
+                    resolved = Path(source).resolve()
+                    return f"skill:{resolved}", hash_source(skill_file)
+                return f"dir:{Path(source).resolve()}", hash_source(source)
+            if os.path.isfile(source):
+                return f"file:{Path(source).resolve()}", hash_source(source)
+            # Import path: locate the module file without importing the module
+            spec = importlib.util.find_spec(str(source))
+            if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+                return None
+            return f"module:{source}", hash_source(spec.origin)
+        except (ImportError, ValueError, OSError) as e:
+            logger.debug(f"Cannot fingerprint tool source {source}: {e}")
+            return None
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> Dict[str, Any]:
+        """Entries of the manifest, re-read when another process rewrote the file."""
+        stamp = self._file_stamp()
+        if self._entries is None or stamp != self._stamp:
+            self._stamp = stamp
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except FileNotFoundError:
+                self._entries = {}
+            except json.JSONDecodeError as e:
+                logger.warning(f"Invalid manifest {self.path}: {e}")
+                self._entries = {}
+        return self._entries
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _update(self, change: Callable[[Dict[str, Any]], None]) -> None:
+        """Apply ``change`` to the entries on disk and write them back, under the file lock."""
+        with self._lock, self._file_lock():
+            entries = self._load()
+            change(entries)
+            self._save(entries)
+            self._stamp = self._file_stamp()
+
+    def _save(self, entries: Dict[str, Any]) -> None:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=str(self.path.parent), prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=4, ensure_ascii=False)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def lookup(self, fingerprint: Fingerprint) -> Optional[Dict[str, Any]]:
+        """
+        Return the tools registered from an unchanged source, or None.
+
+        Entries whose outputs (e.g. the copy of a module in ``vinagent/tools``)
+        were deleted are not reused.
+        """
+        key, content_hash = fingerprint
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None or entry.get("hash") != content_hash:
+            return None
+        if not all(os.path.exists(output) for output in entry.get("outputs", [])):
+            return None
+        return entry["tools"]
+
+    def record(
+        self,
+        fingerprint: Fingerprint,
+        tools: Dict[str, Any],
+        outputs: Iterable[Union[str, Path]] = (),
+    ) -> None:
+        """
+        Store the tools registered from a source.
+
+        Args:
+            fingerprint (Fingerprint): Result of `fingerprint` for the source.
+            tools (Dict[str, Any]): Tool metadata keyed by tool name.
+            outputs (Iterable[Union[str, Path]], optional): Files the registration created,
+                required for the entry to be reused.
+        """
+        key, content_hash = fingerprint
+        entry = {
+            "hash": content_hash,
+            "tools": tools,
+            "outputs": [str(output) for output in outputs],
+        }
+        self._update(lambda entries: entries.__setitem__(key, entry))
+
+    def forget(self, source: Optional[Union[str, Path]] = None) -> None:
+        """Drop the entry of one source, or the whole manifest."""
+        if source is None:
+            self._update(lambda entries: entries.clear())
+            return
+        fingerprint = self.fingerprint(source)
+        if fingerprint is not None:
+            self._update(lambda entries: entries.pop(fingerprint[0], None))
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._load()
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._load())
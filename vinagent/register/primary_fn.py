@@ -1,10 +1,33 @@
 import functools
+from typing import Callable, Optional
 
 
 # Decorator to mark and validate the primary function
-def primary_function(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
+def primary_function(
+    func: Optional[Callable] = None,
+    *,
+    cache_ttl: Optional[float] = None,
+    version: Optional[str] = None,
+):
+    """
+    Mark a function as an agent tool.
 
-    return wrapper
+    Used bare (``@primary_function``) or with options
+    (``@primary_function(cache_ttl=300)``). A ``cache_ttl`` declares the tool
+    deterministic: its results are reused for ``cache_ttl`` seconds for calls with
+    the same arguments. Bump ``version`` when the behaviour changes without a code
+    change (e.g. new upstream data) to invalidate the cached results.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return func(*args, **kwargs)
+
+        wrapper.__tool_cache_ttl__ = cache_ttl
+        wrapper.__tool_version__ = version
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
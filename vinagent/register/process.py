@@ -0,0 +1,268 @@
+import os
+import sys
+import time
+import signal
+import asyncio
+import inspect
+import logging
+import tempfile
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# Called with (stream name, decoded text) for every chunk of output
+OutputCallback = Callable[[str, str], None]
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Applies the rlimits in the child and replaces itself with the command:
+# argv = [cpu seconds, address space bytes, program, *arguments]
+_RLIMIT_EXEC = """\
+import os, resource, sys
+cpu, memory = int(sys.argv[1]), int(sys.argv[2])
+if cpu:
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+if memory:
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+try:
+    os.execvp(sys.argv[3], sys.argv[3:])
+except OSError as e:
+    sys.stderr.write(f"{sys.argv[3]}: {e}\\n")
+    os._exit(127)
+"""
+
+
+class ProcessLimits(BaseModel):
+    """Resource limits of a subprocess started by `run_process`."""
+
+    timeout: Optional[float] = Field(
+        default=600.0, description="Wall-clock seconds before the process is killed"
+    )
+    cpu_time: Optional[int] = Field(
+        default=None, description="CPU seconds (RLIMIT_CPU), POSIX only"
+    )
+    memory_bytes: Optional[int] = Field(
+        default=None, description="Address space in bytes (RLIMIT_AS), POSIX only"
+    )
+    max_output_bytes: int = Field(
+        default=32 * 1024,
+        description="Bytes of each stream kept in memory, half from the head and half from the tail",
+    )
+    max_log_bytes: Optional[int] = Field(
+        default=64 * 1024 * 1024,
+        description="Bytes of each stream written to the output log. The worker pool applies it as "
+        "RLIMIT_FSIZE, which caps every file written by the job. None for no limit",
+    )
+    log_dir: Optional[Path] = Field(
+        default=None,
+        description="Directory of the full output logs. Defaults to the system temp directory",
+    )
+
+
+class OutputBuffer:
+    """
+    Bounded capture of a stream: the first and the last bytes of the output.
+
+    The head keeps the first ``max_bytes // 2`` bytes (commands print their
+    header there), the tail is a ring of the last ``max_bytes // 2`` bytes
+    (where errors and results end up). Everything in between is only counted.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail: deque = deque()
+        self.tail_size = 0
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        if len(self.head) < self.head_limit:
+            room = self.head_limit - len(self.head)
+            self.head += data[:room]
+            data = data[room:]
+        if not data or not self.tail_limit:
+            return
+        self.tail.append(data)
+        self.tail_size += len(data)
+        while self.tail_size - len(self.tail[0]) >= self.tail_limit:
+            self.tail_size -= len(self.tail.popleft())
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + self.tail_limit
+
+    def text(self) -> str:
+        tail = b"".join(self.tail)
+        if not self.truncated:
+            return (bytes(self.head) + tail).decode("utf-8", errors="replace")
+        tail = tail[-self.tail_limit :]
+        omitted = self.total - len(self.head) - len(tail)
+        return (
+            self.head.decode("utf-8", errors="replace")
+            + f"\n... [{omitted} bytes omitted] ...\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+
+class ProcessResult(BaseModel):
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    truncated: bool = False
+    log_path: Optional[Path] = None
+    duration: float = 0.0
+
+
+def _limit_resources(args: List[str], limits: ProcessLimits) -> List[str]:
+    """
+    Wrap ``args`` in a small interpreter applying the CPU and memory rlimits
+    before exec'ing the command.
+
+    ``preexec_fn`` would be simpler but is unsafe in a process running threads
+    (the background tool loop, the guardrail pool, batch workers): the child
+    may deadlock on a lock held by another thread at fork time.
+    """
+    if sys.platform == "win32" or not (limits.cpu_time or limits.memory_bytes):
+        return list(args)
+    return [
+        sys.executable,
+        "-c",
+        _RLIMIT_EXEC,
+        str(limits.cpu_time or 0),
+        str(limits.memory_bytes or 0),
+        *args,
+    ]
+
+
+def kill_process(process: asyncio.subprocess.Process) -> None:
+    """Kill a process started by `run_process`, with its whole process group on POSIX."""
+    try:
+        if sys.platform != "win32":
+            # The process leads its own session: also kill what the shell spawned
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def run_process(
+    args: List[str],
+    cwd: Union[str, Path, None] = None,
+    env: Optional[Dict[str, str]] = None,
+    limits: Optional[ProcessLimits] = None,
+    on_output: Optional[OutputCallback] = None,
+) -> ProcessResult:
+    """
+    Run a command, streaming its output, under wall-clock, CPU and memory limits.
+
+    stdout and stderr are read incrementally: each chunk is passed to
+    ``on_output``, appended to a log file (up to ``max_log_bytes`` per stream)
+    and kept in a head+tail `OutputBuffer`, so memory and disk use are bounded
+    whatever the command prints. The log file is kept (and returned as
+    ``log_path``) only when the captured output was truncated.
+
+    Args:
+        args (List[str]): Program and arguments, executed without a shell.
+        cwd (Union[str, Path], optional): Working directory.
+        env (Dict[str, str], optional): Environment of the process.
+        limits (ProcessLimits, optional): Resource limits. Defaults to ProcessLimits().
+        on_output (OutputCallback, optional): Called with ("stdout" | "stderr", text)
+            for every chunk. May be a coroutine function.
+
+    Returns:
+        ProcessResult: Exit code, captured output and whether the process timed out.
+    """
+    limits = limits or ProcessLimits()
+    log_dir = Path(limits.log_dir) if limits.log_dir else Path(tempfile.gettempdir())
+    log_dir.mkdir(parents=True, exist_ok=True)
+    fd, log_path = tempfile.mkstemp(dir=str(log_dir), prefix="vinagent-", suffix=".log")
+    log_file = os.fdopen(fd, "wb")
+
+    buffers = {
+        "stdout": OutputBuffer(limits.max_output_bytes),
+        "stderr": OutputBuffer(limits.max_output_bytes),
+    }
+    start = time.perf_counter()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *_limit_resources(args, limits),
+            cwd=str(cwd) if cwd else None,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=sys.platform != "win32",
+        )
+    except BaseException:
+        # e.g. FileNotFoundError of a missing interpreter: do not leak the log
+        log_file.close()
+        Path(log_path).unlink(missing_ok=True)
+        raise
+
+    async def _pump(name: str, stream: asyncio.StreamReader) -> None:
+        logged = 0
+        while True:
+            data = await stream.read(_READ_CHUNK_SIZE)
+            if not data:
+                return
+            buffers[name].write(data)
+            if limits.max_log_bytes is None:
+                log_file.write(data)
+            elif logged < limits.max_log_bytes:
+                room = limits.max_log_bytes - logged
+                log_file.write(data[:room])
+                logged += min(len(data), room)
+                if len(data) > room:
+                    log_file.write(
+                        f"\n... [{name} log limit of {limits.max_log_bytes} bytes reached] ...\n".encode()
+                    )
+            if on_output is not None:
+                result = on_output(name, data.decode("utf-8", errors="replace"))
+                if inspect.isawaitable(result):
+                    await result
+
+    timed_out = False
+    # The timeout also covers the exit: the process may close its pipes and keep running
+    work = asyncio.gather(
+        _pump("stdout", process.stdout),
+        _pump("stderr", process.stderr),
+        process.wait(),
+    )
+    try:
+        await asyncio.wait_for(asyncio.shield(work), limits.timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        logger.warning(f"Killing process {args[0]} after {limits.timeout}s timeout")
+        kill_process(process)
+        await work
+    except BaseException:
+        # e.g. cancelled: kill the process and do not leak the log
+        kill_process(process)
+        work.cancel()
+        # Nobody awaits the gathered tasks anymore: retrieve their cancellation
+        work.add_done_callback(lambda f: f.cancelled() or f.exception())
+        log_file.close()
+        Path(log_path).unlink(missing_ok=True)
+        raise
+    finally:
+        log_file.close()
+
+    truncated = any(buffer.truncated for buffer in buffers.values())
+    if not truncated:
+        Path(log_path).unlink(missing_ok=True)
+    return ProcessResult(
+        returncode=process.returncode,
+        stdout=buffers["stdout"].text(),
+        stderr=buffers["stderr"].text(),
+        timed_out=timed_out,
+        truncated=truncated,
+        log_path=Path(log_path) if truncated else None,
+        duration=time.perf_counter() - start,
+    )
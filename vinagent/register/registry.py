@@ -0,0 +1,160 @@
+import os
+import json
+import tempfile
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ToolRegistry:
+    """
+    In-process registry of tool metadata backed by a JSON file.
+
+    The file is parsed once and served from memory afterwards. Every write goes
+    through to disk atomically (temporary file + ``os.replace``), and every read
+    checks the file signature (inode, mtime, size) so that changes made by
+    another process are picked up on the next access.
+    """
+
+    def __init__(self, tools_path: Path):
+        """
+        Initialize the registry for a tools JSON file.
+
+        Args:
+            tools_path (Path): Path to the JSON file storing tool metadata.
+        """
+        self.tools_path = Path(tools_path)
+        self._tools: Dict[str, Any] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._version = 0
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        """Monotonic counter bumped every time the in-memory tools change."""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.tools_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self) -> None:
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return
+
+        if signature is None:
+            tools = {}
+        else:
+            try:
+                with open(self.tools_path, "r", encoding="utf-8") as f:
+                    tools = json.load(f)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Invalid tools file {self.tools_path}: {e}")
+                tools = {}
+
+        self._tools = tools
+        self._signature = signature
+        self._version += 1
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Return the registered tools, reloading the file only if it changed on disk.
+
+        Returns:
+            Dict[str, Any]: A shallow copy of the tool metadata keyed by tool name.
+        """
+        with self._lock:
+            self._refresh()
+            return dict(self._tools)
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """
+        Return the registry version together with the matching tools.
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: ``(version, tools)`` read under the same lock.
+        """
+        with self._lock:
+            self._refresh()
+            return self._version, dict(self._tools)
+
+    def get(self, tool_name: str, default: Any = None) -> Any:
+        """
+        Return the metadata of a single tool without copying the registry.
+
+        Args:
+            tool_name (str): Name of the registered tool.
+            default (Any, optional): Value returned if the tool is unknown. Defaults to None.
+        """
+        with self._lock:
+            self._refresh()
+            return self._tools.get(tool_name, default)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._tools)
+
+    def __contains__(self, tool_name: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return tool_name in self._tools
+
+    def save(self, tools: Dict[str, Any]) -> None:
+        """
+        Replace the registered tools and write them atomically to disk.
+
+        Args:
+            tools (Dict[str, Any]): Dictionary of tool metadata to save.
+        """
+        with self._lock:
+            self.tools_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.tools_path.parent),
+                prefix=f".{self.tools_path.name}.",
+                suffix=".tmp",
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(tools, f, indent=4, ensure_ascii=False)
+                # mkstemp creates the file as 0600, keep the usual permissions
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.tools_path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+            self._tools = dict(tools)
+            self._signature = self._stat_signature()
+            self._version += 1
+
+    def update(self, tools: Dict[str, Any]) -> None:
+        """
+        Add or overwrite several tools in a single atomic write.
+
+        Args:
+            tools (Dict[str, Any]): Dictionary of tool metadata keyed by tool name.
+        """
+        with self._lock:
+            self._refresh()
+            merged = dict(self._tools)
+            merged.update(tools)
+            self.save(merged)
+
+    def reset(self) -> None:
+        """Remove every registered tool."""
+        self.save({})
@@ -0,0 +1,153 @@
+import os
+import asyncio
+import logging
+import importlib
+import threading
+from types import ModuleType
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _ModuleEntry:
+    def __init__(self, module: ModuleType):
+        self.module = module
+        self.file = getattr(module, "__file__", None)
+        self.signature = _file_signature(self.file)
+        # Bumped on every reload, the callables resolved before are stale
+        self.generation = 0
+        self.stale = False
+
+
+def _file_signature(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CallableCache:
+    """
+    Resolved callables of module tools, keyed by ``(module_path, tool_name)``.
+
+    A module is imported once and each tool function looked up once. Before a
+    cached callable is returned, the source file of its module is checked with a
+    single ``os.stat``: if it changed on disk, the module is reloaded (once for
+    all its tools) and the callables are resolved again. Modules without a source
+    file (builtins, namespace packages) are never reloaded.
+    """
+
+    def __init__(self, package: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            package (str, optional): Anchor of relative module paths. Defaults to None.
+        """
+        self.package = package
+        self._modules: Dict[str, _ModuleEntry] = {}
+        self._callables: Dict[Tuple[str, str], Tuple[int, Callable]] = {}
+        self._lock = threading.RLock()
+
+    def _module(self, module_path: str) -> _ModuleEntry:
+        entry = self._modules.get(module_path)
+        if entry is None:
+            entry = _ModuleEntry(
+                importlib.import_module(module_path, package=self.package)
+            )
+            self._modules[module_path] = entry
+            return entry
+        signature = _file_signature(entry.file)
+        if entry.stale or (signature is not None and signature != entry.signature):
+            logger.info(f"Reloading module {module_path}")
+            entry.module = importlib.reload(entry.module)
+            entry.stale = False
+            entry.signature = signature
+            entry.generation += 1
+        return entry
+
+    def resolve(self, module_path: str, tool_name: str) -> Callable:
+        """
+        Return the function ``tool_name`` of the module ``module_path``.
+
+        Raises:
+            ImportError: If the module cannot be imported.
+            AttributeError: If the module has no attribute ``tool_name``.
+        """
+        with self._lock:
+            module_entry = self._module(module_path)
+            cached = self._callables.get((module_path, tool_name))
+            if cached is not None and cached[0] == module_entry.generation:
+                return cached[1]
+            func = getattr(module_entry.module, tool_name)
+            self._callables[(module_path, tool_name)] = (
+                module_entry.generation,
+                func,
+            )
+            return func
+
+    async def aresolve(self, module_path: str, tool_name: str) -> Callable:
+        """
+        Async variant of `resolve`: the first resolution, which imports the
+        module, runs in a thread so that it does not block the event loop.
+        """
+        with self._lock:
+            resolved = (module_path, tool_name) in self._callables
+        if resolved:
+            return self.resolve(module_path, tool_name)
+        return await asyncio.to_thread(self.resolve, module_path, tool_name)
+
+    def prewarm(
+        self, tools: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Exception]:
+        """
+        Resolve ``(module_path, tool_name)`` pairs ahead of their first call.
+
+        Returns:
+            Dict[Tuple[str, str], Exception]: The pairs that failed to resolve, with their error.
+        """
+        failures = {}
+        for module_path, tool_name in tools:
+            try:
+                self.resolve(module_path, tool_name)
+            except Exception as e:
+                logger.warning(f"Could not prewarm tool {module_path}.{tool_name}: {e}")
+                failures[(module_path, tool_name)] = e
+        return failures
+
+    def invalidate(
+        self,
+        module_path: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        reload: bool = True,
+    ) -> None:
+        """
+        Forget a resolved callable, or the callables of a module (or of every module).
+
+        Args:
+            module_path (str, optional): Module to invalidate. Defaults to None (every module).
+            tool_name (str, optional): Only forget this tool of ``module_path``.
+            reload (bool, optional): Reload the invalidated modules on next use. If False,
+                the modules are only looked up again in ``sys.modules``. Defaults to True.
+        """
+        with self._lock:
+            if module_path is not None and tool_name is not None:
+                self._callables.pop((module_path, tool_name), None)
+                return
+            if module_path is None:
+                paths = list(self._modules)
+            else:
+                paths = [module_path] if module_path in self._modules else []
+            for path in paths:
+                if reload:
+                    self._modules[path].stale = True
+                else:
+                    del self._modules[path]
+                    for key in [key for key in self._callables if key[0] == path]:
+                        del self._callables[key]
+
+    def __len__(self) -> int:
+        return len(self._callables)
@@ -0,0 +1,162 @@
+import re
+import math
+import json
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+_CAMEL_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a text into lowercase word tokens.
+
+    ``snake_case`` and ``camelCase`` identifiers are split into their words so
+    that a tool named ``fetch_stock_data`` matches the query "stock data".
+    """
+    if not text:
+        return []
+    text = _CAMEL_PATTERN.sub(" ", text)
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over a small in-memory corpus.
+
+    Documents are given as ``{key: tokens}``. Scoring only walks the postings of
+    the query terms, so a search costs O(number of matching postings).
+    """
+
+    def __init__(
+        self,
+        documents: Dict[str, List[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for key, tokens in documents.items():
+            self.doc_lengths[key] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                self.postings[term][key] = tf
+
+        num_docs = len(self.doc_lengths)
+        self.avg_doc_length = (
+            sum(self.doc_lengths.values()) / num_docs if num_docs else 0.0
+        )
+        self.idf: Dict[str, float] = {
+            term: math.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def score(self, query_tokens: Iterable[str]) -> Dict[str, float]:
+        """
+        Compute the BM25 score of every document sharing a term with the query.
+
+        Args:
+            query_tokens (Iterable[str]): Tokenized query.
+
+        Returns:
+            Dict[str, float]: Scores keyed by document key. Documents without any
+            query term are left out.
+        """
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(query_tokens):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for key, tf in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.doc_lengths[key] / self.avg_doc_length
+                )
+                scores[key] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(
+        self, query_tokens: Iterable[str], top_k: int
+    ) -> List[Tuple[str, float]]:
+        """
+        Return the ``top_k`` best matching documents as ``(key, score)`` pairs.
+        """
+        scores = self.score(query_tokens)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+
+class ToolRetriever:
+    """
+    Lexical tool retrieval over the tool registry.
+
+    Each tool is indexed on its name (boosted), its argument names and
+    descriptions and its docstring. The index is rebuilt only when the registry
+    version changes, i.e. after tools are registered.
+    """
+
+    def __init__(self, name_boost: int = 3):
+        self.name_boost = name_boost
+        self._index: Optional[BM25Index] = None
+        self._index_key = None
+        self._lock = threading.Lock()
+
+    def tool_tokens(self, tool_name: str, tool: Dict[str, Any]) -> List[str]:
+        arguments = tool.get("arguments") or {}
+        if isinstance(arguments, dict):
+            arguments_text = " ".join(f"{k} {v}" for k, v in arguments.items())
+        else:
+            arguments_text = json.dumps(arguments, ensure_ascii=False)
+        name_tokens = tokenize(tool.get("tool_name", tool_name))
+        return (
+            name_tokens * self.name_boost
+            + tokenize(arguments_text)
+            + tokenize(tool.get("docstring", ""))
+        )
+
+    def build(self, tools: Dict[str, Any], index_key: Any = None) -> BM25Index:
+        """
+        Return the index for ``tools``, rebuilding it only if ``index_key`` changed.
+        """
+        with self._lock:
+            if index_key is None or self._index is None or index_key != self._index_key:
+                self._index = BM25Index(
+                    {name: self.tool_tokens(name, tool) for name, tool in tools.items()}
+                )
+                self._index_key = index_key
+            return self._index
+
+    def retrieve(
+        self,
+        query: str,
+        tools: Dict[str, Any],
+        top_k: int,
+        pinned_tools: Optional[List[str]] = None,
+        index_key: Any = None,
+    ) -> List[str]:
+        """
+        Select the tool names to expose to the LLM for ``query``.
+
+        Args:
+            query (str): The user query.
+            tools (Dict[str, Any]): All registered tools.
+            top_k (int): Maximum number of retrieved (non pinned) tools.
+            pinned_tools (List[str], optional): Tools always included if registered.
+            index_key (Any, optional): Version of ``tools``, used to reuse the index.
+
+        Returns:
+            List[str]: Selected tool names in registry order, so that the same
+            selection always renders the same prompt.
+        """
+        index = self.build(tools, index_key=index_key)
+        selected = {name for name in (pinned_tools or []) if name in tools}
+        for name, score in index.search(tokenize(query), top_k):
+            if score > 0:
+                selected.add(name)
+        return [name for name in tools if name in selected]
@@ -6,20 +6,34 @@ import importlib
 import importlib.util
 import logging
 from functools import wraps
-from typing import Dict, Any, Optional, Callable, Union, Literal
+from typing import TYPE_CHECKING, Dict, Any, Optional, Callable, Union, Literal
 from pydantic import BaseModel, Field, field_validator
 import ast
 import uuid
+import hashlib
 from pathlib import Path
 import shutil
-from vinagent.mcp import load_mcp_tools
-from vinagent.mcp.client import DistributedMCPClient
-from langchain_core.messages.tool import ToolMessage
+from vinagent.register.registry import ToolRegistry
+from vinagent.register.retrieval import ToolRetriever
+from vinagent.register.process import (
+    OutputCallback,
+    ProcessLimits,
+    run_process,
+)
+from vinagent.register.worker_pool import PythonWorkerPool
+from vinagent.register.cache import ToolResultCache, result_cache_key
+from vinagent.register.resolver import CallableCache
+from vinagent.register.extractor import ToolExtractor
+from vinagent.register.manifest import Fingerprint, RegistrationManifest
+from langchain_core.messages.tool import ToolMessage, ToolMessageChunk
 from langchain_core.language_models.base import BaseLanguageModel
 import asyncio
 import re
 import yaml
 
+if TYPE_CHECKING:
+    from vinagent.mcp.client import DistributedMCPClient
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,6 +50,11 @@ class ToolManager:
         llm: BaseLanguageModel,
         tools_path: Path = Path("templates/tools.json"),
         is_reset_tools: bool = False,
+        max_concurrency: int = 4,
+        skill_limits: Optional[ProcessLimits] = None,
+        python_worker_pool: Optional[PythonWorkerPool] = None,
+        result_cache: Optional[ToolResultCache] = None,
+        use_manifest: bool = True,
     ):
         """
         Initialize the ToolManager with a path to the tools JSON file.
@@ -44,6 +63,13 @@ class ToolManager:
             llm (BaseLanguageModel): Language model instance for tool analysis.
             tools_path (Path, optional): Path to the JSON file for storing tools. Defaults to Path("templates/tools.json").
             is_reset_tools (bool, optional): If True, resets the tools file to an empty JSON object. Defaults to False.
+            max_concurrency (int, optional): Maximum number of tool calls executed concurrently by `_execute_tools`. Defaults to 4.
+            skill_limits (ProcessLimits, optional): Timeout, CPU, memory and output limits of agentskill commands. Defaults to ProcessLimits().
+            python_worker_pool (PythonWorkerPool, optional): Warm interpreters running the python-code commands of agentskill tools.
+                Defaults to None (a new interpreter per command).
+            result_cache (ToolResultCache, optional): Cache of the results of tools declaring a ``cache_ttl``. Defaults to an in-memory ToolResultCache().
+            use_manifest (bool, optional): Reuse the registration of tool sources whose content did not change,
+                recorded in ``<tools_path stem>.manifest.json``. Defaults to True.
 
         Behavior:
             - Converts tools_path to a Path object if provided as a string.
@@ -53,39 +79,94 @@ class ToolManager:
         self.llm = llm
         self.tools_path = tools_path
         self.is_reset_tools = is_reset_tools
+        self.max_concurrency = max_concurrency
+        self.skill_limits = skill_limits or ProcessLimits()
+        self.python_worker_pool = python_worker_pool
+        self.result_cache = result_cache or ToolResultCache()
         self.tools_path = (
             Path(tools_path) if isinstance(tools_path, str) else tools_path
         )
-        if not self.tools_path.exists():
-            self.tools_path.write_text(json.dumps({}, indent=4), encoding="utf-8")
-
-        if self.is_reset_tools:
-            self.tools_path.write_text(json.dumps({}, indent=4), encoding="utf-8")
+        self.registry = ToolRegistry(self.tools_path)
+        if not self.tools_path.exists() or self.is_reset_tools:
+            self.registry.reset()
 
+        self.retriever = ToolRetriever()
         self._registered_functions: Dict[str, Callable] = {}
+        # Imported module tools, reloaded when their file changes on disk
+        self.callables = CallableCache(package=__package__)
+        # tool_name -> (tool metadata, function, cache policy) of `_cache_policy`
+        self._cache_policies: Dict[str, tuple] = {}
+        self.extractor = ToolExtractor()
+        self.manifest = (
+            RegistrationManifest(
+                self.tools_path.with_name(f"{self.tools_path.stem}.manifest.json")
+            )
+            if use_manifest
+            else None
+        )
 
     def load_tools(self) -> Dict[str, Any]:
         """
-        Load existing tools from the JSON file.
+        Load existing tools from the in-memory registry.
+
+        The JSON file is only parsed again when it was modified on disk, e.g. by
+        another process sharing the same ``tools_path``.
 
         Returns:
             Dict[str, Any]: A dictionary of tool metadata, where keys are tool names.
         """
         if self.tools_path:
-            with open(self.tools_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return self.registry.load()
         else:
             return {}
 
+    def get(self, tool_name: str, default: Any = None) -> Any:
+        """
+        Get the metadata of a single registered tool.
+
+        Args:
+            tool_name (str): Name of the registered tool.
+            default (Any, optional): Value returned if the tool is not registered. Defaults to None.
+
+        Returns:
+            Any: The tool metadata dictionary, or ``default``.
+        """
+        return self.registry.get(tool_name, default)
+
+    def retrieve_tools(
+        self, query: str, top_k: int, pinned_tools: Optional[list[str]] = None
+    ) -> list[str]:
+        """
+        Rank the registered tools against a query with BM25 and keep the best ones.
+
+        The index covers tool name, arguments and docstring. It is built from the
+        registry and only rebuilt when tools are registered or changed.
+
+        Args:
+            query (str): The user query.
+            top_k (int): Maximum number of retrieved tools.
+            pinned_tools (list[str], optional): Tool names always selected.
+
+        Returns:
+            list[str]: Names of the selected tools.
+        """
+        version, tools = self.registry.snapshot()
+        return self.retriever.retrieve(
+            query=query,
+            tools=tools,
+            top_k=top_k,
+            pinned_tools=pinned_tools,
+            index_key=version,
+        )
+
     def save_tools(self, tools: Dict[str, Any]) -> None:
         """
-        Save tools metadata to the JSON file.
+        Save tools metadata to the registry and write it through to the JSON file.
 
         Args:
             tools (Dict[str, Any]): Dictionary of tool metadata to save.
         """
-        with open(self.tools_path, "w", encoding="utf-8") as f:
-            json.dump(tools, f, indent=4, ensure_ascii=False)
+        self.registry.save(tools)
 
     def register_function_tool(self, func):
         """
@@ -141,6 +222,9 @@ class ToolManager:
             "tool_call_id": "tool_" + str(uuid.uuid4())[:35],
             "is_runtime": module_path == "__runtime__",
         }
+        if getattr(func, "__tool_cache_ttl__", None) is not None:
+            metadata["cache_ttl"] = func.__tool_cache_ttl__
+            metadata["cache_version"] = getattr(func, "__tool_version__", None)
 
         # Register both the function and its metadata
         self._registered_functions[func.__name__] = func
@@ -154,7 +238,7 @@ class ToolManager:
         return wrapper
 
     async def register_mcp_tool(
-        self, client: DistributedMCPClient, server_name: str = None
+        self, client: "DistributedMCPClient", server_name: str = None
     ) -> list[Dict[str, Any]]:
         """
         Register tools from an MCP (Memory Compute Platform) server.
@@ -206,7 +290,7 @@ class ToolManager:
             # tool['mcp_client_connections'] = client.connections
             # tool['mcp_server_name'] = server_name
             tool["tool_call_id"] = "tool_" + str(uuid.uuid4())[:35]
-            tool["is_runtime"]: module_path == "__runtime__"
+            tool["is_runtime"] = False
             return tool
 
         new_tools = [convert_mcp_tool(mcp_tool.__dict__) for mcp_tool in all_tools]
@@ -219,22 +303,32 @@ class ToolManager:
         logger.info(f"Completed registration for mcp module {server_name}")
         return new_tools
 
-    def register_module_tool(self, module_path: str) -> None:
+    def register_module_tool(self, module_path: str, prewarm: bool = True) -> None:
         """
         Register tools from a Python module.
 
         Args:
             module_path (str): Path to the module or import path in module import format.
+            prewarm (bool, optional): Resolve the tool functions now rather than at their first call. Defaults to True.
 
         Raises:
             ValueError: If the module cannot be loaded or tool format is invalid.
 
         Behavior:
             - Copies the module file to the tools directory if a file path is provided.
-            - Imports the module and extracts tool metadata using the language model.
+            - Imports the module and extracts the metadata of its ``@primary_function`` tools
+              by parsing its source (all public functions if none is decorated).
             - Assigns a unique tool_call_id for each tool.
             - Saves tools to the JSON file.
+            - Reuses the tools recorded in the manifest instead if the source did not change.
         """
+        fingerprint = self._fingerprint(module_path)
+        if self._register_from_manifest(fingerprint):
+            return
+        # Registered before from another content: an imported copy would be stale
+        is_changed = fingerprint is not None and fingerprint[0] in self.manifest
+
+        outputs = []
         if os.path.isdir(module_path):
             module_dir = Path(module_path)
             absolute_lib_path = Path(os.path.dirname(os.path.abspath(__file__)))
@@ -276,119 +370,20 @@ class ToolManager:
                     pass
                 else:
                     shutil.copy2(module_path, destination_path)
+                outputs.append(destination_path)
                 module_path = f"vinagent.tools.{destination_path.name.split('.')[0]}"
-            module = importlib.import_module(module_path, package=__package__)
+            if is_changed and module_path in sys.modules:
+                module = importlib.reload(sys.modules[module_path])
+            else:
+                module = importlib.import_module(module_path, package=__package__)
             module_source = inspect.getsource(module)
         except (ImportError, ValueError) as e:
             raise ValueError(f"Failed to load module {module_path}: {str(e)}")
 
-        prompt = (
-            "Analyze this module and return a list of tools in JSON format:\n"
-            "- Module code:\n"
-            f"{module_source}\n"
-            "- Extract only tools marked with the @primary_function decorator. For example @primary_function def function_name(): ...\n"
-            "- Let's return a list of json format without further explaination and without ```json characters markdown and keep module_path unchange.\n"
-            "- Return value must be able to convert into a list from string.\n"
-            "[{{\n"
-            '"tool_name": "The function",\n'
-            '"arguments": "A dictionary of keyword-arguments to execute tool. Let\'s keep default value if it was set",\n'
-            '"return": "Return value of this tool",\n'
-            '"docstring": "Docstring of this tool",\n'
-            '"dependencies": "List of libraries need to run this tool",\n'
-            f'"module_path": "{module_path}"\n'
-            "}}]\n"
-        )
-
-        response = self.llm.invoke(prompt)
-        response_text = ""
-        if hasattr(response, "content"):
-            response_text = response.content.strip()
-        else:
-            response_text = response.strip()
-
-        # Remove markdown code fences if present
-        if response_text.startswith("```"):
-            # Remove the first line (```json or ```)
-            response_lines = response_text.splitlines()
-            # Skip first line if it starts with ```
-            if response_lines[0].startswith("```"):
-                response_lines = response_lines[1:]
-            # Remove last line if it's ```
-            if response_lines and response_lines[-1].startswith("```"):
-                response_lines = response_lines[:-1]
-            response_text = "\n".join(response_lines)
-
-        # Attempt to parse the entire text first
-        try:
-            new_tools = ast.literal_eval(response_text)
-        except (ValueError, SyntaxError):
-            # Fallback: extract the first JSON object/list from text
-            extracted = self.extract_tool(response_text)
-            if extracted:
-                try:
-                    new_tools = ast.literal_eval(extracted)
-                except (ValueError, SyntaxError) as e:
-                    raise ValueError(
-                        f"Invalid tool format from LLM after extraction: {str(e)}"
-                    )
-            else:
-                raise ValueError(
-                    "Invalid tool format from LLM: could not find valid JSON list"
-                )
-
-        # Ensure new_tools is a list of dictionaries
-        if isinstance(new_tools, dict):
-            new_tools = [new_tools]
-        if not isinstance(new_tools, list):
-            raise ValueError(
-                f"Invalid tool format from LLM: Expected list or dict, got {type(new_tools)}"
-            )
-        for idx, item in enumerate(new_tools):
-            if not isinstance(item, dict):
-                raise ValueError(
-                    f"Invalid tool format from LLM: Element at index {idx} is {type(item)}, expected dict"
-                )
-
-        # Fallback to local introspection if required keys are missing or list is empty
-        REQUIRED_KEYS = {"tool_name", "arguments", "return", "docstring"}
-
-        def _introspect_module(module_obj, module_path_str):
-            result = []
-            for name, obj in inspect.getmembers(module_obj, inspect.isfunction):
-                if inspect.getmodule(obj) != module_obj:
-                    continue  # Skip imported functions
-                sig = inspect.signature(obj)
-                arguments = {
-                    param_name: (
-                        str(param.annotation)
-                        if param.annotation != inspect.Parameter.empty
-                        else "Any"
-                    )
-                    for param_name, param in sig.parameters.items()
-                }
-                return_type = (
-                    str(sig.return_annotation)
-                    if sig.return_annotation != inspect.Signature.empty
-                    else "Any"
-                )
-                metadata = {
-                    "tool_name": name,
-                    "arguments": arguments,
-                    "return": return_type,
-                    "docstring": (obj.__doc__ or "").strip(),
-                    "dependencies": [],
-                    "module_path": module_path_str,
-                }
-                result.append(metadata)
-            return result
-
-        if len(new_tools) == 0 or any(
-            not REQUIRED_KEYS.issubset(item.keys()) for item in new_tools
-        ):
-            logger.warning(
-                "LLM did not return valid tool metadata, falling back to introspection."
-            )
-            new_tools = _introspect_module(module, module_path)
+        # Static extraction, memoized by source hash: no LLM call on registration
+        new_tools = self.extractor.extract(module_source, module_path)
+        if not new_tools:
+            logger.warning(f"No tool found in module {module_path}")
 
         tools = self.load_tools()
         for tool in new_tools:
@@ -400,8 +395,47 @@ class ToolManager:
             logger.info(f"Registered {tool['tool_name']}:\n{tool}")
 
         self.save_tools(tools)
+        if fingerprint is not None and new_tools:
+            self.manifest.record(
+                fingerprint,
+                {tool["tool_name"]: tools[tool["tool_name"]] for tool in new_tools},
+                outputs=outputs,
+            )
+        # Resolve the tools again from the module imported above
+        self.callables.invalidate(module_path, reload=False)
+        if prewarm:
+            self.callables.prewarm(
+                (module_path, tool["tool_name"]) for tool in new_tools
+            )
         logger.info(f"Completed registration for module {module_path}")
 
+    def _fingerprint(self, source: Union[str, Path]) -> Optional[Fingerprint]:
+        if self.manifest is None:
+            return None
+        return self.manifest.fingerprint(source)
+
+    def _register_from_manifest(self, fingerprint: Optional[Fingerprint]) -> bool:
+        """Register the tools recorded for an unchanged source. Returns False on a miss."""
+        if fingerprint is None:
+            return False
+        recorded = self.manifest.lookup(fingerprint)
+        if recorded is None:
+            return False
+        current = self.load_tools()
+        # Avoid rewriting tools.json when the tools are already registered
+        if any(current.get(name) != tool for name, tool in recorded.items()):
+            self.registry.update(recorded)
+        logger.info(f"Reused registration of {', '.join(recorded)} (source unchanged)")
+        return True
+
+    def prewarm_module_tools(self) -> None:
+        """Import the modules of every registered module tool and resolve their functions."""
+        self.callables.prewarm(
+            (tool["module_path"], tool_name)
+            for tool_name, tool in self.load_tools().items()
+            if tool.get("tool_type") == "module" and tool.get("module_path")
+        )
+
     def extract_tool(self, text: str) -> Optional[str]:
         """
         Extract the first valid JSON object from a text string.
@@ -475,6 +509,10 @@ class ToolManager:
         if not skill_file.exists():
             raise FileNotFoundError(f"SKILL.md not found in {skill_dir}")
 
+        fingerprint = self._fingerprint(skill_dir)
+        if self._register_from_manifest(fingerprint):
+            return
+
         # --- Read the full SKILL.md as docstring (includes examples & commands) ---
         full_content = skill_file.read_text(encoding="utf-8")
 
@@ -514,19 +552,163 @@ class ToolManager:
         tools = self.load_tools()
         tools[skill_name] = metadata
         self.save_tools(tools)
+        if fingerprint is not None:
+            self.manifest.record(fingerprint, {skill_name: metadata})
         logger.info(
             f"Registered agentskill tool: '{skill_name}' "
             f"(working dir: {module_path})"
         )
 
+    def set_cache_policy(
+        self, tool_name: str, cache_ttl: Optional[float], version: Optional[str] = None
+    ) -> None:
+        """
+        Declare a registered tool deterministic, or not anymore.
+
+        This is the registration-time equivalent of ``@primary_function(cache_ttl=...)``
+        for tools whose code is not decorated, e.g. MCP tools.
+
+        Args:
+            tool_name (str): Name of the registered tool.
+            cache_ttl (float, optional): Seconds its results are reused. None disables caching.
+            version (str, optional): Version of the tool, part of the cache key.
+        """
+        tool_meta = self.get(tool_name)
+        if tool_meta is None:
+            raise KeyError(f"Tool '{tool_name}' is not registered")
+        tool_meta = dict(tool_meta)
+        tool_meta.pop("cache_ttl", None)
+        tool_meta.pop("cache_version", None)
+        if cache_ttl is not None:
+            tool_meta["cache_ttl"] = cache_ttl
+            tool_meta["cache_version"] = version
+        self.registry.update({tool_name: tool_meta})
+
+    def _cache_policy(
+        self, tool_name: str, tool_type: str, module_path: Optional[str]
+    ) -> Optional[tuple]:
+        """
+        Return ``(ttl, version)`` if the results of the tool may be cached, else None.
+
+        The TTL is declared in the tool metadata or, for module tools, by the
+        ``@primary_function(cache_ttl=...)`` decorator of the function. The version
+        digests the tool metadata and the bytecode of the function, so editing
+        the tool invalidates its cached results. The policy is computed once per
+        tool and reused until its metadata or its (reloaded) function changes.
+        """
+        tool_meta = self.get(tool_name, {})
+        func = None
+        if tool_type == "function":
+            func = self._registered_functions.get(tool_name)
+        elif tool_type == "module" and module_path:
+            try:
+                func = self.callables.resolve(module_path, tool_name)
+            except (ImportError, AttributeError):
+                return None
+
+        cached = self._cache_policies.get(tool_name)
+        if cached is not None and cached[0] is tool_meta and cached[1] is func:
+            return cached[2]
+        policy = self._build_cache_policy(tool_meta, func)
+        self._cache_policies[tool_name] = (tool_meta, func, policy)
+        return policy
+
+    @staticmethod
+    def _build_cache_policy(
+        tool_meta: dict, func: Optional[Callable]
+    ) -> Optional[tuple]:
+        ttl = tool_meta.get("cache_ttl", getattr(func, "__tool_cache_ttl__", None))
+        if ttl is None or ttl <= 0:
+            return None
+        version = tool_meta.get("cache_version") or getattr(
+            func, "__tool_version__", None
+        )
+
+        digest = hashlib.sha256()
+        for field in ("tool_name", "arguments", "return", "docstring", "module_path"):
+            digest.update(json.dumps(tool_meta.get(field), default=str).encode())
+        code = getattr(inspect.unwrap(func), "__code__", None) if func else None
+        if code is not None:
+            digest.update(code.co_code)
+            digest.update(repr(code.co_names).encode())
+        digest.update(str(version).encode())
+        return ttl, digest.hexdigest()
+
     async def _execute_tool(
         self,
         tool_name: str,
         arguments: dict,
-        mcp_client: DistributedMCPClient = None,
+        mcp_client: "DistributedMCPClient" = None,
+        mcp_server_name: str = None,
+        module_path: str = None,
+        tool_type: str = "function",
+        on_output: Optional[OutputCallback] = None,
+    ) -> Any:
+        """
+        Execute the specified tool, reusing its cached result if it has a cache policy.
+
+        Only successful results are cached, by ``(tool_name, arguments, version)``.
+        Identical calls running at the same time execute the tool once.
+
+        Args:
+            tool_name (str): Name of the tool to execute.
+            arguments (dict): Dictionary of arguments to pass to the tool.
+            mcp_client (DistributedMCPClient): Client for MCP tool execution.
+            mcp_server_name (str): Name of the MCP server.
+            module_path (str): Path to the module for module-type tools.
+            tool_type (str): Type of tool ('function', 'mcp', 'module', or 'agentskills').
+            on_output (OutputCallback, optional): Receives the output of agentskill commands while they run.
+
+        Returns:
+            Any: The result of the tool execution, typically a ToolMessage.
+        """
+
+        def execute():
+            return self._invoke_tool(
+                tool_name,
+                arguments,
+                mcp_client=mcp_client,
+                mcp_server_name=mcp_server_name,
+                module_path=module_path,
+                tool_type=tool_type,
+                on_output=on_output,
+            )
+
+        policy = None
+        if self.result_cache is not None:
+            if tool_type == "module" and module_path:
+                # Import the module off the event loop on its first call
+                try:
+                    await self.callables.aresolve(module_path, tool_name)
+                except (ImportError, AttributeError):
+                    pass
+            policy = self._cache_policy(tool_name, tool_type, module_path)
+        if policy is None:
+            return await execute()
+
+        ttl, version = policy
+
+        async def _compute() -> tuple:
+            message = await execute()
+            cacheable = isinstance(message, ToolMessage) and not (
+                message.additional_kwargs or {}
+            ).get("is_error")
+            return message, cacheable
+
+        key = result_cache_key(tool_name, arguments, version)
+        message = await self.result_cache.get_or_compute(key, ttl, _compute)
+        # Cached messages are shared: the caller sets its own tool_call_id on a copy
+        return message.model_copy(deep=False) if message is not None else message
+
+    async def _invoke_tool(
+        self,
+        tool_name: str,
+        arguments: dict,
+        mcp_client: "DistributedMCPClient" = None,
         mcp_server_name: str = None,
         module_path: str = None,
         tool_type: str = "function",
+        on_output: Optional[OutputCallback] = None,
     ) -> Any:
         """
         Execute the specified tool with the given arguments.
@@ -538,6 +720,7 @@ class ToolManager:
             mcp_server_name (str): Name of the MCP server.
             module_path (str): Path to the module for module-type tools.
             tool_type (str): Type of tool ('function', 'mcp', 'module', or 'agentskills').
+            on_output (OutputCallback, optional): Receives the output of agentskill commands while they run.
 
         Returns:
             Any: The result of the tool execution, typically a ToolMessage.
@@ -555,15 +738,14 @@ class ToolManager:
                 )
             elif tool_type == "agentskills":
                 message = await AgentSkillTool.execute(
-                    self, tool_name, arguments, module_path
+                    self, tool_name, arguments, module_path, on_output=on_output
                 )
             else:
                 raise ValueError(f"Unknown tool_type: '{tool_type}'")
 
             # Validate that the returned message correctly propagates errors
             if isinstance(message, str):
-                tools = self.load_tools()
-                tool_call_id = tools.get(tool_name, {}).get(
+                tool_call_id = self.get(tool_name, {}).get(
                     "tool_call_id", f"tool_{uuid.uuid4()}"
                 )
                 message = ToolMessage(
@@ -579,8 +761,7 @@ class ToolManager:
                 f"Error executing tool '{tool_name}': {type(e).__name__}: {str(e)}"
             )
             logger.error(content)
-            tools = self.load_tools()
-            tool_call_id = tools.get(tool_name, {}).get(
+            tool_call_id = self.get(tool_name, {}).get(
                 "tool_call_id", f"tool_{uuid.uuid4()}"
             )
             return ToolMessage(
@@ -590,6 +771,73 @@ class ToolManager:
                 additional_kwargs={"is_error": True},
             )
 
+    async def _execute_tools(
+        self,
+        tool_calls: list[dict],
+        mcp_client: "DistributedMCPClient" = None,
+        mcp_server_name: str = None,
+        max_concurrency: Optional[int] = None,
+        on_output: Optional[Callable[[ToolMessageChunk], None]] = None,
+    ) -> list[ToolMessage]:
+        """
+        Execute several independent tool calls concurrently.
+
+        Args:
+            tool_calls (list[dict]): Tool calls with ``tool_name``, ``arguments``,
+                ``tool_type``, ``module_path`` and the ``tool_call_id`` of the
+                AIMessage tool call they answer.
+            mcp_client (DistributedMCPClient): Client for MCP tool execution.
+            mcp_server_name (str): Name of the MCP server.
+            max_concurrency (int, optional): Maximum number of tools running at the
+                same time. Defaults to ``self.max_concurrency``.
+            on_output (Callable[[ToolMessageChunk], None], optional): Receives the
+                output of agentskill commands while they run, as chunks of the
+                tool message answering their tool call.
+
+        Returns:
+            list[ToolMessage]: One message per tool call, in the same order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency or 1)
+
+        def _chunk_callback(tool_call: dict) -> Optional[OutputCallback]:
+            if on_output is None:
+                return None
+
+            def _on_output(stream: str, text: str) -> None:
+                on_output(
+                    ToolMessageChunk(
+                        content=text,
+                        tool_call_id=tool_call.get("tool_call_id", ""),
+                        name=tool_call["tool_name"],
+                        additional_kwargs={"stream": stream},
+                    )
+                )
+
+            return _on_output
+
+        async def _run(tool_call: dict) -> ToolMessage:
+            async with semaphore:
+                message = await self._execute_tool(
+                    tool_name=tool_call["tool_name"],
+                    tool_type=tool_call["tool_type"],
+                    arguments=tool_call["arguments"],
+                    module_path=tool_call["module_path"],
+                    mcp_client=mcp_client,
+                    mcp_server_name=mcp_server_name,
+                    on_output=_chunk_callback(tool_call),
+                )
+            if message is None:
+                message = ToolMessage(
+                    content="Tool execution success without artifact",
+                    additional_kwargs={"is_error": False},
+                    tool_call_id=tool_call["tool_call_id"],
+                )
+            elif tool_call.get("tool_call_id"):
+                message.tool_call_id = tool_call["tool_call_id"]
+            return message
+
+        return list(await asyncio.gather(*[_run(tc) for tc in tool_calls]))
+
     @staticmethod
     def _extract_json(text: str) -> Optional[str]:
         """
@@ -639,7 +887,7 @@ class FunctionTool:
         Raises:
             Exception: If the function execution fails, logs the error and returns a message.
         """
-        registered_functions = tool_manager.load_tools()
+        tool_meta = tool_manager.get(tool_name, {})
 
         if tool_name in tool_manager._registered_functions:
             try:
@@ -648,7 +896,7 @@ class FunctionTool:
                 artifact = await asyncio.to_thread(func, **arguments)
                 content = f"Completed executing function tool {tool_name}({arguments})"
                 logger.info(content)
-                tool_call_id = registered_functions[tool_name]["tool_call_id"]
+                tool_call_id = tool_meta["tool_call_id"]
                 message = ToolMessage(
                     content=content, artifact=artifact, tool_call_id=tool_call_id
                 )
@@ -657,9 +905,7 @@ class FunctionTool:
                 content = f"Failed to execute function tool {tool_name}({arguments}): {str(e)}"
                 logger.error(content)
                 # Ensure it returns as ToolMessage
-                tool_call_id = registered_functions.get(tool_name, {}).get(
-                    "tool_call_id", f"tool_{uuid.uuid4()}"
-                )
+                tool_call_id = tool_meta.get("tool_call_id", f"tool_{uuid.uuid4()}")
                 return ToolMessage(
                     content=content,
                     artifact=None,
@@ -679,7 +925,7 @@ class MCPTool:
         tool_manager: ToolManager,
         tool_name: str,
         arguments: Dict[str, Any],
-        mcp_client: DistributedMCPClient,
+        mcp_client: "DistributedMCPClient",
         mcp_server_name: str,
     ):
         """
@@ -698,29 +944,25 @@ class MCPTool:
         Raises:
             Exception: If the tool execution fails, logs the error and returns a message.
         """
-        registered_functions = tool_manager.load_tools()
-        """Call the MCP tool natively using the client session."""
-        async with mcp_client.session(mcp_server_name) as session:
-            payload = {"name": tool_name, "arguments": arguments}
-            try:
-                # Send the request to the MCP server
-                # response = await session.call_tool(**payload)
-                response = await session.call_tool(**payload)
-                content = f"Completed executing mcp tool {tool_name}({arguments})"
-                logger.info(content)
-                tool_call_id = registered_functions[tool_name]["tool_call_id"]
-                artifact = response
-                message = ToolMessage(
-                    content=content, artifact=artifact, tool_call_id=tool_call_id
-                )
-                return message
-            except Exception as e:
-                content = (
-                    f"Failed to execute mcp tool {tool_name}({arguments}): {str(e)}"
-                )
-                logger.error(content)
-                # raise {"error": content}
-                return content
+        """Call the MCP tool natively using a pooled client session."""
+        tool_meta = tool_manager.get(tool_name, {})
+        try:
+            # Borrow a warm session from the client pool, reconnecting once if
+            # the pooled connection turns out to be broken.
+            response = await mcp_client.call_tool(mcp_server_name, tool_name, arguments)
+            content = f"Completed executing mcp tool {tool_name}({arguments})"
+            logger.info(content)
+            tool_call_id = tool_meta["tool_call_id"]
+            artifact = response
+            message = ToolMessage(
+                content=content, artifact=artifact, tool_call_id=tool_call_id
+            )
+            return message
+        except Exception as e:
+            content = f"Failed to execute mcp tool {tool_name}({arguments}): {str(e)}"
+            logger.error(content)
+            # raise {"error": content}
+            return content
 
 
 class ModuleTool:
@@ -753,18 +995,17 @@ class ModuleTool:
         Raises:
             ImportError, AttributeError: If the module or function cannot be loaded, logs the error and returns a message.
         """
-        registered_functions = tool_manager.load_tools()
+        tool_meta = tool_manager.get(tool_name, {})
         try:
             if tool_name in globals():
                 return globals()[tool_name](**arguments)
 
-            module = importlib.import_module(module_path, package=__package__)
-            func = getattr(module, tool_name)
+            func = await tool_manager.callables.aresolve(module_path, tool_name)
             # artifact = await func(**arguments)
             artifact = await asyncio.to_thread(func, **arguments)
             content = f"Completed executing module tool {tool_name}({arguments})"
             logger.info(content)
-            tool_call_id = registered_functions[tool_name]["tool_call_id"]
+            tool_call_id = tool_meta["tool_call_id"]
             message = ToolMessage(
                 content=content, artifact=artifact, tool_call_id=tool_call_id
             )
@@ -865,6 +1106,7 @@ class AgentSkillTool:
         arguments: Dict[str, Any],
         module_path: Union[str, Path],
         *args,
+        on_output: Optional[OutputCallback] = None,
         **kwargs,
     ):
         """
@@ -879,7 +1121,7 @@ class AgentSkillTool:
             python scripts/unpack.py document.docx unpacked/
             pandoc --track-changes=all document.docx -o output.md
 
-        Runs via ``subprocess.run(command, shell=True, cwd=working_dir)``.
+        Runs via ``/bin/sh -c command`` with ``cwd=working_dir``.
 
         **Python code block**::
 
@@ -891,24 +1133,37 @@ class AgentSkillTool:
         ``sys.executable <tempfile>`` so that ``print()`` output, imports, and
         tracebacks are captured correctly.
 
+        If ``tool_manager.python_worker_pool`` is set, python code blocks run in
+        one of its warm interpreters instead, which skips the interpreter start
+        and the imports of the preloaded modules.
+
         Detection is handled by :meth:`_is_python_code` (see its docstring).
 
+        Both run through :func:`run_process` under ``tool_manager.skill_limits``:
+        the output is streamed to ``on_output``, a runaway command is killed at
+        the timeout, and only the head and tail of a large output are kept. The
+        full output is then saved to a log file whose path is given in the
+        ToolMessage. Jobs of the worker pool obey the same limits, but their
+        output reaches ``on_output`` only once they are done.
+
         Args:
             tool_manager (ToolManager): Used to look up ``tool_call_id``.
             tool_name (str): Registered agentskill tool name.
             arguments (Dict[str, Any]): Must contain ``"command": str``.
             module_path (Union[str, Path]): Working directory (skill root or
                 its ``scripts/`` sub-directory).
+            on_output (OutputCallback, optional): Receives ("stdout" | "stderr", text)
+                chunks while the command runs.
 
         Returns:
             ToolMessage: ``content`` = status line; ``artifact`` = stdout
             (or combined stdout/stderr on failure).
         """
-        import subprocess
         import tempfile
 
-        registered_functions = tool_manager.load_tools()
+        tool_meta = tool_manager.get(tool_name, {})
         working_dir = Path(module_path).resolve()
+        limits = getattr(tool_manager, "skill_limits", None) or ProcessLimits()
 
         command = arguments.get("command", "")
         if not command:
@@ -925,48 +1180,46 @@ class AgentSkillTool:
             f"(cwd={working_dir}):\n{command}"
         )
 
-        def _run() -> "subprocess.CompletedProcess[str]":
-            if is_python:
-                # Write the code to a temp file so that multi-line logic,
-                # imports, and print() all behave like a normal Python script.
-                with tempfile.NamedTemporaryFile(
-                    mode="w",
-                    suffix=".py",
-                    dir=str(working_dir),
-                    delete=False,
-                    encoding="utf-8",
-                ) as tmp:
-                    tmp.write(command)
-                    tmp_path = tmp.name
-                try:
-                    return subprocess.run(
-                        [sys.executable, tmp_path],
-                        capture_output=True,
-                        text=True,
-                        cwd=str(working_dir),
-                        env=os.environ.copy(),  # inherit any env changes from fix_bug_command
-                    )
-                finally:
-                    try:
-                        Path(tmp_path).unlink()
-                    except OSError:
-                        pass
-            else:
-                return subprocess.run(
-                    command,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    cwd=str(working_dir),
-                    env=os.environ.copy(),  # inherit any env changes from fix_bug_command
-                )
-
-        tool_call_id = registered_functions.get(tool_name, {}).get(
-            "tool_call_id", "tool_" + str(uuid.uuid4())[:35]
-        )
+        tool_call_id = tool_meta.get("tool_call_id", "tool_" + str(uuid.uuid4())[:35])
 
+        worker_pool = getattr(tool_manager, "python_worker_pool", None)
+        env = os.environ.copy()  # inherit any env changes from fix_bug_command
+        tmp_path = None
         try:
-            result = await asyncio.to_thread(_run)
+            if is_python and worker_pool is not None:
+                result = await worker_pool.run(
+                    command,
+                    cwd=working_dir,
+                    env=env,
+                    limits=limits,
+                    on_output=on_output,
+                )
+            else:
+                if is_python:
+                    # Write the code to a temp file so that multi-line logic,
+                    # imports, and print() all behave like a normal Python script.
+                    with tempfile.NamedTemporaryFile(
+                        mode="w",
+                        suffix=".py",
+                        dir=str(working_dir),
+                        delete=False,
+                        encoding="utf-8",
+                    ) as tmp:
+                        tmp.write(command)
+                        tmp_path = tmp.name
+                    process_args = [sys.executable, tmp_path]
+                elif sys.platform == "win32":
+                    process_args = ["cmd", "/c", command]
+                else:
+                    process_args = ["/bin/sh", "-c", command]
+
+                result = await run_process(
+                    process_args,
+                    cwd=working_dir,
+                    env=env,
+                    limits=limits,
+                    on_output=on_output,
+                )
             stdout = result.stdout.strip()
             stderr = result.stderr.strip()
             returncode = result.returncode
@@ -976,8 +1229,28 @@ class AgentSkillTool:
                 out_parts.append(f"STDOUT:\n{stdout}")
             if stderr:
                 out_parts.append(f"STDERR:\n{stderr}")
+            if result.log_path:
+                out_parts.append(
+                    f"(Output truncated, the full log is in {result.log_path})"
+                )
+            additional_kwargs = (
+                {"log_path": str(result.log_path)} if result.log_path else {}
+            )
 
-            if returncode == 0:
+            if result.timed_out:
+                artifact = "\n\n".join(out_parts) if out_parts else "(No output)"
+                content = (
+                    f"AgentSkillTool '{tool_name}' [{mode}] was killed after "
+                    f"the {limits.timeout}s timeout.\n{artifact}"
+                )
+                logger.warning(content)
+                return ToolMessage(
+                    content=content,
+                    artifact=artifact,
+                    tool_call_id=tool_call_id,
+                    additional_kwargs={"is_error": True, **additional_kwargs},
+                )
+            elif returncode == 0:
                 artifact = (
                     "\n\n".join(out_parts)
                     if out_parts
@@ -989,7 +1262,10 @@ class AgentSkillTool:
                     f"\n{artifact}"
                 )
                 return ToolMessage(
-                    content=content, artifact=artifact, tool_call_id=tool_call_id
+                    content=content,
+                    artifact=artifact,
+                    tool_call_id=tool_call_id,
+                    additional_kwargs=additional_kwargs,
                 )
             else:
                 artifact = (
@@ -1012,7 +1288,7 @@ class AgentSkillTool:
                     content=content,
                     artifact=artifact,
                     tool_call_id=tool_call_id,
-                    additional_kwargs={"is_error": True},
+                    additional_kwargs={"is_error": True, **additional_kwargs},
                 )
 
         except Exception as e:
@@ -1027,6 +1303,12 @@ class AgentSkillTool:
                 tool_call_id=tool_call_id,
                 additional_kwargs={"is_error": True},
             )
+        finally:
+            if tmp_path:
+                try:
+                    Path(tmp_path).unlink()
+                except OSError:
+                    pass
 
 
 class ToolCall(BaseModel):
@@ -0,0 +1,406 @@
+import os
+import sys
+import json
+import shutil
+import asyncio
+import inspect
+import logging
+import tempfile
+import time
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+from vinagent.register.process import (
+    OutputCallback,
+    ProcessLimits,
+    ProcessResult,
+    kill_process,
+)
+
+logger = logging.getLogger(__name__)
+
+# Source of the worker interpreter. It is passed with ``-c`` so that starting a
+# worker does not import vinagent itself. Protocol: one JSON request per line on
+# stdin, one JSON response per line on stdout. While a job runs, file
+# descriptors 1 and 2 point to the job output files, so the output of C
+# extensions and child processes is captured as well. The rlimits are applied
+# here rather than in a preexec_fn, which is unsafe in a threaded parent.
+_WORKER_SOURCE = r"""
+import os, sys, json, importlib, traceback
+
+ctrl_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+ctrl_out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+devnull = os.open(os.devnull, os.O_RDWR)
+for fd in (0, 1, 2):
+    os.dup2(devnull, fd)
+
+try:
+    import resource, signal
+except ImportError:
+    resource = None
+if resource is not None:
+    memory_bytes = int(sys.argv[2])
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    # Writes past RLIMIT_FSIZE fail with EFBIG instead of killing the worker
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+    _, fsize_hard = resource.getrlimit(resource.RLIMIT_FSIZE)
+
+preloaded = []
+for name in json.loads(sys.argv[1]):
+    try:
+        importlib.import_module(name)
+        preloaded.append(name)
+    except Exception:
+        pass
+ctrl_out.write(json.dumps({"ready": True, "preloaded": preloaded}) + "\n")
+ctrl_out.flush()
+
+for line in ctrl_in:
+    job = json.loads(line)
+    if resource is not None and job.get("cpu_time"):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = int(usage.ru_utime + usage.ru_stime) + 1
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (used + job["cpu_time"], hard))
+    if resource is not None and job.get("max_file_bytes"):
+        fsize = job["max_file_bytes"]
+        if fsize_hard != resource.RLIM_INFINITY:
+            fsize = min(fsize, fsize_hard)
+        resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize_hard))
+    out = os.open(job["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    err = os.open(job["stderr"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    os.dup2(out, 1)
+    os.dup2(err, 2)
+    os.close(out)
+    os.close(err)
+    sys.stdout = os.fdopen(os.dup(1), "w", encoding="utf-8", errors="replace")
+    sys.stderr = os.fdopen(os.dup(2), "w", encoding="utf-8", errors="replace")
+    returncode = 0
+    try:
+        os.chdir(job["cwd"])
+        os.environ.clear()
+        os.environ.update(job["env"])
+        sys.argv = [job["filename"]]
+        sys.path[0] = job["cwd"]
+        code = compile(job["code"], job["filename"], "exec")
+        exec(code, {"__name__": "__main__", "__file__": job["filename"], "__builtins__": __builtins__})
+    except SystemExit as e:
+        if e.code is None:
+            returncode = 0
+        elif isinstance(e.code, int):
+            returncode = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            returncode = 1
+    except BaseException:
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+                stream.close()
+            except Exception:
+                pass
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        if resource is not None:
+            resource.setrlimit(resource.RLIMIT_FSIZE, (fsize_hard, fsize_hard))
+    ctrl_out.write(json.dumps({"returncode": returncode}) + "\n")
+    ctrl_out.flush()
+"""
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker interpreter died while starting or running a job."""
+
+
+class PythonWorker:
+    """A warm interpreter executing python-code jobs one at a time."""
+
+    def __init__(self, process: asyncio.subprocess.Process, preloaded: list):
+        self.process = process
+        self.preloaded = preloaded
+        self.runs = 0
+
+    @classmethod
+    async def start(
+        cls,
+        cwd: Union[str, Path],
+        preload_modules: Iterable[str],
+        memory_bytes: Optional[int] = None,
+    ) -> "PythonWorker":
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            _WORKER_SOURCE,
+            json.dumps(list(preload_modules)),
+            str(memory_bytes or 0),
+            cwd=str(cwd),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=sys.platform != "win32",
+            # Preloaded modules can print long lines while importing
+            limit=2**20,
+        )
+        line = await process.stdout.readline()
+        if not line:
+            await process.wait()
+            raise WorkerCrashed(
+                f"Python worker exited while starting (returncode={process.returncode})"
+            )
+        return cls(process, json.loads(line).get("preloaded", []))
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def run(self, job: dict, timeout: Optional[float]) -> int:
+        """
+        Execute a job and return its exit code.
+
+        Raises:
+            asyncio.TimeoutError: If the job did not finish in time.
+            WorkerCrashed: If the worker died during the job.
+        """
+        self.runs += 1
+        self.process.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        line = await asyncio.wait_for(self.process.stdout.readline(), timeout)
+        if not line:
+            await self.process.wait()
+            raise WorkerCrashed(
+                f"Python worker died during the job (returncode={self.process.returncode})"
+            )
+        return json.loads(line)["returncode"]
+
+    async def close(self) -> None:
+        if self.is_alive:
+            kill_process(self.process)
+        await self.process.wait()
+
+
+class _DirectoryPool:
+    def __init__(self, max_workers: int):
+        self.idle: deque = deque()
+        self.slots = asyncio.Semaphore(max_workers)
+
+
+class PythonWorkerPool:
+    """
+    Warm interpreters executing the python-code commands of agentskill tools.
+
+    Starting ``sys.executable`` for every command re-imports heavy libraries
+    (pandas, openpyxl, ...) each time. Workers of this pool are started once per
+    skill working directory with ``preload_modules`` already imported, then run
+    every submitted code block in a fresh ``__main__`` namespace. A worker is
+    replaced after ``max_runs`` jobs, on a crash or on a timeout. Results have
+    the same shape as `run_process`, so callers format them the same way.
+
+    Unlike `run_process`, the output is not streamed: it is written to files
+    capped by ``ProcessLimits.max_log_bytes`` (RLIMIT_FSIZE, which also caps the
+    files the job writes itself) and read back once the job is done.
+
+    State is kept per event loop, since asyncio subprocesses belong to the loop
+    that started them.
+    """
+
+    def __init__(
+        self,
+        preload_modules: Iterable[str] = (),
+        max_runs: int = 50,
+        max_workers_per_dir: int = 1,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            preload_modules (Iterable[str], optional): Modules imported by every worker at start. Defaults to ().
+            max_runs (int, optional): Jobs executed by a worker before it is replaced. Defaults to 50.
+            max_workers_per_dir (int, optional): Workers per skill working directory. Defaults to 1.
+        """
+        if max_runs < 1:
+            raise ValueError("max_runs must be at least 1")
+        if max_workers_per_dir < 1:
+            raise ValueError("max_workers_per_dir must be at least 1")
+        self.preload_modules = list(preload_modules)
+        self.max_runs = max_runs
+        self.max_workers_per_dir = max_workers_per_dir
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _DirectoryPool]]" = (weakref.WeakKeyDictionary())
+
+    def _directory_pool(self, cwd: str) -> _DirectoryPool:
+        pools = self._pools.setdefault(asyncio.get_running_loop(), {})
+        if cwd not in pools:
+            pools[cwd] = _DirectoryPool(self.max_workers_per_dir)
+        return pools[cwd]
+
+    async def _acquire(
+        self, pool: _DirectoryPool, cwd: str, limits: ProcessLimits
+    ) -> PythonWorker:
+        while pool.idle:
+            worker = pool.idle.popleft()
+            if worker.is_alive:
+                return worker
+        return await PythonWorker.start(
+            cwd, self.preload_modules, memory_bytes=limits.memory_bytes
+        )
+
+    async def _release(self, pool: _DirectoryPool, worker: PythonWorker, reuse: bool):
+        if reuse and worker.is_alive and worker.runs < self.max_runs:
+            pool.idle.append(worker)
+        else:
+            await worker.close()
+
+    async def warmup(
+        self, cwd: Union[str, Path], limits: Optional[ProcessLimits] = None
+    ) -> None:
+        """Start the workers of a working directory ahead of the first job."""
+        cwd = str(Path(cwd).resolve())
+        pool = self._directory_pool(cwd)
+        limits = limits or ProcessLimits()
+        while len(pool.idle) < self.max_workers_per_dir:
+            pool.idle.append(
+                await PythonWorker.start(
+                    cwd, self.preload_modules, memory_bytes=limits.memory_bytes
+                )
+            )
+
+    async def run(
+        self,
+        code: str,
+        cwd: Union[str, Path],
+        env: Optional[Dict[str, str]] = None,
+        limits: Optional[ProcessLimits] = None,
+        on_output: Optional[OutputCallback] = None,
+    ) -> ProcessResult:
+        """
+        Execute a python code block in a warm worker.
+
+        Args:
+            code (str): The python source to execute as ``__main__``.
+            cwd (Union[str, Path]): Working directory of the job.
+            env (Dict[str, str], optional): Environment of the job. Defaults to os.environ.
+            limits (ProcessLimits, optional): Resource limits. Defaults to ProcessLimits().
+            on_output (OutputCallback, optional): Called with the captured stdout and
+                stderr once the job is done. Pool jobs do not stream their output.
+
+        Returns:
+            ProcessResult: Same fields as `run_process`.
+        """
+        limits = limits or ProcessLimits()
+        cwd = str(Path(cwd).resolve())
+        log_dir = (
+            Path(limits.log_dir) if limits.log_dir else Path(tempfile.gettempdir())
+        )
+        log_dir.mkdir(parents=True, exist_ok=True)
+        job_dir = Path(tempfile.mkdtemp(dir=str(log_dir), prefix="vinagent-job-"))
+        job = {
+            "code": code,
+            "cwd": cwd,
+            "env": dict(os.environ if env is None else env),
+            "filename": str(Path(cwd) / "<agentskill>"),
+            "stdout": str(job_dir / "stdout"),
+            "stderr": str(job_dir / "stderr"),
+            "cpu_time": limits.cpu_time,
+            "max_file_bytes": limits.max_log_bytes,
+        }
+
+        pool = self._directory_pool(cwd)
+        start = time.perf_counter()
+        returncode, timed_out = None, False
+        async with pool.slots:
+            worker = await self._acquire(pool, cwd, limits)
+            reuse = False
+            try:
+                returncode = await worker.run(job, limits.timeout)
+                reuse = True
+            except asyncio.TimeoutError:
+                timed_out = True
+                logger.warning(f"Killing python worker after {limits.timeout}s timeout")
+            except WorkerCrashed as e:
+                logger.warning(str(e))
+                returncode = worker.process.returncode
+            finally:
+                await self._release(pool, worker, reuse)
+
+        try:
+            stdout, stdout_truncated = _read_capped(
+                Path(job["stdout"]), limits.max_output_bytes
+            )
+            stderr, stderr_truncated = _read_capped(
+                Path(job["stderr"]), limits.max_output_bytes
+            )
+            truncated = stdout_truncated or stderr_truncated
+            if limits.max_log_bytes and any(
+                (job_dir / name).exists()
+                and (job_dir / name).stat().st_size >= limits.max_log_bytes
+                for name in ("stdout", "stderr")
+            ):
+                logger.warning(
+                    f"Python job output reached the {limits.max_log_bytes} bytes limit"
+                )
+            log_path = None
+            if truncated:
+                log_path = _merge_logs(job_dir, log_dir)
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+        if on_output is not None:
+            for name, text in (("stdout", stdout), ("stderr", stderr)):
+                if text:
+                    result = on_output(name, text)
+                    if inspect.isawaitable(result):
+                        await result
+
+        return ProcessResult(
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
+            timed_out=timed_out,
+            truncated=truncated,
+            log_path=log_path,
+            duration=time.perf_counter() - start,
+        )
+
+    async def close(self) -> None:
+        """Stop the workers started on the running event loop."""
+        pools = self._pools.pop(asyncio.get_running_loop(), {})
+        for pool in pools.values():
+            while pool.idle:
+                await pool.idle.popleft().close()
+
+
+def _read_capped(path: Path, max_bytes: int) -> Tuple[str, bool]:
+    """Read the head and tail of a file, ``max_bytes`` in total."""
+    if not path.exists():
+        return "", False
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        if size <= max_bytes:
+            return f.read().decode("utf-8", errors="replace"), False
+        head = f.read(max_bytes // 2)
+        tail_size = max_bytes - len(head)
+        f.seek(size - tail_size)
+        tail = f.read()
+    omitted = size - len(head) - len(tail)
+    return (
+        head.decode("utf-8", errors="replace")
+        + f"\n... [{omitted} bytes omitted] ...\n"
+        + tail.decode("utf-8", errors="replace")
+    ), True
+
+
+def _merge_logs(job_dir: Path, log_dir: Path) -> Path:
+    fd, log_path = tempfile.mkstemp(dir=str(log_dir), prefix="vinagent-", suffix=".log")
+    with os.fdopen(fd, "wb") as log:
+        for name in ("stdout", "stderr"):
+            path = job_dir / name
+            if path.exists() and path.stat().st_size:
+                log.write(f"===== {name.upper()} =====\n".encode("utf-8"))
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, log)
+    return Path(log_path)
@@ -0,0 +1,51 @@
+import threading
+from typing import Any, Tuple
+
+_lock = threading.Lock()
+# Attribute of the llm holding its runnables
+_ATTR = "_vinagent_structured_outputs"
+
+
+class _Runnables(dict):
+    """{(schema, options): runnable} of one llm."""
+
+    def __init__(self, llm: Any):
+        super().__init__()
+        # A copy of the llm (e.g. `model_copy`) shares this dict but not its runnables
+        self.llm_id = id(llm)
+
+
+def structured_output(llm: Any, schema: Any, **kwargs) -> Any:
+    """
+    Return ``llm.with_structured_output(schema, **kwargs)``, built once per llm, schema and options.
+
+    Binding a schema converts it to a JSON schema and tool definition each
+    time; the bound runnable is stateless, so it is reused across requests and
+    threads. The runnables are stored on the llm object itself: they reference
+    the llm, which makes a plain reference cycle, collected with the llm by the
+    garbage collector. LLMs that do not accept attributes are not cached.
+
+    Args:
+        llm: Chat model supporting ``with_structured_output``.
+        schema: Pydantic model (or JSON schema) of the output.
+        **kwargs: Options of ``with_structured_output``, e.g. ``method="function_calling"``.
+    """
+    key: Tuple[Any, Tuple] = (schema, tuple(sorted(kwargs.items())))
+    with _lock:
+        runnables = getattr(llm, _ATTR, None)
+        if runnables is not None and runnables.llm_id == id(llm):
+            runnable = runnables.get(key)
+            if runnable is not None:
+                return runnable
+
+    runnable = llm.with_structured_output(schema, **kwargs)
+    with _lock:
+        runnables = getattr(llm, _ATTR, None)
+        if runnables is None or runnables.llm_id != id(llm):
+            runnables = _Runnables(llm)
+            try:
+                # Bypass pydantic validation, the attribute is not a field
+                object.__setattr__(llm, _ATTR, runnables)
+            except (AttributeError, TypeError):
+                return runnable
+        return runnables.setdefault(key, runnable)
@@ -1,19 +1,30 @@
 import os
 import re
+import functools
 from typing import TypedDict
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import AnyMessage, SystemMessage, HumanMessage
 from langgraph.checkpoint.memory import MemorySaver
-from langchain_together import ChatTogether
 from tavily import TavilyClient
 from vinagent.register import primary_function
 
 load_dotenv()
 
-model = ChatTogether(model="meta-llama/Llama-3.3-70B-Instruct-Turbo-Free")
-tavily = TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
+
+# The clients are created on first use: importing the module needs neither
+# the LLM provider nor TAVILY_API_KEY
+@functools.lru_cache(maxsize=None)
+def get_model():
+    from langchain_together import ChatTogether
+
+    return ChatTogether(model="meta-llama/Llama-3.3-70B-Instruct-Turbo-Free")
+
+
+@functools.lru_cache(maxsize=None)
+def get_tavily() -> TavilyClient:
+    return TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
 
 
 class AgentState(TypedDict):
@@ -103,7 +114,7 @@ class DeepSearch:
             SystemMessage(content=self.PLAN_PROMPT.format(max_chapters=max_chapters)),
             HumanMessage(content=state["task"]),
         ]
-        response = model.invoke(messages)
+        response = get_model().invoke(messages)
 
         def find_section(text: str) -> bool:
             is_match = re.match("^\d+. ", text)
@@ -133,7 +144,7 @@ class DeepSearch:
         content = []
 
         for q in queries:
-            response = tavily.search(query=q, max_results=2)
+            response = get_tavily().search(query=q, max_results=2)
             for r in response["results"]:
                 content.append(r["content"])
                 if q not in sections:
@@ -156,7 +167,7 @@ class DeepSearch:
             ),
             user_message,
         ]
-        response = model.invoke(messages)
+        response = get_model().invoke(messages)
         chapters = state["chapters"] if "chapters" in state else []
         chapters.append(f"{chapter_title} \n {response.content}")
         print("revision_number: ", state.get("revision_number", 1))
@@ -181,7 +192,7 @@ class DeepSearch:
             SystemMessage(content=self.REFLECTION_PROMPT),
             HumanMessage(content=state["draft"]),
         ]
-        response = model.invoke(messages)
+        response = get_model().invoke(messages)
         return {"critique": response.content}
 
     def should_continue(self, state: AgentState):
@@ -190,7 +201,7 @@ class DeepSearch:
         return "reflect"
 
     def research_critique_node(self, state: AgentState):
-        critique = model.invoke(
+        critique = get_model().invoke(
             [
                 SystemMessage(
                     content=self.RESEARCH_CRITIQUE_PROMPT.format(
@@ -212,7 +223,7 @@ class DeepSearch:
             if match:
                 q = match.group(1)
 
-            response = tavily.search(query=q, max_results=2)
+            response = get_tavily().search(query=q, max_results=2)
             for r in response["results"]:
                 content.append(r["content"])
         return {"adjustment": content}
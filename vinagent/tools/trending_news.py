@@ -1,12 +1,12 @@
 import logging
 import re
+import functools
 from typing import Optional, Dict
 import requests
 from dotenv import load_dotenv
 import pandas as pd
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-from langchain_together import ChatTogether
 from googlenewsdecoder import gnewsdecoder
 from vinagent.register import primary_function
 
@@ -16,7 +16,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 load_dotenv()
-model = ChatTogether(model="meta-llama/Llama-3.3-70B-Instruct-Turbo-Free")
+
+
+@functools.lru_cache(maxsize=None)
+def get_model():
+    """The summarization model, created on first use rather than at import."""
+    from langchain_together import ChatTogether
+
+    return ChatTogether(model="meta-llama/Llama-3.3-70B-Instruct-Turbo-Free")
 
 
 class TrendingTopics:
@@ -116,7 +123,7 @@ class TrendingTopics:
                 "## Link"
                 f"{decoded_url}\n\n"
             )
-            response = model.invoke(prompt)
+            response = get_model().invoke(prompt)
             return response.content
         except Exception as e:
             logger.error("Error summarizing article %s: %s", title, str(e))
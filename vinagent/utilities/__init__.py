@@ -1,4 +1,14 @@
-from .sql_database import SQLDatabase
-from .sql_database_toolkit import SQLDatabaseToolkit
+from typing import TYPE_CHECKING
+from vinagent.lazy import lazy_exports
 
-__all__ = ["SQLDatabase", "SQLDatabaseToolkit"]
+_EXPORTS = {
+    "SQLDatabase": ".sql_database",
+    "SQLDatabaseToolkit": ".sql_database_toolkit",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .sql_database import SQLDatabase
+    from .sql_database_toolkit import SQLDatabaseToolkit